@@ -12,29 +12,14 @@ import subprocess
 import shutil
 from pathlib import Path
 
-def ensure_run_from_base_directory():
-    """Ensure script is run from the project base directory"""
-    current_dir = Path.cwd()
-    
-    # Check if we're in the base directory by looking for expected files/directories
-    expected_items = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
-    
-    if not all((current_dir / item).exists() for item in expected_items):
-        print("Error: This script must be run from the project base directory.")
-        print(f"Current directory: {current_dir}")
-        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
-        print("Example: python3 scripts/addDemo.py")
-        sys.exit(1)
-    
-    return current_dir
+from rnbotool.files import copy_if_changed
+from rnbotool.meta import generate_meta_header
+from rnbotool.project import Project, ensure_run_from_base_directory
+from rnbotool.sizes import generate_plugin_sizes, generate_sizes_header
 
 def check_plugin_exists():
     """Check if plugin configuration files exist"""
-    project_root = Path.cwd()
-    plugin_json = project_root / "VcvModules" / "plugin.json"
-    plugin_mm_json = project_root / "plugin-mm.json"
-    
-    if not plugin_json.exists() or not plugin_mm_json.exists():
+    if not Project().has_plugin():
         print("[ERROR] Plugin configuration files not found!")
         print("You need to create a plugin first using createPlugin.py")
         print("\nRun: python3 scripts/createPlugin.py")
@@ -115,10 +100,25 @@ def copy_demo_rnbo_files():
         for file_path in demo_template_dir.iterdir():
             if file_path.is_file():
                 target_file = demo_target_dir / file_path.name
-                shutil.copy2(file_path, target_file)
-                print(f"[OK] Copied {file_path.name}")
+                if copy_if_changed(file_path, target_file):
+                    print(f"[OK] Copied {file_path.name}")
+                else:
+                    print(f"[OK] {file_path.name} unchanged")
         
         print("[PASS] Demo RNBO files copied successfully")
+        
+        # Generate metadata header from description.json
+        status, header_path = generate_meta_header(demo_target_dir, "Demo")
+        if status == 'missing':
+            print("[ERROR] Demo description.json not found")
+            return False
+        print(f"[OK] Generated {header_path.name}")
+        
+        # Queue and list sizes from the export, and the plugin's list size
+        status, sizes_path = generate_sizes_header(demo_target_dir, "Demo")
+        print(f"[OK] Generated {sizes_path.name}")
+        project = Project()
+        generate_plugin_sizes(project.src_dir, project.modules_on_disk())
         return True
         
     except Exception as e:
@@ -129,7 +129,7 @@ def main():
     """Main function"""
     try:
         # Ensure we're running from the correct directory
-        project_root = ensure_run_from_base_directory()
+        project_root = ensure_run_from_base_directory("scripts/addDemo.py")
         print(f"Running from project directory: {project_root}")
         
         print("[TARGET] VCV Rack RNBO Template - Add Demo Module")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Measure the dsp cost of modules natively, without VCV Rack.
+
+Each module's dsp (MOD.cpp with its RNBO export) is compiled against a small
+stand-in for the Rack Module API (scripts/bench/rack.hpp) into a benchmark
+host (scripts/bench/host.cpp). The host connects every port, feeds the inputs
+sines, sweeps every parameter across its range and times process() at each
+sample rate. Each block size is a separate build of the module.
+
+    python3 scripts/bench.py                            # every module, its own block size
+    python3 scripts/bench.py MyFilter --block-sizes 1,16,64 --rates 48000,96000
+    python3 scripts/bench.py --json -o bench.json       # results as JSON
+
+Timings are ns per engine sample (lower is better), with percentiles over
+chunks of 64 samples, and cpu_percent the share of one core used at that
+sample rate. They are from this machine and compiler, compare modules and
+settings with each other rather than reading them as Rack or MetaModule figures.
+Allocations made while timing (allocations, system_allocations) should be 0,
+a patch that allocates while processing is warned about. While processing the
+pool never calls the system allocator: realtime_misses are requests it had no
+block of their size for, realtime_failures the ones it could not serve at all.
+"""
+
+import os
+import re
+import sys
+import json
+import shlex
+import argparse
+import platform
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rnbotool.files import write_if_changed, copy_if_changed
+from rnbotool.profiles import PROFILES, VCV, read_profile, DEFAULT_PROFILES
+from rnbotool.project import Project, ensure_run_from_base_directory, check_plugin_exists
+
+BENCH_DIR = Path("scripts") / "bench"
+BUILD_DIR = Path("VcvModules") / "build" / "bench"
+
+BLOCK_SIZES = [1, 4, 8, 16, 32, 64]
+BLOCK_SIZE_LINE = re.compile(r'^(#define MODULE_BLOCK_SIZE)\s+(\S+)', re.MULTILINE)
+
+DEFAULT_RATES = "44100,48000,96000"
+DEFAULT_CXXFLAGS = "-O3 -funsafe-math-optimizations"
+
+def parse_list(text, name):
+    """Comma separated numbers, e.g. '48000,96000'"""
+    try:
+        return [int(value) for value in text.split(',') if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} must be comma separated numbers, got '{text}'")
+
+def benchable_modules(project):
+    """Slugs with a module header, dsp and RNBO export, the modules the host can build"""
+    return [slug for slug in project.modules_on_disk()
+            if project.module_header_path(slug).exists()
+            and project.module_source_path(slug).exists()
+            and (project.rnbo_dir_path(slug) / f"{slug}.cpp.h").exists()]
+
+def module_block_size(project, slug):
+    """The block size the module is configured with (MODULE_BLOCK_SIZE in MOD.hpp), None if not a number"""
+    match = BLOCK_SIZE_LINE.search(project.module_header_path(slug).read_text())
+    return int(match.group(2)) if match and match.group(2).isdigit() else None
+
+def prepare_build(project, slug, block_size):
+    """Copy the module into its build directory, with MOD.hpp set to block_size
+
+    The copied MOD.cpp includes the copied MOD.hpp, the export and the plugin
+    headers are found in VcvModules/src through the include path.
+    """
+    build_dir = BUILD_DIR / f"{slug}-bs{block_size}"
+    header = BLOCK_SIZE_LINE.sub(rf'\g<1> {block_size}', project.module_header_path(slug).read_text(), count=1)
+    write_if_changed(build_dir / f"{slug}.hpp", header)
+    copy_if_changed(project.module_source_path(slug), build_dir / f"{slug}.cpp")
+    return build_dir
+
+def compile_host(project, slug, build_dir, cxx, cxxflags, defines):
+    """Build the benchmark host for one module, returns (path, error output)"""
+    binary = build_dir / "bench"
+    src = project.src_dir
+    command = [cxx, "-std=c++17", *cxxflags,
+               f"-I{build_dir}", f"-I{src}", f"-I{src.parent / 'inc' / 'rnbo-export' / 'common'}", f"-I{BENCH_DIR}",
+               *(f"-D{define}" for define in defines),
+               f"-DBENCH_MODULE={slug}", f'-DBENCH_HEADER="{slug}.hpp"',
+               str(BENCH_DIR / "host.cpp"), str(build_dir / f"{slug}.cpp"), str(src / "rnbo_runtime.cpp"),
+               "-o", str(binary)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None, result.stderr
+    return binary, ""
+
+def run_host(binary, seconds, voices, rates):
+    """Run a benchmark host, one result per sample rate"""
+    result = subprocess.run([str(binary), str(seconds), str(voices), *(str(rate) for rate in rates)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{binary} failed: {result.stderr.strip()}")
+    return [json.loads(line) for line in result.stdout.splitlines() if line.strip()]
+
+def print_results(results):
+    """Results as a table, one line per module, block size and sample rate"""
+    print(f"\n{'module':<20} {'block':>5} {'rate':>6} {'ns/sample':>10} {'p50':>8} {'p99':>8} {'max':>9} {'cpu %':>7}")
+    for r in results:
+        p = r["percentiles"]
+        print(f"{r['module']:<20} {r['block_size']:>5} {r['sample_rate']:>6} {r['ns_per_sample']:>10.1f} "
+              f"{p['p50']:>8.1f} {p['p99']:>8.1f} {p['max']:>9.1f} {r['cpu_percent']:>7.2f}")
+    for r in results:
+        if r.get("allocations"):
+            print(f"[WARNING] {r['module']} (block size {r['block_size']}, {r['sample_rate']}) allocated "
+                  f"{r['allocations']} block(s) while processing, {r['system_allocations']} from the system")
+        if r.get("realtime_misses"):
+            print(f"[WARNING] {r['module']} (block size {r['block_size']}, {r['sample_rate']}) found no pooled "
+                  f"block for {r['realtime_misses']} allocation(s) while processing, "
+                  f"{r['realtime_failures']} got no memory")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Measure the dsp cost of modules natively, without VCV Rack')
+    parser.add_argument('modules', nargs='*', help='Module slugs (default: every module)')
+    parser.add_argument('--rates', default=DEFAULT_RATES,
+                        help=f'Sample rates, comma separated (default: {DEFAULT_RATES})')
+    parser.add_argument('--block-sizes',
+                        help='Block sizes, comma separated, each a separate build (default: the module\'s own)')
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='Seconds of audio timed per sample rate (default: 2)')
+    parser.add_argument('--voices', type=int, default=1,
+                        help='Channels on each input, polyphonic modules run a voice per channel (default: 1)')
+    parser.add_argument('--cxx', default=os.environ.get('CXX', 'g++'),
+                        help='C++ compiler (default: $CXX or g++)')
+    parser.add_argument('--cxxflags', default=DEFAULT_CXXFLAGS,
+                        help=f'Optimisation flags (default: "{DEFAULT_CXXFLAGS}", as the Rack SDK)')
+    parser.add_argument('--profile', choices=PROFILES,
+                        help='RNBO build profile (default: the VCV build\'s, see setProfile.py)')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON only')
+    parser.add_argument('-o', '--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    ensure_run_from_base_directory("scripts/bench.py")
+    check_plugin_exists()
+
+    try:
+        rates = parse_list(args.rates, "--rates")
+        block_sizes = parse_list(args.block_sizes, "--block-sizes") if args.block_sizes else None
+    except argparse.ArgumentTypeError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    for block_size in block_sizes or []:
+        if block_size not in BLOCK_SIZES:
+            print(f"[ERROR] Block size {block_size} not supported, choose from: {', '.join(map(str, BLOCK_SIZES))}")
+            return 1
+
+    project = Project()
+    available = benchable_modules(project)
+    slugs = args.modules or available
+    for slug in slugs:
+        if slug not in available:
+            print(f"[ERROR] Module '{slug}' cannot be benchmarked, it needs "
+                  f"src/{slug}.hpp, src/{slug}.cpp and src/{slug}-rnbo/{slug}.cpp.h")
+            return 1
+    if not slugs:
+        print("[ERROR] No modules to benchmark, create one with scripts/createModule.py")
+        return 1
+
+    profile = args.profile or read_profile(VCV) or DEFAULT_PROFILES[VCV]
+    cxxflags = shlex.split(args.cxxflags)
+    log = sys.stderr if args.json else sys.stdout
+
+    builds = []
+    for slug in slugs:
+        own = module_block_size(project, slug)
+        for block_size in block_sizes or [own]:
+            if block_size is None:
+                print(f"[ERROR] {slug}: MODULE_BLOCK_SIZE in {slug}.hpp is not a number, use --block-sizes")
+                return 1
+            builds.append((slug, block_size, prepare_build(project, slug, block_size)))
+
+    # compiling is the slow part, build in parallel, then time one at a time
+    print(f"Building {len(builds)} benchmark(s) with {args.cxx} {args.cxxflags}, profile {profile}", file=log)
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        compiled = list(pool.map(
+            lambda build: compile_host(project, build[0], build[2], args.cxx, cxxflags, PROFILES[profile][1]),
+            builds))
+
+    results = []
+    failed = False
+    for (slug, block_size, _), (binary, errors) in zip(builds, compiled):
+        if binary is None:
+            print(f"[ERROR] {slug} (block size {block_size}) failed to build:\n{errors}", file=log)
+            failed = True
+            continue
+        print(f"[OK] {slug}, block size {block_size}: timing {args.seconds}s at {args.rates}", file=log)
+        try:
+            runs = run_host(binary, args.seconds, args.voices, rates)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}", file=log)
+            failed = True
+            continue
+        results.extend({"module": slug, "block_size": block_size, **run} for run in runs)
+
+    report = {
+        "host": {
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cxx": args.cxx,
+            "cxxflags": args.cxxflags,
+            "profile": profile,
+        },
+        "results": results,
+    }
+    if args.output:
+        write_if_changed(args.output, json.dumps(report, indent=2) + "\n")
+        print(f"[OK] Results written to {args.output}", file=log)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_results(results)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
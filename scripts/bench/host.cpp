@@ -0,0 +1,143 @@
+// Benchmark host for one module's dsp, built and run by scripts/bench.py
+//
+// BENCH_MODULE (the module slug) and BENCH_HEADER ("MOD.hpp") are given on the command line,
+// the module's MOD.cpp and rnbo_runtime.cpp are linked in, and rack.hpp is the stand-in next to this file.
+//
+// usage: host seconds voices rate [rate...]
+// for each sample rate a fresh module is created, every input and output connected, inputs fed
+// sines (one frequency per input and voice) and every parameter swept across its range, then the
+// module is processed for the given seconds of audio, timed in chunks of CHUNK_SAMPLES.
+// prints one JSON object per line and sample rate, with the blocks allocated while timing (none is the aim,
+// see rnbo_allocator.hpp).
+#include "plugin.hpp"
+#include "rnbo_allocator.hpp"
+
+#include <chrono>
+#include <cstdlib>
+
+#include BENCH_HEADER
+
+Plugin* pluginInstance = nullptr;
+
+// samples per timed chunk, a multiple of every block size so each chunk does the same work
+static const int CHUNK_SAMPLES = 64;
+// how long a parameter takes to sweep from its minimum to its maximum and back
+static const float SWEEP_SECONDS = 1.f;
+
+static double percentile(std::vector<double>& sorted, double p) {
+    size_t i = (size_t)(p / 100.0 * (sorted.size() - 1) + 0.5);
+    return sorted[std::min(i, sorted.size() - 1)];
+}
+
+static void run(float sampleRate, float seconds, int voices) {
+    BENCH_MODULE* module = new BENCH_MODULE;
+    module->onSampleRateChange({sampleRate, 1.f / sampleRate});
+
+    for (int i = 0; i < (int)module->inputs.size(); i++) {
+        module->inputs[i].setChannels(voices);
+        module->onPortChange({true, Port::INPUT, i});
+    }
+    for (int i = 0; i < (int)module->outputs.size(); i++) {
+        module->outputs[i].setChannels(1);
+        module->onPortChange({true, Port::OUTPUT, i});
+    }
+
+    Module::ProcessArgs args;
+    args.sampleRate = sampleRate;
+    args.sampleTime = 1.f / sampleRate;
+
+    const int nInputs = module->inputs.size();
+    const int nParams = module->params.size();
+    std::vector<float> phases(nInputs * voices, 0.f);
+    float sweepPhase = 0.f;
+    float sink = 0.f;
+
+    // the signals for the next chunk are generated before it is timed, so only
+    // setting the ports and parameters, and process() itself, are measured
+    std::vector<float> chunkInputs(CHUNK_SAMPLES * nInputs * voices);
+    std::vector<float> chunkParams(CHUNK_SAMPLES * nParams);
+    auto generate = [&]() {
+        for (int s = 0; s < CHUNK_SAMPLES; s++) {
+            // inputs, +/-5v sines from 110Hz up, a different frequency per input and voice
+            for (int i = 0; i < nInputs * voices; i++) {
+                phases[i] += 110.f * (1 + i) * args.sampleTime;
+                if (phases[i] >= 1.f) phases[i] -= 1.f;
+                chunkInputs[s * nInputs * voices + i] = 5.f * std::sin(2.f * (float)M_PI * phases[i]);
+            }
+            // parameters, a triangle sweep across the range, staggered per parameter
+            sweepPhase += args.sampleTime / SWEEP_SECONDS;
+            if (sweepPhase >= 1.f) sweepPhase -= 1.f;
+            for (int p = 0; p < nParams; p++) {
+                float t = sweepPhase + (float)p / nParams;
+                t -= std::floor(t);
+                const float tri = t < 0.5f ? 2.f * t : 2.f - 2.f * t;
+                const ParamQuantity* q = module->paramQuantities[p];
+                chunkParams[s * nParams + p] = q->minValue + tri * (q->maxValue - q->minValue);
+            }
+        }
+    };
+    auto processChunk = [&]() {
+        const float* in = chunkInputs.data();
+        const float* param = chunkParams.data();
+        for (int s = 0; s < CHUNK_SAMPLES; s++) {
+            for (int i = 0; i < nInputs; i++) {
+                for (int c = 0; c < voices; c++) module->inputs[i].voltages[c] = *in++;
+            }
+            for (int p = 0; p < nParams; p++) module->params[p].setValue(*param++);
+            module->process(args);
+            args.frame++;
+        }
+    };
+
+    // warm up, rnbo and the caches settle, and voices are allocated
+    const long warmupChunks = (long)(0.1f * sampleRate) / CHUNK_SAMPLES;
+    for (long k = 0; k < warmupChunks; k++) {
+        generate();
+        processChunk();
+    }
+
+    const long chunks = std::max(1L, (long)(seconds * sampleRate) / CHUNK_SAMPLES);
+    std::vector<double> chunkNs(chunks);
+    double totalNs = 0.0;
+    const RnboAllocatorStats allocatedBefore = rnboAllocatorStats();
+    for (long k = 0; k < chunks; k++) {
+        generate();
+        const auto start = std::chrono::steady_clock::now();
+        processChunk();
+        const auto end = std::chrono::steady_clock::now();
+        chunkNs[k] = std::chrono::duration<double, std::nano>(end - start).count() / CHUNK_SAMPLES;
+        totalNs += chunkNs[k] * CHUNK_SAMPLES;
+        for (auto& output : module->outputs) sink += output.voltages[0];
+    }
+
+    const RnboAllocatorStats allocatedAfter = rnboAllocatorStats();
+
+    const long samples = chunks * CHUNK_SAMPLES;
+    const double nsPerSample = totalNs / samples;
+    std::sort(chunkNs.begin(), chunkNs.end());
+    printf("{\"sample_rate\": %.0f, \"voices\": %d, \"samples\": %ld, \"chunk_samples\": %d, "
+           "\"ns_per_sample\": %.2f, \"cpu_percent\": %.3f, "
+           "\"percentiles\": {\"p50\": %.2f, \"p90\": %.2f, \"p99\": %.2f, \"p99.9\": %.2f, \"max\": %.2f}, "
+           "\"allocations\": %zu, \"system_allocations\": %zu, \"realtime_misses\": %zu, \"realtime_failures\": %zu, "
+           "\"checksum\": %g}\n",
+           sampleRate, voices, samples, CHUNK_SAMPLES, nsPerSample, nsPerSample * sampleRate / 1e7,
+           percentile(chunkNs, 50), percentile(chunkNs, 90), percentile(chunkNs, 99), percentile(chunkNs, 99.9),
+           chunkNs.back(), allocatedAfter.allocations - allocatedBefore.allocations,
+           allocatedAfter.systemAllocations - allocatedBefore.systemAllocations,
+           allocatedAfter.realtimeMisses - allocatedBefore.realtimeMisses,
+           allocatedAfter.realtimeFailures - allocatedBefore.realtimeFailures, sink);
+    fflush(stdout);
+
+    delete module;
+}
+
+int main(int argc, char** argv) {
+    if (argc < 4) {
+        fprintf(stderr, "usage: %s seconds voices rate [rate...]\n", argv[0]);
+        return 1;
+    }
+    const float seconds = atof(argv[1]);
+    const int voices = std::max(1, std::min(atoi(argv[2]), PORT_MAX_CHANNELS));
+    for (int i = 3; i < argc; i++) { run(atof(argv[i]), seconds, voices); }
+    return 0;
+}
@@ -0,0 +1,175 @@
+// Stand-in for the Rack SDK's rack.hpp, used by scripts/bench.py only
+// just the Module side of the API that a module's dsp (MOD.cpp) uses, no widgets,
+// so a module can be built and timed as a plain native program without Rack
+#pragma once
+#include <algorithm>
+#include <cmath>
+#include <cstdarg>
+#include <cstdint>
+#include <cstdio>
+#include <string>
+#include <vector>
+
+namespace rack {
+
+static const int PORT_MAX_CHANNELS = 16;
+
+namespace string {
+inline std::string f(const char* format, ...) {
+    char buf[512];
+    va_list args;
+    va_start(args, format);
+    vsnprintf(buf, sizeof(buf), format, args);
+    va_end(args);
+    return buf;
+}
+}  // namespace string
+
+namespace simd {
+// 4 floats in a vector register, as rack's float_4 (sse on x86, neon on arm)
+struct float_4 {
+    typedef float type __attribute__((vector_size(16)));
+    type v;
+
+    float_4() = default;
+    float_4(type v) : v(v) {}
+    float_4(float x) : v(type{x, x, x, x}) {}
+    static float_4 load(const float* p) {
+        float_4 r;
+        __builtin_memcpy(&r.v, p, sizeof(r.v));
+        return r;
+    }
+    void store(float* p) const { __builtin_memcpy(p, &v, sizeof(v)); }
+    float& operator[](int i) { return reinterpret_cast<float*>(&v)[i]; }
+    const float& operator[](int i) const { return reinterpret_cast<const float*>(&v)[i]; }
+};
+inline float_4 operator*(float_4 a, float_4 b) { return a.v * b.v; }
+inline float_4 operator+(float_4 a, float_4 b) { return a.v + b.v; }
+inline float_4 operator-(float_4 a, float_4 b) { return a.v - b.v; }
+}  // namespace simd
+
+namespace dsp {
+struct ClockDivider {
+    uint32_t clock = 0;
+    uint32_t division = 1;
+    void reset() { clock = 0; }
+    void setDivision(uint32_t d) { division = d; }
+    uint32_t getDivision() { return division; }
+    uint32_t getClock() { return clock; }
+    bool process() {
+        if (++clock >= division) {
+            clock = 0;
+            return true;
+        }
+        return false;
+    }
+};
+}  // namespace dsp
+
+struct Param {
+    float value = 0.f;
+    float getValue() { return value; }
+    void setValue(float v) { value = v; }
+};
+
+struct Port {
+    enum Type { INPUT, OUTPUT };
+    float voltages[PORT_MAX_CHANNELS] = {};
+    uint8_t channels = 0;
+
+    float getVoltage(int c = 0) { return voltages[c]; }
+    void setVoltage(float v, int c = 0) { voltages[c] = v; }
+    float getPolyVoltage(int c) { return channels == 1 ? voltages[0] : voltages[c]; }
+    template <typename T>
+    T getVoltageSimd(int c) { return T::load(&voltages[c]); }
+    template <typename T>
+    T getPolyVoltageSimd(int c) { return channels == 1 ? T(voltages[0]) : T::load(&voltages[c]); }
+    template <typename T>
+    void setVoltageSimd(T v, int c) { v.store(&voltages[c]); }
+    int getChannels() { return channels; }
+    void setChannels(int c) { channels = c; }
+    bool isConnected() { return channels > 0; }
+};
+struct Input : Port {};
+struct Output : Port {};
+
+struct PortInfo {
+    std::string name;
+    std::string description;
+};
+
+struct ParamQuantity {
+    std::string name;
+    float minValue = 0.f;
+    float maxValue = 1.f;
+    float defaultValue = 0.f;
+};
+
+struct Module {
+    std::vector<Param> params;
+    std::vector<Input> inputs;
+    std::vector<Output> outputs;
+    std::vector<ParamQuantity*> paramQuantities;
+    std::vector<PortInfo*> inputInfos;
+    std::vector<PortInfo*> outputInfos;
+
+    struct ProcessArgs {
+        float sampleRate = 48000.f;
+        float sampleTime = 1.f / 48000.f;
+        int64_t frame = 0;
+    };
+    struct SampleRateChangeEvent {
+        float sampleRate;
+        float sampleTime;
+    };
+    struct PortChangeEvent {
+        bool connecting;
+        Port::Type type;
+        int portId;
+    };
+
+    virtual ~Module() {
+        for (auto* q : paramQuantities) delete q;
+        for (auto* i : inputInfos) delete i;
+        for (auto* i : outputInfos) delete i;
+    }
+
+    void config(int numParams, int numInputs, int numOutputs, int numLights = 0) {
+        params.resize(numParams);
+        inputs.resize(numInputs);
+        outputs.resize(numOutputs);
+        paramQuantities.resize(numParams);
+        for (auto*& q : paramQuantities) q = new ParamQuantity;
+        for (int i = 0; i < numInputs; i++) inputInfos.push_back(new PortInfo);
+        for (int i = 0; i < numOutputs; i++) outputInfos.push_back(new PortInfo);
+    }
+    ParamQuantity* configParam(int paramId, float minValue, float maxValue, float defaultValue, std::string name = "") {
+        ParamQuantity* q = paramQuantities[paramId];
+        q->name = name;
+        q->minValue = minValue;
+        q->maxValue = maxValue;
+        q->defaultValue = defaultValue;
+        params[paramId].value = defaultValue;
+        return q;
+    }
+    PortInfo* configInput(int portId, std::string name = "") {
+        inputInfos[portId]->name = name;
+        return inputInfos[portId];
+    }
+    PortInfo* configOutput(int portId, std::string name = "") {
+        outputInfos[portId]->name = name;
+        return outputInfos[portId];
+    }
+
+    virtual void process(const ProcessArgs& args) {}
+    virtual void onSampleRateChange(const SampleRateChangeEvent& e) {}
+    virtual void onPortChange(const PortChangeEvent& e) {}
+};
+
+struct Model;
+struct Plugin {};
+
+#define INFO(...) do {} while (0)
+#define WARN(...) do {} while (0)
+
+}  // namespace rack
@@ -10,24 +10,18 @@ import os
 import sys
 import json
 import shutil
+import argparse
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def ensure_run_from_base_directory():
-    """Ensure script is run from the project base directory"""
-    current_dir = Path.cwd()
-    
-    # Check if we're in the base directory by looking for expected files/directories
-    expected_items = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
-    
-    if not all((current_dir / item).exists() for item in expected_items):
-        print("[ERROR] This script must be run from the project base directory.")
-        print(f"Current directory: {current_dir}")
-        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
-        print("Example: python3 scripts/check.py")
-        sys.exit(1)
-    
-    return current_dir
+from rnbotool.analysis import METAMODULE_RAM_WARNING, analyze_export, describe_ops, read_define, resize_queue
+from rnbotool.files import write_if_changed
+from rnbotool.meta import generate_meta_header
+from rnbotool.profiles import DEFAULT_PROFILES, METAMODULE, PROFILES, TARGETS, VCV, read_profile
+from rnbotool.project import Project, REGISTRATIONS, ensure_run_from_base_directory
+from rnbotool.sizes import (DEFAULT_LIST_SIZE, DEFAULT_QUEUE_SIZE, LIST, QUEUE, generate_plugin_sizes, generate_sizes_header, read_plugin_list_size,
+                            read_sizes_header, sizes_header_path)
 
 def check_file_exists(file_path, description):
     """Check if a file exists and report status"""
@@ -221,139 +215,373 @@ def check_environment_setup():
         print("\n[PASS] Environment setup is complete!")
         return True
 
-def check_plugin_exists():
-    """Check if plugin has been created"""
-    project_root = Path.cwd()
-    plugin_json = project_root / "VcvModules" / "plugin.json"
-    plugin_mm_json = project_root / "plugin-mm.json"
-    
-    if plugin_json.exists() and plugin_mm_json.exists():
-        return True, plugin_json
-    else:
-        return False, None
-
-def get_modules_from_plugin_json(plugin_json_path):
+def get_modules_from_project(project):
     """Get list of modules from plugin.json"""
     try:
-        with open(plugin_json_path, 'r') as f:
-            data = json.load(f)
-        return data.get('modules', [])
+        return project.plugin_modules()
     except Exception as e:
         print(f"[ERROR] Error reading plugin.json: {e}")
         return []
 
-def check_module_status(module_slug):
-    """Check the status of a specific module"""
+def check_module_registration(project, module_slug):
+    """Registration files (modules.mk, plugin.json, ...) the module is not registered in"""
+    try:
+        return [name for name in REGISTRATIONS if name not in project.locations(module_slug)]
+    except Exception as e:
+        return [f"(could not check project files: {e})"]
+
+# module status is cached between runs, keyed by directory and file mtimes
+STATUS_CACHE_PATH = Path("VcvModules") / "build" / "check-cache.json"
+STATUS_CACHE_VERSION = 2
+
+# the MetaModule is 32 bit, lists are sized for the plugin (rnbo_sizes.hpp) and the event queue
+# for each module ([ModuleSlug]Sizes.h), RNBO's defaults otherwise
+METAMODULE_POINTER_SIZE = 4
+
+def scan_dir(dir_path):
+    """Entries of a directory by name, in one os.scandir pass (empty if missing)"""
+    try:
+        with os.scandir(dir_path) as entries:
+            return {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def mtime_ns(entry):
+    """Modification time of a scanned entry, or of a path, None if missing"""
+    try:
+        return entry.stat().st_mtime_ns
+    except (FileNotFoundError, AttributeError):
+        return None
+
+def check_module_status(module_slug, src_entries=None):
+    """Check the status of a specific module
+    
+    src_entries is a scan_dir() of VcvModules/src, shared across modules.
+    """
     project_root = Path.cwd()
+    src_dir = project_root / "VcvModules" / "src"
+    if src_entries is None:
+        src_entries = scan_dir(src_dir)
     
     # Check if module source file exists
-    module_cpp = project_root / "VcvModules" / "src" / f"{module_slug}.cpp"
-    if not module_cpp.exists():
+    module_cpp = src_dir / f"{module_slug}.cpp"
+    if f"{module_slug}.cpp" not in src_entries:
         return "missing_source", f"Module source file missing: {module_cpp}"
     
     # Check RNBO directory
-    rnbo_dir = project_root / "VcvModules" / "src" / f"{module_slug}-rnbo"
-    if not rnbo_dir.exists():
+    rnbo_dir = src_dir / f"{module_slug}-rnbo"
+    if f"{module_slug}-rnbo" not in src_entries:
         return "missing_rnbo_dir", f"RNBO directory missing: {rnbo_dir}"
     
-    # Check for RNBO export files
-    expected_cpp_h = rnbo_dir / f"{module_slug}.cpp.h"
+    # Everything below is decided from one listing of the RNBO directory
+    names = sorted(scan_dir(rnbo_dir))
     
-    if expected_cpp_h.exists():
+    # Check for RNBO export files
+    if f"{module_slug}.cpp.h" in names:
         return "complete", "Module complete with RNBO export"
     
     # Check for any .cpp.h files
-    cpp_h_files = list(rnbo_dir.glob("*.cpp.h"))
+    cpp_h_files = [name for name in names if name.endswith(".cpp.h")]
     if cpp_h_files:
-        return "wrong_name", f"RNBO export found but wrong name: {cpp_h_files[0].name} (should be {module_slug}.cpp.h)"
+        return "wrong_name", f"RNBO export found but wrong name: {cpp_h_files[0]} (should be {module_slug}.cpp.h)"
     
     # Check if directory is empty
-    if not any(rnbo_dir.iterdir()):
+    if not names:
         return "no_export", "RNBO directory exists but no export files found"
     
     # Check for common incorrect export filenames
-    incorrect_cpp = rnbo_dir / f"{module_slug}.cpp"
-    if incorrect_cpp.exists():
+    if f"{module_slug}.cpp" in names:
         return "wrong_extension", f"Found {module_slug}.cpp but need {module_slug}.cpp.h - incorrect export format from Max"
     
     # Check for any .cpp files (without .h)
-    cpp_files = list(rnbo_dir.glob("*.cpp"))
+    cpp_files = [name for name in names if name.endswith(".cpp")]
     if cpp_files:
-        return "wrong_extension", f"Found .cpp file: {cpp_files[0].name} but need .cpp.h - check Max export settings"
+        return "wrong_extension", f"Found .cpp file: {cpp_files[0]} but need .cpp.h - check Max export settings"
     
     # Check for other common files
-    files_found = list(rnbo_dir.iterdir())
-    if files_found:
-        file_names = [f.name for f in files_found]
-        return "unknown_files", f"RNBO directory contains: {', '.join(file_names)} but missing {module_slug}.cpp.h"
+    return "unknown_files", f"RNBO directory contains: {', '.join(names)} but missing {module_slug}.cpp.h"
+
+def check_meta_header(module_slug):
+    """Regenerate the module metadata header if description.json has changed
+    
+    Returns 'updated', 'current', 'missing' or an error message.
+    """
+    rnbo_dir = Path.cwd() / "VcvModules" / "src" / f"{module_slug}-rnbo"
+    try:
+        status, header_path = generate_meta_header(rnbo_dir, module_slug)
+    except (ValueError, json.JSONDecodeError) as e:
+        return f"error: {e}"
+    return status
+
+def analysis_target():
+    """Sizes the exports are estimated for: the MetaModule, with its build profile's precision"""
+    profile = read_profile(METAMODULE) or DEFAULT_PROFILES[METAMODULE]
+    src_dir = Path.cwd() / "VcvModules" / "src"
+    return {
+        "profile": profile,
+        "number_size": 4 if 'RNBO_USE_FLOAT32' in PROFILES.get(profile, ('', []))[1] else 8,
+        "pointer_size": METAMODULE_POINTER_SIZE,
+        "list_size": (read_plugin_list_size(src_dir) or read_define(src_dir / "rnbo_config.hpp", 'RNBO_FIXEDLISTSIZE')
+                      or DEFAULT_LIST_SIZE),
+    }
+
+def analyze_module(module_slug, target):
+    """Estimated memory and dsp cost of the module's export (see rnbotool/analysis.py), None if unreadable"""
+    src_dir = Path.cwd() / "VcvModules" / "src"
+    block_size = read_define(src_dir / f"{module_slug}.hpp", 'MODULE_BLOCK_SIZE') or 1
+    try:
+        analysis = analyze_export(src_dir / f"{module_slug}-rnbo" / f"{module_slug}.cpp.h", block_size,
+                                  target['number_size'], target['pointer_size'],
+                                  target['list_size'], DEFAULT_QUEUE_SIZE)
+    except OSError:
+        return None
+    if analysis is not None:
+        analysis['block_size'] = block_size
+    return analysis
+
+def check_sizes_header(module_slug, analysis):
+    """Regenerate the module's queue and list sizes header from its export analysis
+
+    Returns (status, sizes) with status 'updated', 'current' or an error message,
+    sizes define -> (value, source, note) as now in the header.
+    """
+    rnbo_dir = Path.cwd() / "VcvModules" / "src" / f"{module_slug}-rnbo"
+    try:
+        status, header_path = generate_sizes_header(rnbo_dir, module_slug, analysis)
+    except OSError as e:
+        return f"error: {e}", {}
+    return status, read_sizes_header(header_path)
+
+def module_cache_key(module_slug, src_entries, target):
+    """What a module's status depends on: its source, the RNBO directory listing, the generated headers,
+    and for the analysis the export, the module header, rnbo_config.hpp and the MetaModule target"""
+    src_dir = Path.cwd() / "VcvModules" / "src"
+    rnbo_dir = src_dir / f"{module_slug}-rnbo"
+    return [
+        f"{module_slug}.cpp" in src_entries,
+        mtime_ns(src_entries.get(f"{module_slug}-rnbo")),
+        mtime_ns(rnbo_dir / "description.json"),
+        mtime_ns(rnbo_dir / f"{module_slug}Meta.h"),
+        mtime_ns(sizes_header_path(rnbo_dir, module_slug)),
+        mtime_ns(rnbo_dir / f"{module_slug}.cpp.h"),
+        mtime_ns(src_entries.get(f"{module_slug}.hpp")),
+        mtime_ns(src_entries.get("rnbo_config.hpp")),
+        target,
+    ]
+
+def scan_module(module_slug, src_entries, cached, target):
+    """Status of one module, reusing the cached result if nothing it depends on changed"""
+    key = module_cache_key(module_slug, src_entries, target)
+    if cached and cached.get('key') == key:
+        result = dict(cached['result'])
+        for field in ('meta', 'sizes_status'):
+            if result.get(field) == 'updated':
+                result[field] = 'current'
+        return key, result
+    
+    status, message = check_module_status(module_slug, src_entries)
+    meta = check_meta_header(module_slug) if status == "complete" else None
+    analysis = analyze_module(module_slug, target) if status == "complete" else None
+    sizes_status, sizes = None, {}
+    if analysis is not None:
+        sizes_status, sizes = check_sizes_header(module_slug, analysis)
+        if QUEUE in sizes:
+            analysis = resize_queue(analysis, sizes[QUEUE][0])
+    if 'updated' in (meta, sizes_status):
+        # a header was just written, so key on its new mtime
+        key = module_cache_key(module_slug, src_entries, target)
+    return key, {"slug": module_slug, "status": status, "message": message, "meta": meta, "analysis": analysis,
+                 "sizes_status": sizes_status, "sizes": {define: list(value) for define, value in sizes.items()}}
+
+def load_status_cache():
+    try:
+        with open(STATUS_CACHE_PATH, 'r') as f:
+            cache = json.load(f)
+        if cache.get('version') == STATUS_CACHE_VERSION:
+            return cache.get('modules', {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_status_cache(modules):
+    content = json.dumps({"version": STATUS_CACHE_VERSION, "modules": modules}, indent=1, sort_keys=True)
+    try:
+        write_if_changed(STATUS_CACHE_PATH, content)
+    except OSError:
+        # the cache is only an optimisation
+        pass
+
+def scan_project_status(use_cache=True):
+    """Status of every module in plugin.json, scanned in parallel
+    
+    Returns None if there is no plugin, otherwise a list of per module results
+    (slug, status, message, meta, missing) in plugin.json order.
+    """
+    project = Project()
+    if not project.has_plugin():
+        return None
+    
+    modules = get_modules_from_project(project)
+    slugs = [module.get('slug', 'unknown') for module in modules]
+    
+    src_entries = scan_dir(project.src_dir)
+    cache = load_status_cache() if use_cache else {}
+    target = analysis_target()
+    
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4)) as pool:
+        scanned = list(pool.map(lambda slug: scan_module(slug, src_entries, cache.get(slug), target), slugs))
+    
+    results = []
+    new_cache = {}
+    for slug, (key, result) in zip(slugs, scanned):
+        new_cache[slug] = {"key": key, "result": result}
+        result = dict(result)
+        result['missing'] = check_module_registration(project, slug) if result['status'] == "complete" else []
+        results.append(result)
+    
+    # cost relative to the most expensive module, 100 for that module
+    scores = [result['analysis']['score'] for result in results if result.get('analysis')]
+    for result in results:
+        if result.get('analysis'):
+            result['analysis'] = dict(result['analysis'],
+                                      relative_cost=round(100 * result['analysis']['score'] / max(scores)) if max(scores) else 0)
+    
+    # the plugin's lists are sized for the module that needs the largest
+    generate_plugin_sizes(project.src_dir, project.modules_on_disk())
+    
+    if use_cache:
+        save_status_cache(new_cache)
+    return results
+
+# what to do about each module status
+STATUS_ADVICE = {
+    "missing_source": ("[ERROR]", "Run 'python3 scripts/createModule.py' to recreate"),
+    "missing_rnbo_dir": ("[ERROR]", "Run 'python3 scripts/createModule.py' to recreate"),
+    "no_export": ("[WARNING] ", "Export RNBO patch from Max to VcvModules/src/{slug}-rnbo/"),
+    "wrong_name": ("[WARNING] ", "Re-export with correct name '{slug}.cpp.h'"),
+    "wrong_extension": ("[WARNING] ", "Re-export from Max using 'C++ Code Export' format (not 'Audio Unit')"),
+    "unknown_files": ("[WARNING] ", "Check RNBO export directory and re-export as '{slug}.cpp.h'"),
+}
+
+def module_issues(result):
+    """Issues (as advice strings) for a module result"""
+    slug = result['slug']
+    if result['status'] != "complete":
+        advice = STATUS_ADVICE.get(result['status'], STATUS_ADVICE["unknown_files"])[1]
+        return [f"Module {slug}: {advice.format(slug=slug)}"]
+    if result['missing']:
+        return [f"Module {slug}: Remove and re-create it with removeModule.py/createModule.py, or add the missing entries"]
+    return []
+
+def describe_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}M"
+    return f"{size / 1024:.1f}k" if size >= 1024 else f"{size} bytes"
+
+def print_module_sizes(result):
+    """The module's queue and list sizes (scripts/setSizes.py), and where they came from"""
+    slug, status, sizes = result['slug'], result.get('sizes_status'), result.get('sizes') or {}
+    if status is None:
+        return
+    if status not in ('updated', 'current') or not all(define in sizes for define in (QUEUE, LIST)):
+        print(f"   [WARNING]  Could not generate {slug}Sizes.h: {status}")
+        return
+    described = ', '.join(f"{name} {sizes[define][0]} ({sizes[define][1]})"
+                          for name, define in (("queue", QUEUE), ("lists", LIST)))
+    if status == 'updated':
+        print(f"   [OK] Generated {slug}Sizes.h: {described}")
+    else:
+        print(f"   [PASS] {slug}Sizes.h: {described}")
+
+def print_module_analysis(analysis):
+    """Estimated memory and dsp cost, with a warning for modules too large for the MetaModule"""
+    print(f"   [NOTE] Estimated MetaModule RAM: {describe_size(analysis['ram_bytes'])} "
+          f"(state {describe_size(analysis['state_bytes'])}, buffers {describe_size(analysis['heap_bytes'])} "
+          f"in {analysis['heap_allocations']} allocation(s), signals {describe_size(analysis['signal_bytes'])})")
+    if analysis['instances']:
+        print(f"   [NOTE] Subpatcher instances: "
+              f"{', '.join(f'{name} x{count}' for name, count in analysis['instances'].items())}")
+    print(f"   [NOTE] Per sample: {describe_ops(analysis['ops_per_sample'])} in {analysis['sample_loops']} loop(s), "
+          f"cost {analysis['score']} ({analysis['relative_cost']}% of the most expensive module)")
+    if analysis['unsized_buffers']:
+        print(f"   [WARNING]  Buffer sizes not estimated (not counted): {', '.join(analysis['unsized_buffers'])}")
+    if analysis['ram_bytes'] > METAMODULE_RAM_WARNING:
+        print(f"   [WARNING]  Over {describe_size(METAMODULE_RAM_WARNING)} per instance, likely too large for the MetaModule: "
+              "check delay and buffer sizes, and scripts/footprint.py after a build")
+
+def legacy_build_issues():
+    """Build files that do not include the generated module lists"""
+    return [f"{path} does not include the generated module lists or build profile: re-run 'python3 scripts/createPlugin.py'"
+            for path in Project().legacy_build_files()]
+
+def build_profiles():
+    """The RNBO build profile of each target (None if not selected)"""
+    return {target: read_profile(target) for target in TARGETS}
+
+def print_module_result(result):
+    slug = result['slug']
+    print(f"\n[CHECK] Checking module: {slug}")
+    
+    if result['status'] != "complete":
+        tag = STATUS_ADVICE.get(result['status'], STATUS_ADVICE["unknown_files"])[0]
+        print(f"   {tag} {result['message']}")
+        return
     
-    return "unknown_files", f"RNBO directory contains files but no .cpp.h export"
+    print(f"   [PASS] {result['message']}")
+    meta = result['meta']
+    if meta == 'missing':
+        print(f"   [WARNING]  No description.json in export, {slug}Meta.h not generated (re-export from Max)")
+    elif meta == 'updated':
+        print(f"   [OK] Generated {slug}Meta.h")
+    elif meta == 'current':
+        print(f"   [PASS] {slug}Meta.h up to date")
+    else:
+        print(f"   [WARNING]  Could not generate {slug}Meta.h: {meta}")
+    if result['missing']:
+        print(f"   [WARNING]  Module not registered in: {', '.join(result['missing'])}")
+    print_module_sizes(result)
+    if result.get('analysis'):
+        print_module_analysis(result['analysis'])
 
-def check_project_status():
+def check_project_status(use_cache=True):
     """Check current project status and provide guidance"""
     print("\n[TARGET] Checking Project Status")
     print("=" * 50)
     
     # Check if plugin exists
-    plugin_exists, plugin_json_path = check_plugin_exists()
+    results = scan_project_status(use_cache)
     
-    if not plugin_exists:
+    if results is None:
         print("[ERROR] No plugin found")
         print("\n[NEXT] Next step: Create a plugin")
         print("   Run: python3 scripts/createPlugin.py")
-        return
+        return False
     
     print("[PASS] Plugin configuration found")
     
-    # Get modules from plugin.json
-    modules = get_modules_from_plugin_json(plugin_json_path)
-    
-    if not modules:
+    if not results:
         print("[ERROR] No modules defined in plugin")
         print("\n[NEXT] Next step: Create a module")
         print("   Run: python3 scripts/createModule.py")
-        return
-    
-    print(f"[PASS] Found {len(modules)} module(s) in plugin configuration")
-    
-    # Check each module
-    all_complete = True
-    issues = []
-    
-    for module in modules:
-        module_slug = module.get('slug', 'unknown')
-        print(f"\n[CHECK] Checking module: {module_slug}")
-        
-        status, message = check_module_status(module_slug)
-        
-        if status == "complete":
-            print(f"   [PASS] {message}")
-        elif status == "missing_source":
-            print(f"   [ERROR] {message}")
-            issues.append(f"Module {module_slug}: Run 'python3 scripts/createModule.py' to recreate")
-            all_complete = False
-        elif status == "missing_rnbo_dir":
-            print(f"   [ERROR] {message}")
-            issues.append(f"Module {module_slug}: Run 'python3 scripts/createModule.py' to recreate")
-            all_complete = False
-        elif status == "no_export":
-            print(f"   [WARNING]  {message}")
-            issues.append(f"Module {module_slug}: Export RNBO patch from Max to VcvModules/src/{module_slug}-rnbo/")
-            all_complete = False
-        elif status == "wrong_name":
-            print(f"   [WARNING]  {message}")
-            issues.append(f"Module {module_slug}: Re-export with correct name '{module_slug}.cpp.h'")
-            all_complete = False
-        elif status == "wrong_extension":
-            print(f"   [WARNING]  {message}")
-            issues.append(f"Module {module_slug}: Re-export from Max using 'C++ Code Export' format (not 'Audio Unit')")
-            all_complete = False
-        else:
-            print(f"   [WARNING]  {message}")
-            issues.append(f"Module {module_slug}: Check RNBO export directory and re-export as '{module_slug}.cpp.h'")
-            all_complete = False
+        return False
     
-    if all_complete:
+    print(f"[PASS] Found {len(results)} module(s) in plugin configuration")
+    profiles = build_profiles()
+    print(f"[PASS] Build profiles: VCV {profiles[VCV] or 'none'}, MetaModule {profiles[METAMODULE] or 'none'}"
+          " (change with scripts/setProfile.py)")
+    list_size = read_plugin_list_size(Project().src_dir)
+    if list_size:
+        print(f"[PASS] Plugin list size: {list_size} (the largest module's, see scripts/setSizes.py)")
+    
+    # Report each module
+    issues = legacy_build_issues()
+    for issue in issues:
+        print(f"[WARNING]  {issue}")
+    for result in results:
+        print_module_result(result)
+        issues.extend(module_issues(result))
+    
+    if not issues:
         print(f"\n[SUCCESS] All modules are complete and ready to build!")
         print("\n[NEXT] Next steps:")
         print("   1. Build VCV Rack: cd VcvModules && make")
@@ -365,12 +593,41 @@ def check_project_status():
         print(f"\n[ERROR] Issues found with modules:")
         for i, issue in enumerate(issues, 1):
             print(f"   {i}. {issue}")
+    return not issues
+
+def print_project_status_json(use_cache=True):
+    """Project status as JSON on stdout, for scripts and hooks"""
+    results = scan_project_status(use_cache)
+    issues = legacy_build_issues() if results is not None else []
+    issues += [issue for result in (results or []) for issue in module_issues(result)]
+    status = {
+        "plugin": results is not None,
+        "modules": results or [],
+        "profiles": build_profiles() if results is not None else {},
+        "list_size": read_plugin_list_size(Project().src_dir) if results is not None else None,
+        "complete": bool(results) and not issues,
+        "issues": issues,
+    }
+    print(json.dumps(status, indent=2))
+    return status["complete"]
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Check the development environment and project status')
+    parser.add_argument('--json', action='store_true',
+                        help='Only check the project, printing module status as JSON (exit code 1 if incomplete)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Rescan every module, ignoring the status cache')
+    args = parser.parse_args()
+    use_cache = not args.no_cache
+    
     try:
         # Ensure we're in the right directory
-        project_root = ensure_run_from_base_directory()
+        project_root = ensure_run_from_base_directory("scripts/check.py")
+        
+        if args.json:
+            return 0 if print_project_status_json(use_cache) else 1
+        
         print(f"Running from project directory: {project_root}")
         
         print("\n[TEST] VCV Rack RNBO Template - Setup Checker")
@@ -381,7 +638,7 @@ def main():
         
         if env_ok:
             # Check project status
-            check_project_status()
+            check_project_status(use_cache)
         else:
             print("\n[WARNING]  Fix environment issues before checking project status.")
             return 1
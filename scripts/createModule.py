@@ -3,42 +3,45 @@
 import os
 import json
 import sys
+import argparse
 from pathlib import Path
 
-def ensure_run_from_base_directory():
-    """Ensure script is run from the project base directory"""
-    current_dir = Path.cwd()
-    
-    # Check if we're in the base directory by looking for expected files/directories
-    expected_items = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
-    
-    if not all((current_dir / item).exists() for item in expected_items):
-        print("[ERROR] This script must be run from the project base directory.")
-        print(f"Current directory: {current_dir}")
-        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
-        print("Example: python3 scripts/createModule.py")
-        sys.exit(1)
-    
-    return current_dir
+from rnbotool.files import write_if_changed
+from rnbotool.meta import generate_meta_header
+from rnbotool.sizes import generate_plugin_sizes, generate_sizes_header
+from rnbotool.profiles import METAMODULE, PROFILES, VCV, write_profile
+from rnbotool.project import Project, PLUGIN_HEADERS, PLUGIN_SOURCES, REGISTRATIONS, UI_SUFFIX, ensure_run_from_base_directory, check_plugin_exists
+from rnbotool.template import render_template
 
-def check_plugin_exists():
-    """Check that createPlugin.py has been run by looking for plugin.json and plugin-mm.json"""
-    project_root = Path.cwd()
-    vcv_plugin_json = project_root / "VcvModules" / "plugin.json"
-    mm_plugin_json = project_root / "plugin-mm.json"
-    
-    if not vcv_plugin_json.exists():
-        print("[ERROR] VcvModules/plugin.json not found.")
-        print("Please run 'python3 scripts/createPlugin.py' first to create the plugin.")
-        sys.exit(1)
-    
-    if not mm_plugin_json.exists():
-        print("[ERROR] plugin-mm.json not found.")
-        print("Please run 'python3 scripts/createPlugin.py' first to create the plugin.")
-        sys.exit(1)
-    
-    print("[OK] Found existing plugin configuration files")
-    return vcv_plugin_json, mm_plugin_json
+# block sizes supported by the module template (MODULE_BLOCK_SIZE)
+BLOCK_SIZES = [1, 4, 8, 16, 32, 64]
+DEFAULT_BLOCK_SIZE = 1
+
+# parameters are scanned every N samples (MODULE_CONTROL_DIVIDER)
+MAX_CONTROL_DIVIDER = 1024
+DEFAULT_CONTROL_DIVIDER = 32
+
+# polyphonic voices follow VCV cable channels (MODULE_MAX_VOICES), 1 = monophonic
+MAX_VOICES = 16
+DEFAULT_MAX_VOICES = 1
+
+# tail safe modules sleep after inputs and outputs are silent for this long (MODULE_SLEEP_TAIL_MS)
+DEFAULT_SLEEP_TAIL_MS = 2000
+
+# reduced internal rate for control rate patches (MODULE_RATE_DIVIDER, MODULE_MAX_RATE)
+MAX_RATE_DIVIDER = 64
+DEFAULT_RATE_DIVIDER = 1
+DEFAULT_MAX_RATE = 0
+
+def read_input(prompt, default=""):
+    """Read a line from the user, returning default when empty or when stdin is exhausted"""
+    try:
+        value = input(prompt).strip()
+    except EOFError:
+        # scripted runs (addDemo.py, test.py) may not supply optional answers
+        print()
+        return default
+    return value if value else default
 
 def get_module_slug():
     """Prompt user for module slug with validation"""
@@ -49,23 +52,34 @@ def get_module_slug():
     while True:
         module_slug = input("Enter module slug (e.g., 'Reverb', 'MultiFilter', 'MyDelay'): ").strip()
         
-        if not module_slug:
-            print("[ERROR] Module slug is required!")
-            continue
-        
-        # Validate slug - only letters, numbers, and underscores
-        if not module_slug.replace('_', '').isalnum():
-            print("[ERROR] Module slug can only contain letters, numbers, and underscores (no spaces or special characters)")
-            print("Examples: 'Reverb', 'MultiFilter', 'My_Delay'")
-            continue
-        
-        # Additional check to ensure it starts with a letter (good C++ practice)
-        if not module_slug[0].isalpha():
-            print("[ERROR] Module slug should start with a letter")
+        error = validate_module_slug(module_slug)
+        if error:
+            print(f"[ERROR] {error}")
+            if module_slug:
+                print("Examples: 'Reverb', 'MultiFilter', 'My_Delay'")
             continue
             
         return module_slug
 
+def validate_module_slug(module_slug):
+    """Return an error message if the module slug is not valid, otherwise None"""
+    if not module_slug:
+        return "Module slug is required!"
+    
+    # Validate slug - only letters, numbers, and underscores
+    if not module_slug.replace('_', '').isalnum():
+        return "Module slug can only contain letters, numbers, and underscores (no spaces or special characters)"
+    
+    # Additional check to ensure it starts with a letter (good C++ practice)
+    if not module_slug[0].isalpha():
+        return "Module slug should start with a letter"
+    
+    # plugin sources share VcvModules/src with the modules
+    if f"{module_slug}.cpp" in PLUGIN_SOURCES or f"{module_slug}.hpp" in PLUGIN_HEADERS:
+        return f"Module slug '{module_slug}' is reserved for a plugin source file"
+    
+    return None
+
 def get_module_name():
     """Prompt user for module name (user-facing display name)"""
     print("\nNow enter the module name - this is the user-facing display name.")
@@ -78,8 +92,8 @@ def get_module_name():
     
     return module_name
 
-def select_panel():
-    """Present user with list of available panels and let them choose"""
+def get_panel_files():
+    """List available panels in VcvModules/res, sorted by name"""
     project_root = Path.cwd()
     res_dir = project_root / "VcvModules" / "res"
     
@@ -97,6 +111,11 @@ def select_panel():
     
     # Sort by name for consistent ordering
     svg_files.sort(key=lambda x: x.name.lower())
+    return svg_files
+
+def select_panel():
+    """Present user with list of available panels and let them choose"""
+    svg_files = get_panel_files()
     
     print("\nAvailable panels:")
     for i, svg_file in enumerate(svg_files, 1):
@@ -123,46 +142,200 @@ def select_panel():
     print(f"Selected panel: {selected_panel}")
     return selected_panel
 
-def copy_and_process_template(module_name, module_slug, panel_filename):
-    """Copy module.cpp to MOD.cpp and replace __MOD__, __MODNAME__, and __PANEL__ placeholders"""
+def get_module_options():
+    """Prompt user for processing options, enter (or end of input) accepts the defaults"""
+    print("\nProcessing options (press enter to accept the default)")
+    print("RNBO processes audio in blocks; larger blocks use less CPU but add one block of latency.")
+    
+    block_size = DEFAULT_BLOCK_SIZE
+    while True:
+        choice = read_input(f"Block size in samples ({'/'.join(str(b) for b in BLOCK_SIZES)}) [{DEFAULT_BLOCK_SIZE}]: ",
+                            str(DEFAULT_BLOCK_SIZE))
+        if choice.isdigit() and int(choice) in BLOCK_SIZES:
+            block_size = int(choice)
+            break
+        print(f"Please enter one of: {', '.join(str(b) for b in BLOCK_SIZES)}")
+    
+    print(f"Block size: {block_size} samples (latency {block_size} samples)")
+    
+    print("Parameters (knobs) are checked for changes at control rate, every N samples.")
+    control_divider = DEFAULT_CONTROL_DIVIDER
+    while True:
+        choice = read_input(f"Control rate divider (1-{MAX_CONTROL_DIVIDER}) [{DEFAULT_CONTROL_DIVIDER}]: ",
+                            str(DEFAULT_CONTROL_DIVIDER))
+        if choice.isdigit() and 1 <= int(choice) <= MAX_CONTROL_DIVIDER:
+            control_divider = int(choice)
+            break
+        print(f"Please enter a number between 1 and {MAX_CONTROL_DIVIDER}")
+    
+    print(f"Control rate: parameters scanned every {control_divider} samples")
+    
+    print("Polyphonic modules run one RNBO instance per cable channel, up to the maximum voices.")
+    print("Every voice is created with the module and takes its memory, whether cables use it or not.")
+    max_voices = DEFAULT_MAX_VOICES
+    while True:
+        choice = read_input(f"Maximum voices (1 = monophonic, up to {MAX_VOICES}) [{DEFAULT_MAX_VOICES}]: ",
+                            str(DEFAULT_MAX_VOICES))
+        if choice.isdigit() and 1 <= int(choice) <= MAX_VOICES:
+            max_voices = int(choice)
+            break
+        print(f"Please enter a number between 1 and {MAX_VOICES}")
+    
+    print("Voices: monophonic" if max_voices == 1 else f"Voices: polyphonic, up to {max_voices}")
+    
+    print("Tail safe patches stay silent without input (e.g. effects, not oscillators or sequencers),")
+    print("so they can sleep once inputs and outputs have been silent for a while.")
+    tail_safe = read_input("Is this patch tail safe? (y/N): ", "n").lower() in ['y', 'yes']
+    sleep_tail_ms = DEFAULT_SLEEP_TAIL_MS
+    if tail_safe:
+        while True:
+            choice = read_input(f"Sleep after silence of (ms) [{DEFAULT_SLEEP_TAIL_MS}]: ", str(DEFAULT_SLEEP_TAIL_MS))
+            if choice.isdigit() and int(choice) > 0:
+                sleep_tail_ms = int(choice)
+                break
+            print("Please enter a time in milliseconds")
+        print(f"Auto sleep: when unpatched, or after {sleep_tail_ms}ms of silence")
+    else:
+        print("Auto sleep: when unpatched")
+    
+    print("Control rate patches (LFOs, envelopes, sequencers) can run at a reduced internal sample rate.")
+    rate_divider = DEFAULT_RATE_DIVIDER
+    while True:
+        choice = read_input(f"Internal rate divider (engine rate / N, 1-{MAX_RATE_DIVIDER}) [{DEFAULT_RATE_DIVIDER}]: ",
+                            str(DEFAULT_RATE_DIVIDER))
+        if choice.isdigit() and 1 <= int(choice) <= MAX_RATE_DIVIDER:
+            rate_divider = int(choice)
+            break
+        print(f"Please enter a number between 1 and {MAX_RATE_DIVIDER}")
+    max_rate = DEFAULT_MAX_RATE
+    while True:
+        choice = read_input(f"Maximum internal rate in Hz (0 = no limit, e.g. 48000) [{DEFAULT_MAX_RATE}]: ",
+                            str(DEFAULT_MAX_RATE))
+        if choice.isdigit():
+            max_rate = int(choice)
+            break
+        print("Please enter a sample rate in Hz, or 0")
+    rate_interpolate = True
+    if rate_divider > 1 or max_rate > 0:
+        rate_interpolate = read_input("Interpolate outputs, rather than hold? (Y/n): ", "y").lower() in ['y', 'yes']
+        limit = f", at most {max_rate}Hz" if max_rate > 0 else ""
+        mode = "interpolated" if rate_interpolate else "held"
+        print(f"Internal rate: engine rate / {rate_divider}{limit}, outputs {mode}")
+    else:
+        print("Internal rate: engine rate")
+    
+    return {
+        "block_size": block_size,
+        "control_divider": control_divider,
+        "max_voices": max_voices,
+        "tail_safe": tail_safe,
+        "sleep_tail_ms": sleep_tail_ms,
+        "rate_divider": rate_divider,
+        "max_rate": max_rate,
+        "rate_interpolate": rate_interpolate
+    }
+
+def get_default_module_options():
+    """Processing options used when the user (or a manifest) does not give them"""
+    return {
+        "block_size": DEFAULT_BLOCK_SIZE,
+        "control_divider": DEFAULT_CONTROL_DIVIDER,
+        "max_voices": DEFAULT_MAX_VOICES,
+        "tail_safe": False,
+        "sleep_tail_ms": DEFAULT_SLEEP_TAIL_MS,
+        "rate_divider": DEFAULT_RATE_DIVIDER,
+        "max_rate": DEFAULT_MAX_RATE,
+        "rate_interpolate": True
+    }
+
+def validate_module_options(options):
+    """Merge options over the defaults and check them against the same limits as the prompts"""
+    module_options = get_default_module_options()
+    unknown = set(options) - set(module_options)
+    if unknown:
+        raise ValueError(f"unknown option(s): {', '.join(sorted(unknown))}")
+    module_options.update(options)
+    
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    
+    if module_options['block_size'] not in BLOCK_SIZES:
+        raise ValueError(f"block_size must be one of: {', '.join(str(b) for b in BLOCK_SIZES)}")
+    if not is_int(module_options['control_divider']) or not 1 <= module_options['control_divider'] <= MAX_CONTROL_DIVIDER:
+        raise ValueError(f"control_divider must be between 1 and {MAX_CONTROL_DIVIDER}")
+    if not is_int(module_options['max_voices']) or not 1 <= module_options['max_voices'] <= MAX_VOICES:
+        raise ValueError(f"max_voices must be between 1 and {MAX_VOICES}")
+    if not is_int(module_options['sleep_tail_ms']) or module_options['sleep_tail_ms'] <= 0:
+        raise ValueError("sleep_tail_ms must be a time in milliseconds")
+    if not is_int(module_options['rate_divider']) or not 1 <= module_options['rate_divider'] <= MAX_RATE_DIVIDER:
+        raise ValueError(f"rate_divider must be between 1 and {MAX_RATE_DIVIDER}")
+    if not is_int(module_options['max_rate']) or module_options['max_rate'] < 0:
+        raise ValueError("max_rate must be a sample rate in Hz, or 0")
+    module_options['tail_safe'] = bool(module_options['tail_safe'])
+    module_options['rate_interpolate'] = bool(module_options['rate_interpolate'])
+    return module_options
+
+def copy_and_process_template(module_name, module_slug, panel_filename, module_options, overwrite=False):
+    """Copy the module templates to MOD.hpp, MOD.cpp and MOD.ui.cpp and replace __MOD__, __MODNAME__,
+    __PANEL__ and option placeholders
+
+    MOD.hpp is the header shared by the dsp (MOD.cpp, which includes the rnbo export) and the ui (MOD.ui.cpp).
+    Returns the path of MOD.cpp.
+    """
     project_root = Path.cwd()
-    template_path = project_root / "templates" / "vcv" / "src" / "module.cpp"
-    target_path = project_root / "VcvModules" / "src" / f"{module_slug}.cpp"
+    template_dir = project_root / "templates" / "vcv" / "src"
+    target_dir = project_root / "VcvModules" / "src"
+    targets = {
+        "module.hpp": target_dir / f"{module_slug}.hpp",
+        "module.cpp": target_dir / f"{module_slug}.cpp",
+        f"module{UI_SUFFIX}": target_dir / f"{module_slug}{UI_SUFFIX}",
+    }
     
-    if not template_path.exists():
-        print(f"[ERROR] Template file not found at {template_path}")
-        sys.exit(1)
+    for template_name in targets:
+        if not (template_dir / template_name).exists():
+            print(f"[ERROR] Template file not found at {template_dir / template_name}")
+            sys.exit(1)
     
-    if target_path.exists():
-        print(f"[ERROR] Module file {target_path} already exists!")
-        overwrite = input("Overwrite existing file? (y/N): ").strip().lower()
+    existing = [path for path in targets.values() if path.exists()]
+    if existing and not overwrite:
+        print(f"[ERROR] Module file {existing[0]} already exists!")
+        overwrite = input("Overwrite existing files? (y/N): ").strip().lower()
         if overwrite != 'y':
             print("Module creation cancelled.")
             sys.exit(0)
     
-    print(f"Copying template from {template_path} to {target_path}")
+    print(f"Copying templates from {template_dir} to {target_dir}")
     
-    # Read template
-    with open(template_path, 'r') as f:
-        content = f.read()
-    
-    # Replace placeholders (do longer placeholders first to avoid conflicts):
+    # Replace placeholders (in a single pass, so __MOD__ never matches inside __MODNAME__):
     # __MODNAME__ -> module name (for user-facing display)
     # __MOD__ -> module slug (for technical identifiers, filenames)  
     # __PANEL__ -> selected panel filename
-    processed_content = content.replace('__MODNAME__', module_name)
-    processed_content = processed_content.replace('__MOD__', module_slug)
-    processed_content = processed_content.replace('__PANEL__', panel_filename)
-    
-    # Ensure target directory exists
-    os.makedirs(target_path.parent, exist_ok=True)
-    
-    # Write processed content
-    with open(target_path, 'w', newline='\n') as f:
-        f.write(processed_content)
+    # __BLOCKSIZE__ -> processing block size in samples
+    # __CONTROLDIVIDER__ -> parameter scan interval in samples
+    # __MAXVOICES__ -> maximum polyphonic voices
+    # __TAILSAFE__, __SLEEPTAILMS__ -> auto sleep on silence
+    # __RATEDIVIDER__, __MAXRATE__, __RATEINTERPOLATE__ -> reduced internal rate
+    values = {
+        '__MODNAME__': module_name,
+        '__MOD__': module_slug,
+        '__PANEL__': panel_filename,
+        '__BLOCKSIZE__': module_options['block_size'],
+        '__CONTROLDIVIDER__': module_options['control_divider'],
+        '__MAXVOICES__': module_options['max_voices'],
+        '__TAILSAFE__': 1 if module_options['tail_safe'] else 0,
+        '__SLEEPTAILMS__': module_options['sleep_tail_ms'],
+        '__RATEDIVIDER__': module_options['rate_divider'],
+        '__MAXRATE__': module_options['max_rate'],
+        '__RATEINTERPOLATE__': 1 if module_options['rate_interpolate'] else 0,
+    }
     
-    print(f"[OK] Created module source file: {target_path}")
-    return target_path
+    # Write processed content (an identical existing file is left untouched)
+    for template_name, target_path in targets.items():
+        if write_if_changed(target_path, render_template(template_dir / template_name, values)):
+            print(f"[OK] Created module source file: {target_path}")
+        else:
+            print(f"[OK] Module source file unchanged: {target_path}")
+    return targets["module.cpp"]
 
 def create_rnbo_directory(module_slug):
     """Create MOD-rnbo subdirectory"""
@@ -177,187 +350,31 @@ def create_rnbo_directory(module_slug):
     
     return rnbo_dir
 
-def update_plugin_hpp(module_slug):
-    """Add extern Model* modelMOD; declaration to plugin.hpp"""
-    project_root = Path.cwd()
-    plugin_hpp_path = project_root / "VcvModules" / "src" / "plugin.hpp"
-    
-    if not plugin_hpp_path.exists():
-        print(f"[ERROR] {plugin_hpp_path} not found!")
-        return False
-    
-    # Read current content
-    with open(plugin_hpp_path, 'r') as f:
-        content = f.read()
-    
-    # Check if model declaration already exists
-    model_declaration = f"extern Model* model{module_slug};"
-    if model_declaration in content:
-        print(f"[OK] Model declaration for {module_slug} already exists in plugin.hpp")
-        return True
-    
-    # Find the best insertion point: after existing model declarations or at the end
-    lines = content.split('\n')
-    insert_position = -1
-    
-    # Look for existing model declarations first
-    for i, line in enumerate(lines):
-        if line.strip().startswith('extern Model* model') and line.strip().endswith(';'):
-            insert_position = i + 1
-    
-    # If no existing model declarations, add at the end of the file
-    if insert_position == -1:
-        # Remove any trailing empty lines and add at the very end
-        while lines and lines[-1].strip() == '':
-            lines.pop()
-        insert_position = len(lines)
-    
-    # Insert the new declaration
-    lines.insert(insert_position, model_declaration)
-    
-    # Write back to file
-    with open(plugin_hpp_path, 'w', newline='\n') as f:
-        f.write('\n'.join(lines))
-    
-    print(f"[OK] Added model declaration to plugin.hpp: {model_declaration}")
-    return True
-
-def update_plugin_cpp(module_slug):
-    """Add p->addModel(modelMOD); to plugin.cpp"""
-    project_root = Path.cwd()
-    plugin_cpp_path = project_root / "VcvModules" / "src" / "plugin.cpp"
-    
-    if not plugin_cpp_path.exists():
-        print(f"[ERROR] {plugin_cpp_path} not found!")
-        return False
-    
-    # Read current content
-    with open(plugin_cpp_path, 'r') as f:
-        content = f.read()
-    
-    # Check if model is already added
-    model_add = f"p->addModel(model{module_slug});"
-    if model_add in content:
-        print(f"[OK] Model {module_slug} already added in plugin.cpp")
-        return True
-    
-    # Find the init function and add the model before the closing brace
-    lines = content.split('\n')
-    insert_position = -1
-    in_init_function = False
-    
-    for i, line in enumerate(lines):
-        stripped_line = line.strip()
-        
-        # Check if we're in the init function
-        if 'void init(Plugin* p)' in line:
-            in_init_function = True
-            continue
-            
-        if in_init_function:
-            # Look for existing addModel calls to insert after them
-            if stripped_line.startswith('p->addModel(model') and stripped_line.endswith(');'):
-                insert_position = i + 1
-            # Look for the closing brace of the init function
-            elif stripped_line == '}':
-                insert_position = i
-                break
-    
-    if insert_position == -1:
-        print("[ERROR] Could not find appropriate location to add model in plugin.cpp")
+def update_meta_header(rnbo_dir, module_slug):
+    """Generate MODMeta.h from the RNBO export's description.json, if present"""
+    try:
+        status, header_path = generate_meta_header(rnbo_dir, module_slug)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not generate metadata header for {module_slug}: {e}")
         return False
     
-    # Insert the new addModel call with proper indentation
-    lines.insert(insert_position, f"\tp->addModel(model{module_slug});")
-    
-    # Write back to file
-    with open(plugin_cpp_path, 'w', newline='\n') as f:
-        f.write('\n'.join(lines))
-    
-    print(f"[OK] Added model to plugin.cpp: {model_add}")
-    return True
+    if status == 'updated':
+        print(f"[OK] Generated metadata header: {header_path}")
+    return status != 'missing'
 
-def update_vcv_makefile(module_slug):
-    """Add module source file to VCV Makefile"""
-    project_root = Path.cwd()
-    makefile_path = project_root / "VcvModules" / "Makefile"
-    
-    if not makefile_path.exists():
-        print(f"Warning: {makefile_path} not found! Skipping Makefile update.")
-        return False
-    
-    # Read current content
-    with open(makefile_path, 'r') as f:
-        content = f.read()
-    
-    # Check if module is already in Makefile
-    module_source = f"src/{module_slug}.cpp"
-    if module_source in content:
-        print(f"[OK] Module {module_slug} already in VCV Makefile")
-        return True
-    
-    # Replace the __MODULE_SOURCES__ placeholder or add to existing sources
-    if '__MODULE_SOURCES__' in content:
-        # Replace placeholder with the module source
-        content = content.replace('__MODULE_SOURCES__', f'{module_source} \\\n__MODULE_SOURCES__')
-    else:
-        # Find SOURCES section and add module
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if line.strip().startswith('src/plugin.cpp') and (i + 1 < len(lines)):
-                # Add after plugin.cpp line
-                lines.insert(i + 1, f'{module_source} \\')
-                break
-    
-        content = '\n'.join(lines)
-    
-    # Write back to file
-    with open(makefile_path, 'w', newline='\n') as f:
-        f.write(content)
-    
-    print(f"[OK] Added {module_source} to VCV Makefile")
-    return True
+def update_sizes_header(rnbo_dir, module_slug):
+    """Generate MODSizes.h from the RNBO export, if present, returns True if it was written"""
+    status, sizes_path = generate_sizes_header(rnbo_dir, module_slug)
+    if status == 'updated':
+        print(f"[OK] Generated queue and list sizes: {sizes_path}")
+    return status == 'updated'
 
-def update_metamodule_cmake(module_slug):
-    """Add module source file to MetaModule CMakeLists.txt"""
-    project_root = Path.cwd()
-    cmake_path = project_root / "CMakeLists.txt"
-    
-    if not cmake_path.exists():
-        print(f"Warning: {cmake_path} not found! Skipping CMakeLists.txt update.")
-        return False
-    
-    # Read current content
-    with open(cmake_path, 'r') as f:
-        content = f.read()
-    
-    # Check if module is already in CMakeLists.txt
-    module_source = f"${{SOURCE_DIR}}/src/{module_slug}.cpp"
-    if module_source in content:
-        print(f"[OK] Module {module_slug} already in MetaModule CMakeLists.txt")
-        return True
-    
-    # Replace the __MODULE_SOURCES__ placeholder or add to existing sources
-    if '__MODULE_SOURCES__' in content:
-        # Replace placeholder with the module source
-        content = content.replace('__MODULE_SOURCES__', f'{module_source}\n    __MODULE_SOURCES__')
-    else:
-        # Find target_sources section and add module
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if '${SOURCE_DIR}/src/plugin.cpp' in line:
-                # Add after plugin.cpp line
-                lines.insert(i + 1, f'    {module_source}')
-                break
-        
-        content = '\n'.join(lines)
-    
-    # Write back to file
-    with open(cmake_path, 'w', newline='\n') as f:
-        f.write(content)
-    
-    print(f"[OK] Added {module_source} to MetaModule CMakeLists.txt")
-    return True
+def update_plugin_sizes():
+    """Regenerate the plugin's list size (rnbo_sizes.hpp) from the modules' sizes headers"""
+    project = Project()
+    list_size, changed = generate_plugin_sizes(project.src_dir, project.modules_on_disk())
+    if changed:
+        print(f"[OK] Plugin list size: {list_size}")
 
 def get_module_details(module_name, module_slug):
     """Prompt user for additional module details for plugin.json"""
@@ -385,110 +402,176 @@ def get_module_details(module_name, module_slug):
         "tags": tags
     }
 
-def update_plugin_json(module_slug, module_details):
-    """Add module definition to plugin.json"""
-    project_root = Path.cwd()
-    plugin_json_path = project_root / "VcvModules" / "plugin.json"
-    
-    if not plugin_json_path.exists():
-        print(f"Warning: {plugin_json_path} not found! Skipping plugin.json update.")
-        return False
-    
-    try:
-        # Read current plugin.json
-        with open(plugin_json_path, 'r') as f:
-            plugin_data = json.load(f)
-        
-        # Check if module already exists
-        modules = plugin_data.get('modules', [])
-        for existing_module in modules:
-            if existing_module.get('slug') == module_details['slug']:
-                print(f"[OK] Module with slug '{module_details['slug']}' already exists in plugin.json")
-                return True
-        
-        # Add the new module
-        modules.append(module_details)
-        plugin_data['modules'] = modules
-        
-        # Write back to file with proper formatting
-        with open(plugin_json_path, 'w', newline='\n') as f:
-            json.dump(plugin_data, f, indent=2)
+def register_modules(modules_details):
+    """Add modules to the generated modules.hpp, modules.mk and modules.cmake, plugin.json and plugin-mm.json
+    
+    All modules are added in memory, then each changed file is written once.
+    """
+    project = Project()
+    
+    for path in project.legacy_build_files():
+        print(f"Warning: {path} does not include the generated module lists or build profile, re-run createPlugin.py to update it.")
+    
+    for name in REGISTRATIONS:
+        if not project.file(name).exists:
+            print(f"Warning: {project.paths[name]} not found! Skipping {name} update.")
+    
+    for module_details in modules_details:
+        module_slug = module_details['slug']
+        already = [name for name in REGISTRATIONS if name in project.locations(module_slug)]
+        added = project.add_module(module_details)
+        failed = [name for name in REGISTRATIONS
+                  if project.file(name).exists and name not in added and name not in already]
+        
+        if already:
+            print(f"[OK] Module {module_slug} already in {', '.join(already)}")
+        if added:
+            print(f"[OK] Added module {module_slug} to {', '.join(added)}")
+        for name in failed:
+            print(f"[ERROR] Could not find appropriate location to add {module_slug} in {name}")
+    
+    for path in project.flush():
+        print(f"[OK] Updated {path}")
+    return True
+
+def load_manifest(manifest_path):
+    """Read and validate a manifest of modules, before any project file is touched
+    
+    The manifest is a JSON list of modules (or an object with a "modules" list), e.g.
+    [{"slug": "Reverb", "name": "My Reverb", "panel": "Blank10U.svg", "description": "...",
+      "tags": ["effect", "reverb"], "options": {"block_size": 16, "tail_safe": true}}]
+    Only slug is required, everything else has the same defaults as the interactive prompts.
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    
+    entries = manifest.get('modules', []) if isinstance(manifest, dict) else manifest
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{manifest_path} does not list any modules")
+    
+    panels = [svg_file.name for svg_file in get_panel_files()]
+    
+    modules = []
+    errors = []
+    slugs = set()
+    for i, entry in enumerate(entries, 1):
+        module_slug = str(entry.get('slug', '')).strip() if isinstance(entry, dict) else ''
+        label = f"Module {i} ({module_slug})" if module_slug else f"Module {i}"
+        
+        error = validate_module_slug(module_slug)
+        if error:
+            errors.append(f"{label}: {error}")
+            continue
+        if module_slug in slugs:
+            errors.append(f"{label}: duplicate slug")
+            continue
+        slugs.add(module_slug)
         
-        print(f"[OK] Added module to plugin.json:")
-        print(f"  Slug: {module_details['slug']}")
-        print(f"  Name: {module_details['name']}")
-        print(f"  Description: {module_details['description']}")
-        print(f"  Tags: {', '.join(module_details['tags'])}")
+        module_name = str(entry.get('name', '')).strip() or module_slug
+        panel_filename = entry.get('panel', panels[0])
+        if panel_filename not in panels:
+            errors.append(f"{label}: panel {panel_filename} not found in VcvModules/res/")
+            continue
         
-        return True
+        try:
+            module_options = validate_module_options(entry.get('options', {}))
+        except ValueError as e:
+            errors.append(f"{label}: {e}")
+            continue
         
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] Invalid JSON in {plugin_json_path}: {e}")
-        return False
-    except Exception as e:
-        print(f"Error updating plugin.json: {e}")
-        return False
+        tags = entry.get('tags') or ["audio", "effect"]  # Default tags
+        modules.append({
+            "panel": panel_filename,
+            "options": module_options,
+            "details": {
+                "slug": module_slug,
+                "name": module_name,
+                "description": entry.get('description') or f"RNBO {module_name} module",
+                "tags": tags
+            }
+        })
+    
+    if errors:
+        raise ValueError("Invalid manifest:\n  " + "\n  ".join(errors))
+    
+    return modules
 
-def update_plugin_mm_json(module_slug, module_details):
-    """Add module definition to plugin-mm.json"""
-    project_root = Path.cwd()
-    plugin_mm_json_path = project_root / "plugin-mm.json"
+def create_modules_from_manifest(manifest_path, overwrite=False):
+    """Create all modules listed in a manifest, updating each project file once"""
+    modules = load_manifest(manifest_path)
+    module_slugs = [module['details']['slug'] for module in modules]
     
-    if not plugin_mm_json_path.exists():
-        print(f"Warning: {plugin_mm_json_path} not found! Skipping plugin-mm.json update.")
-        return False
+    # Refuse up front, rather than stopping part way through
+    project_root = Path.cwd()
+    existing = [slug for slug in module_slugs if (project_root / "VcvModules" / "src" / f"{slug}.cpp").exists()]
+    if existing and not overwrite:
+        print(f"[ERROR] Module source files already exist for: {', '.join(existing)}")
+        print("Use --overwrite to regenerate them from the template.")
+        sys.exit(1)
     
-    try:
-        # Read current plugin-mm.json
-        with open(plugin_mm_json_path, 'r') as f:
-            plugin_data = json.load(f)
-        
-        # Check if module already exists
-        modules = plugin_data.get('MetaModuleIncludedModules', [])
-        for existing_module in modules:
-            if existing_module.get('slug') == module_details['slug']:
-                print(f"[OK] Module with slug '{module_details['slug']}' already exists in plugin-mm.json")
-                return True
-        
-        # Create MetaModule module entry
-        mm_module = {
-            "slug": module_details['slug'],
-            "name": module_details['name'],
-            "displayName": module_details['description']
-        }
-        
-        # Add the new module
-        modules.append(mm_module)
-        plugin_data['MetaModuleIncludedModules'] = modules
-        
-        # Write back to file with proper formatting
-        with open(plugin_mm_json_path, 'w', newline='\n') as f:
-            json.dump(plugin_data, f, indent=2)
-        
-        print(f"[OK] Added module to plugin-mm.json:")
-        print(f"  Slug: {mm_module['slug']}")
-        print(f"  Name: {mm_module['name']}")
-        print(f"  DisplayName: {mm_module['displayName']}")
-        
-        return True
-        
-    except json.JSONDecodeError as e:
-        print(f"[ERROR] Invalid JSON in {plugin_mm_json_path}: {e}")
-        return False
-    except Exception as e:
-        print(f"Error updating plugin-mm.json: {e}")
-        return False
+    print(f"\nCreating {len(modules)} module(s) from {manifest_path}...")
+    
+    # Module sources and RNBO directories, one per module
+    sizes_changed = False
+    for module in modules:
+        module_details = module['details']
+        copy_and_process_template(module_details['name'], module_details['slug'], module['panel'],
+                                  module['options'], overwrite=True)
+        rnbo_dir = create_rnbo_directory(module_details['slug'])
+        update_meta_header(rnbo_dir, module_details['slug'])
+        sizes_changed |= update_sizes_header(rnbo_dir, module_details['slug'])
+    
+    # Shared project files, each read and written once for all modules
+    if sizes_changed:
+        update_plugin_sizes()
+    register_modules([module['details'] for module in modules])
+    
+    print(f"\n[OK] {len(modules)} module(s) created successfully!")
+    print("\nNext steps:")
+    print("1. Export each RNBO patch to VcvModules/src/[ModuleSlug]-rnbo/")
+    print("2. Build and test your modules")
+
+def apply_profiles(vcv_profile, metamodule_profile):
+    """Select the RNBO build profiles given on the command line
+
+    Profiles apply to the whole plugin (every module shares RNBO::number), see setProfile.py.
+    """
+    for target, label, name in ((VCV, "VCV", vcv_profile), (METAMODULE, "MetaModule", metamodule_profile)):
+        if not name:
+            continue
+        if write_profile(target, name):
+            print(f"[OK] {label} build profile set to {name} (all modules)")
+        else:
+            print(f"[OK] {label} build profile unchanged ({name})")
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Add a module (or many, from a manifest) to the VCV Rack RNBO plugin')
+    parser.add_argument('--manifest', metavar='modules.json',
+                        help='Create all modules listed in a JSON manifest, without prompting')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='With --manifest, regenerate module sources that already exist')
+    parser.add_argument('--vcv-profile', choices=list(PROFILES), metavar='PROFILE',
+                        help=f"RNBO build profile of the VCV build, for all modules ({', '.join(PROFILES)})")
+    parser.add_argument('--metamodule-profile', choices=list(PROFILES), metavar='PROFILE',
+                        help='RNBO build profile of the MetaModule build, for all modules')
+    args = parser.parse_args()
+    
     try:
         # Ensure we're running from the correct directory
-        project_root = ensure_run_from_base_directory()
+        project_root = ensure_run_from_base_directory("scripts/createModule.py")
         print(f"Running from project directory: {project_root}")
         
         # Check that createPlugin.py has been run
         vcv_plugin_json, mm_plugin_json = check_plugin_exists()
         
+        # Build profiles are plugin wide, so are applied once, before any module
+        apply_profiles(args.vcv_profile, args.metamodule_profile)
+        
+        if args.manifest:
+            create_modules_from_manifest(args.manifest, args.overwrite)
+            return
+        
         # Get module slug first (with validation)
         module_slug = get_module_slug()
         
@@ -501,29 +584,24 @@ def main():
         # Get additional module details for plugin.json
         module_details = get_module_details(module_name, module_slug)
         
+        # Get processing options (optional, defaults used for scripted runs)
+        module_options = get_module_options()
+        
         print(f"\nCreating module '{module_name}' with slug '{module_slug}'...")
         
         # Copy and process template
-        module_file = copy_and_process_template(module_name, module_slug, panel_filename)
+        module_file = copy_and_process_template(module_name, module_slug, panel_filename, module_options)
         
         # Create RNBO directory
         rnbo_dir = create_rnbo_directory(module_slug)
         
-        # Update plugin.hpp to add model declaration
-        update_plugin_hpp(module_slug)
+        # Generate metadata header, if an export is already present (e.g. re-creating a module)
+        update_meta_header(rnbo_dir, module_slug)
+        if update_sizes_header(rnbo_dir, module_slug):
+            update_plugin_sizes()
         
-        # Update plugin.cpp to add model to plugin
-        update_plugin_cpp(module_slug)
-        
-        # Update build systems to include module source
-        update_vcv_makefile(module_slug)
-        update_metamodule_cmake(module_slug)
-        
-        # Add module to plugin.json
-        update_plugin_json(module_slug, module_details)
-        
-        # Add module to plugin-mm.json
-        update_plugin_mm_json(module_slug, module_details)
+        # Add model to plugin.hpp/plugin.cpp, source to the build systems, module to plugin.json/plugin-mm.json
+        register_modules([module_details])
         
         print(f"\n[OK] Module '{module_name}' created successfully!")
         print("\nNext steps:")
@@ -535,6 +613,7 @@ def main():
         print("\n\nOperation cancelled by user.")
     except Exception as e:
         print(f"[ERROR] {e}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -6,21 +6,10 @@ import json
 import sys
 from pathlib import Path
 
-def ensure_run_from_base_directory():
-    """Ensure script is run from the project base directory"""
-    current_dir = Path.cwd()
-    
-    # Check if we're in the base directory by looking for expected files/directories
-    expected_items = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
-    
-    if not all((current_dir / item).exists() for item in expected_items):
-        print("[ERROR] This script must be run from the project base directory.")
-        print(f"Current directory: {current_dir}")
-        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
-        print("Example: python3 scripts/createPlugin.py")
-        sys.exit(1)
-    
-    return current_dir
+from rnbotool.files import write_if_changed
+from rnbotool.profiles import DEFAULT_PROFILES, TARGETS, profile_path, read_profile, write_profile
+from rnbotool.project import GENERATED, Project, ensure_run_from_base_directory
+from rnbotool.template import render_template
 
 def get_script_dir():
     """Get the directory where this script is located"""
@@ -28,7 +17,7 @@ def get_script_dir():
 
 def get_project_root():
     """Get the project root directory (should be current working directory)"""
-    return ensure_run_from_base_directory()
+    return ensure_run_from_base_directory("scripts/createPlugin.py")
 
 def prompt_user_details():
     """Prompt user for plugin details"""
@@ -71,14 +60,18 @@ def prompt_user_details():
         '__AUTHOR__': author,
         '__EMAIL__': email,
         '__URL__': url,
-        '__MODULE_SOURCES__': ''  # Initially empty, modules will be added by createModule.py
     }
 
-def replace_template_placeholders(content, replacements):
-    """Replace template placeholders in content"""
-    for placeholder, value in replacements.items():
-        content = content.replace(placeholder, value)
-    return content
+def report_write(target_path, written, what):
+    """Report a generated file, noting when it was already up to date"""
+    if written:
+        print(f"[OK] Created {what} at {target_path}")
+    else:
+        print(f"[OK] {what} unchanged at {target_path}")
+
+def replace_template_placeholders(template_path, replacements):
+    """Render a template file, replacing all placeholders in a single pass"""
+    return render_template(template_path, replacements)
 
 def copy_and_process_vcv_plugin_json(replacements):
     """Copy and process VCV plugin.json template"""
@@ -88,19 +81,11 @@ def copy_and_process_vcv_plugin_json(replacements):
     
     print(f"Copying VCV plugin.json template from {template_path} to {target_path}")
     
-    # Read template
-    with open(template_path, 'r') as f:
-        content = f.read()
-    
     # Replace placeholders
-    processed_content = replace_template_placeholders(content, replacements)
+    processed_content = replace_template_placeholders(template_path, replacements)
     
-    # Write to target
-    os.makedirs(target_path.parent, exist_ok=True)
-    with open(target_path, 'w', newline='\n') as f:
-        f.write(processed_content)
-    
-    print(f"[OK] Created VCV plugin.json at {target_path}")
+    # Write to target (an identical existing file is left untouched)
+    report_write(target_path, write_if_changed(target_path, processed_content), "VCV plugin.json")
 
 def copy_and_process_metamodule_plugin_json(replacements):
     """Copy and process MetaModule plugin-mm.json template"""
@@ -110,18 +95,11 @@ def copy_and_process_metamodule_plugin_json(replacements):
     
     print(f"Copying MetaModule plugin-mm.json template from {template_path} to {target_path}")
     
-    # Read template
-    with open(template_path, 'r') as f:
-        content = f.read()
-    
     # Replace placeholders
-    processed_content = replace_template_placeholders(content, replacements)
+    processed_content = replace_template_placeholders(template_path, replacements)
     
-    # Write to target
-    with open(target_path, 'w', newline='\n') as f:
-        f.write(processed_content)
-    
-    print(f"[OK] Created MetaModule plugin-mm.json at {target_path}")
+    # Write to target (an identical existing file is left untouched)
+    report_write(target_path, write_if_changed(target_path, processed_content), "MetaModule plugin-mm.json")
 
 def copy_and_process_vcv_makefile(replacements):
     """Copy and process VCV Makefile template"""
@@ -131,19 +109,11 @@ def copy_and_process_vcv_makefile(replacements):
     
     print(f"Copying VCV Makefile template from {template_path} to {target_path}")
     
-    # Read template
-    with open(template_path, 'r') as f:
-        content = f.read()
-    
     # Replace placeholders
-    processed_content = replace_template_placeholders(content, replacements)
+    processed_content = replace_template_placeholders(template_path, replacements)
     
-    # Write to target
-    os.makedirs(target_path.parent, exist_ok=True)
-    with open(target_path, 'w', newline='\n') as f:
-        f.write(processed_content)
-    
-    print(f"[OK] Created VCV Makefile at {target_path}")
+    # Write to target (an identical existing file is left untouched)
+    report_write(target_path, write_if_changed(target_path, processed_content), "VCV Makefile")
 
 def copy_and_process_metamodule_cmake(replacements):
     """Copy and process MetaModule CMakeLists.txt template"""
@@ -153,45 +123,54 @@ def copy_and_process_metamodule_cmake(replacements):
     
     print(f"Copying MetaModule CMakeLists.txt template from {template_path} to {target_path}")
     
-    # Read template
-    with open(template_path, 'r') as f:
-        content = f.read()
-    
     # Replace placeholders
-    processed_content = replace_template_placeholders(content, replacements)
+    processed_content = replace_template_placeholders(template_path, replacements)
     
-    # Write to target
-    with open(target_path, 'w', newline='\n') as f:
-        f.write(processed_content)
-    
-    print(f"[OK] Created MetaModule CMakeLists.txt at {target_path}")
+    # Write to target (an identical existing file is left untouched)
+    report_write(target_path, write_if_changed(target_path, processed_content), "MetaModule CMakeLists.txt")
 
 def copy_vcv_plugin_sources():
-    """Copy VCV plugin.cpp and plugin.hpp templates"""
+    """Copy VCV plugin sources: plugin.cpp/hpp, the shared rnbo config and runtime, process timing and pch.hpp"""
     project_root = Path.cwd()
     
-    # Copy plugin.hpp
-    template_hpp = project_root / "templates" / "vcv" / "src" / "plugin.hpp"
-    target_hpp = project_root / "VcvModules" / "src" / "plugin.hpp"
-    
-    print(f"Copying VCV plugin.hpp template from {template_hpp} to {target_hpp}")
-    os.makedirs(target_hpp.parent, exist_ok=True)
-    with open(template_hpp, 'r') as f:
-        content = f.read()
-    with open(target_hpp, 'w', newline='\n') as f:
-        f.write(content)
-    print(f"[OK] Created VCV plugin.hpp at {target_hpp}")
-    
-    # Copy plugin.cpp
-    template_cpp = project_root / "templates" / "vcv" / "src" / "plugin.cpp"
-    target_cpp = project_root / "VcvModules" / "src" / "plugin.cpp"
-    
-    print(f"Copying VCV plugin.cpp template from {template_cpp} to {target_cpp}")
-    with open(template_cpp, 'r') as f:
-        content = f.read()
-    with open(target_cpp, 'w', newline='\n') as f:
-        f.write(content)
-    print(f"[OK] Created VCV plugin.cpp at {target_cpp}")
+    for name in ["plugin.hpp", "plugin.cpp", "rnbo_config.hpp", "rnbo_platform.hpp", "rnbo_runtime.cpp", "rnbo_allocator.hpp", "process_timing.hpp", "queue_telemetry.hpp", "pch.hpp"]:
+        template_path = project_root / "templates" / "vcv" / "src" / name
+        target_path = project_root / "VcvModules" / "src" / name
+        
+        print(f"Copying VCV {name} template from {template_path} to {target_path}")
+        with open(template_path, 'r') as f:
+            content = f.read()
+        report_write(target_path, write_if_changed(target_path, content), f"VCV {name}")
+
+def create_module_lists():
+    """Create the empty generated module lists (modules.hpp, modules.mk, modules.cmake)
+
+    These are included by plugin.cpp, the Makefile and CMakeLists.txt, and are
+    maintained by createModule.py and removeModule.py.
+    """
+    project = Project()
+    project.clear_module_lists()
+    written = project.flush()
+    for name in GENERATED:
+        path = project.paths[name]
+        if path in written:
+            print(f"[OK] Created {name} at {path}")
+        else:
+            print(f"[OK] {name} unchanged at {path}")
+
+def create_profiles():
+    """Create the RNBO build profile files (rnbo_profile.mk, rnbo_profile.cmake)
+
+    These are included by the Makefile and CMakeLists.txt, a re-run keeps the selected profiles.
+    Change them with setProfile.py.
+    """
+    for target in TARGETS:
+        name = read_profile(target) or DEFAULT_PROFILES[target]
+        path = profile_path(target)
+        if write_profile(target, name):
+            print(f"[OK] Created {path.name} ({name}) at {path}")
+        else:
+            print(f"[OK] {path.name} ({name}) unchanged at {path}")
 
 def main():
     """Main function"""
@@ -219,6 +198,8 @@ def main():
         copy_vcv_plugin_sources()
         copy_and_process_metamodule_plugin_json(replacements)
         copy_and_process_metamodule_cmake(replacements)
+        create_module_lists()
+        create_profiles()
         
         print("\n[OK] Plugin created successfully!")
         print("Next steps:")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Report the MetaModule flash and RAM used by each module.
+
+Builds the MetaModule plugin in build-footprint/ with stack usage, call graphs
+and a linker map (-DVCV_FOOTPRINT=ON), then reports for each module slug its
+code (text), constants (rodata), initialised data (data), zeroed data (bss)
+and the worst case stack of its audio path (doProcess and everything it calls
+in the module).
+
+    python3 scripts/footprint.py                    # build and report
+    python3 scripts/footprint.py --save-baseline    # ... and keep it to compare against
+    python3 scripts/footprint.py --no-build         # report the last footprint build again
+    python3 scripts/footprint.py --json
+
+When a baseline exists (footprint-baseline.json, or --baseline FILE) the
+changes since it are listed after the report.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+from rnbotool.files import write_if_changed
+from rnbotool.footprint import OTHER, PLUGIN, SIZE_FIELDS, diff_footprints, footprint
+from rnbotool.project import Project, ensure_run_from_base_directory, check_plugin_exists
+
+BUILD_DIR = Path("build-footprint")
+DEFAULT_BASELINE = Path("footprint-baseline.json")
+FOOTPRINT_OPTION = "VCV_FOOTPRINT"
+
+def build(cmake_args):
+    """Configure and build the footprint build, returns True if it succeeded"""
+    configure = ["cmake", "-S", ".", "-B", str(BUILD_DIR), f"-D{FOOTPRINT_OPTION}=ON",
+                 # sizes are attributed per object, so every module needs its own
+                 "-DVCV_UNITY_BUILD=OFF"]
+    if os.environ.get('MSYSTEM'):
+        configure += ["-G", "MSYS Makefiles"]
+    configure += cmake_args
+    print(f"Configuring {BUILD_DIR}: {' '.join(configure)}")
+    if subprocess.run(configure).returncode != 0:
+        print("[ERROR] CMake configure failed, check the MetaModule build works: cmake -B build && cmake --build build")
+        return False
+    print(f"Building {BUILD_DIR}")
+    if subprocess.run(["cmake", "--build", str(BUILD_DIR), "--parallel"]).returncode != 0:
+        print("[ERROR] Footprint build failed")
+        return False
+    return True
+
+def kb(size):
+    return f"{size / 1024:.1f}k" if size >= 1024 else str(size)
+
+def signed_kb(size):
+    return ("+" if size > 0 else "-") + kb(abs(size))
+
+def print_report(report, slugs):
+    """Sizes per module, the plugin and the rest, largest RAM use first"""
+    modules = report['modules']
+    print(f"\nSizes from {report['source']}")
+    if report['source'] == 'objects':
+        print("[WARNING] No linker map found, sizes are of the objects before linking "
+              "(unused code not yet removed, shared templates counted in every module)")
+
+    print(f"\n{'module':<24} {'text':>9} {'rodata':>9} {'data':>9} {'bss':>9} {'flash':>9} {'ram':>9} {'stack':>7}")
+    order = sorted(slugs, key=lambda slug: -(modules[slug]['data'] + modules[slug]['bss']))
+    totals = {field: 0 for field in SIZE_FIELDS}
+    for name in order + [PLUGIN, OTHER]:
+        sizes = modules.get(name)
+        if not sizes:
+            continue
+        for field in SIZE_FIELDS:
+            totals[field] += sizes[field]
+        flash = sizes['text'] + sizes['rodata'] + sizes['data']
+        ram = sizes['data'] + sizes['bss']
+        stack = kb(sizes['stack']) if 'stack' in sizes else '-'
+        print(f"{name:<24} {kb(sizes['text']):>9} {kb(sizes['rodata']):>9} {kb(sizes['data']):>9} "
+              f"{kb(sizes['bss']):>9} {kb(flash):>9} {kb(ram):>9} {stack:>7}")
+    print(f"{'total':<24} {kb(totals['text']):>9} {kb(totals['rodata']):>9} {kb(totals['data']):>9} "
+          f"{kb(totals['bss']):>9} {kb(totals['text'] + totals['rodata'] + totals['data']):>9} "
+          f"{kb(totals['data'] + totals['bss']):>9}")
+
+    print("\nWorst case stack (audio path):")
+    for slug in order:
+        sizes = modules[slug]
+        if 'stack' not in sizes:
+            print(f"  {slug}: no stack usage files, is this a footprint build?")
+            continue
+        notes = f" ({', '.join(sizes['stack_notes'])})" if sizes['stack_notes'] else ""
+        print(f"  {slug}: {sizes['stack']} bytes{notes}")
+        print(f"      {sizes['stack_function']}")
+
+def print_changes(changes, baseline_path):
+    if not changes:
+        print(f"\n[OK] No changes since {baseline_path}")
+        return
+    print(f"\nChanges since {baseline_path}:")
+    for name, fields in changes.items():
+        described = ', '.join(f"{field} {signed_kb(after - before)} ({kb(before)} -> {kb(after)})"
+                              for field, (before, after) in fields.items())
+        print(f"  {name}: {described}")
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Report the MetaModule flash and RAM used by each module')
+    parser.add_argument('--no-build', action='store_true', help=f'Report the existing {BUILD_DIR} without building')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help=f'Baseline to compare against (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', action='store_true', help='Save this report as the baseline')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON only')
+    parser.add_argument('--cmake-arg', action='append', default=[], metavar='ARG',
+                        help='Extra CMake configure argument (e.g. -DMETAMODULE_SDK_DIR=...), repeatable')
+    args = parser.parse_args()
+
+    ensure_run_from_base_directory("scripts/footprint.py")
+    check_plugin_exists()
+
+    project = Project()
+    if not args.no_build:
+        if not project.cmake_path.exists() or FOOTPRINT_OPTION not in project.cmake_path.read_text():
+            print(f"[ERROR] CMakeLists.txt has no {FOOTPRINT_OPTION} option, re-run createPlugin.py to update it")
+            return 1
+        if not build(args.cmake_arg):
+            return 1
+    elif not BUILD_DIR.exists():
+        print(f"[ERROR] No footprint build in {BUILD_DIR}, run without --no-build first")
+        return 1
+
+    slugs = [slug for slug in project.modules_on_disk() if project.module_source_path(slug).exists()]
+    report = footprint(BUILD_DIR, slugs)
+
+    baseline_path = Path(args.baseline)
+    changes = None
+    if baseline_path.exists():
+        with open(baseline_path, 'r') as f:
+            changes = diff_footprints(report, json.load(f))
+
+    if args.json:
+        output = report
+        if changes is not None:
+            output = dict(report, changes={name: {field: {'before': before, 'after': after}
+                                                  for field, (before, after) in fields.items()}
+                                           for name, fields in changes.items()})
+        print(json.dumps(output, indent=2, sort_keys=True))
+    else:
+        print_report(report, slugs)
+        if changes is not None:
+            print_changes(changes, baseline_path)
+
+    if args.save_baseline:
+        write_if_changed(baseline_path, json.dumps(report, indent=2, sort_keys=True) + "\n")
+        print(f"[OK] Baseline saved to {baseline_path}", file=sys.stderr if args.json else sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the VCV Rack RNBO Template scripts.
+
+The scripts in scripts/ add their own directory to the import path when run,
+so modules here are imported as e.g. `from rnbotool.meta import ...`.
+"""
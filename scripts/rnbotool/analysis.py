@@ -0,0 +1,419 @@
+"""
+Estimate the memory and DSP cost of an RNBO export, without building it.
+
+The export (MOD-rnbo/MOD.cpp.h) is read a line at a time, so multi-megabyte
+exports are never held in memory. It estimates:
+
+- state: the patcher classes' member variables, as laid out for the target
+  (number and pointer sizes), times the instances of each subpatcher (voices)
+- heap: the buffers requested with requestSize() (delays, tables, buffer~)
+  and allocated in allocateDataRefs(), plus the signals prepareToProcess()
+  allocates for the block size
+- per sample operations: sin/cos/tanh/exp/pow/log... called inside the
+  per sample loops of the *_perform functions, and in the functions those
+  loops call, weighted into a cost score that compares modules with each other
+- what the patch needs from the engine: the events it can have waiting in
+  the engine queue (parameter inits, clocks, scheduled parameters) and whether
+  it passes lists around, for sizing the queue and lists (see sizes.py)
+
+Sizes written as expressions of the sample rate and block size are evaluated
+for SAMPLE_RATE and the module's block size. Expressions that cannot be
+evaluated are reported as unsized rather than guessed.
+"""
+
+import ast
+import math
+import re
+from pathlib import Path
+
+SAMPLE_RATE = 48000
+
+# RAM per module instance above which a patch is unlikely to be usable on the MetaModule,
+# a guide for spotting oversized delays and tables rather than a device limit
+METAMODULE_RAM_WARNING = 8 * 1024 * 1024
+
+# relative cost of a call, compared to a multiply-add
+OP_WEIGHTS = {
+    'sin': 20, 'cos': 20, 'tan': 25, 'asin': 25, 'acos': 25, 'atan': 25, 'atan2': 30,
+    'sinh': 25, 'cosh': 25, 'tanh': 25,
+    'exp': 20, 'expm1': 20, 'pow': 30, 'log': 20, 'log2': 20, 'log10': 20, 'log1p': 20,
+    'sqrt': 5, 'cbrt': 15,
+}
+# a per sample loop without any of the above still costs something
+LOOP_WEIGHT = 1
+
+OP_CALL = re.compile(r'(?<![\w.>])(?:rnbo_|std::)?(' + '|'.join(OP_WEIGHTS) + r')\s*\(')
+THIS_CALL = re.compile(r'this->(\w+)\s*\(')
+
+CLASS_START = re.compile(r'^\s*(?:template\s*<[^>]*>\s*)?class\s+(\w+)\s*:\s*public\s+PatcherInterfaceImpl\b')
+FUNCTION_START = re.compile(r'^(?:template\s*<[^>]*>\s*)?(?:[\w:<>,]+[\s*&]+)+(\w+)\s*\(')
+MEMBERS_START = '// member variables'
+MEMBER = re.compile(r'^\s+([\w:<>, ]+?)\s*([*&]*)\s*(\w+)\s*((?:\[\s*\w+\s*\])*)\s*(?:=\s*[^;]*)?;\s*$')
+SAMPLE_LOOP = re.compile(r'\bfor\s*\(.*;\s*\w+\s*<\s*(?:\(\w+\)\s*)?n\s*;')
+PARAM_INIT = re.compile(r'this->scheduleParamInit\(')
+SCHEDULE = re.compile(r'->(?:scheduleClockEvent|scheduleClockEventWithValue|scheduleParameterChange|scheduleParameterBang)\(')
+LIST_USE = re.compile(r'\blist\b')
+# functions every export has, whose lists and scheduling are the parameter inits
+LIST_HELPERS = {'listquicksort', 'listpartition', 'listswapelements', 'processParamInitEvents'}
+REQUEST_SIZE = re.compile(r'this->(\w+)->requestSize\((.*)\);')
+RETURN = re.compile(r'^\s*return\s+(.+);\s*$')
+STRINGS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'')
+
+ELEMENT_SIZES = {
+    'Float32BufferRef': 4, 'Float32MultiBufferRef': 4, 'Float64BufferRef': 8, 'Float64MultiBufferRef': 8,
+    'IntBufferRef': 4, 'UInt8BufferRef': 1,
+}
+CASTS = re.compile(r'\(\s*(?:Index|Int|UInt|int|long|number|SampleIndex|size_t|double|float)\s*\)')
+EVAL_FUNCTIONS = {
+    'ceil': math.ceil, 'floor': math.floor, 'trunc': math.trunc, 'round': round,
+    'max': max, 'min': min, 'abs': abs,
+    'nextpoweroftwo': lambda x: 1 << max(0, math.ceil(math.log2(max(x, 1)))),
+}
+
+def read_define(path, name):
+    """Integer value of '#define NAME value' in a header, None if missing or not a number"""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            for line in f:
+                match = re.match(rf'^\s*#define\s+{name}\s+(\d+)\b', line)
+                if match:
+                    return int(match.group(1))
+    except OSError:
+        pass
+    return None
+
+def queue_event_size(number_size, pointer_size):
+    """Bytes of one MinimalEngine::InternalEvent"""
+    event = 8 + number_size + 3 * pointer_size + 4 + 4 + 1
+    return (event + 7) // 8 * 8
+
+def engine_size(number_size, pointer_size, queue_size):
+    """Bytes of a MinimalEngine, nearly all of it the queue of queue_size events"""
+    return queue_size * queue_event_size(number_size, pointer_size) + 3 * pointer_size + 8
+
+def target_types(number_size, pointer_size, list_size, queue_size):
+    """Sizes of the RNBO types for a target"""
+    sizes = {'bool': 1, 'char': 1, 'uint8_t': 1, 'int': 4, 'float': 4, 'UInt32': 4, 'BinOpInt': 4,
+             'UBinOpInt': 4, 'int32_t': 4, 'uint32_t': 4, 'double': 8, 'UInt64': 8, 'MillisecondTime': 8,
+             'int64_t': 8, 'uint64_t': 8}
+    for name in ('number', 'SampleValue', 'Sample', 'ParameterValue', 'Tempo', 'BeatTime', 'generic'):
+        sizes[name] = number_size
+    for name in ('Index', 'UInt', 'Int', 'ParameterIndex', 'MessageIndex', 'OutletIndex', 'SignalIndex',
+                 'SampleIndex', 'SampleOffset', 'ClockId', 'DataRefIndex', 'ProbingIndex', 'MessageTag',
+                 'size_t', 'signal', 'ConstCharPointer', 'ConstByteArray'):
+        sizes[name] = pointer_size
+    # lists keep RNBO_FIXEDLISTSIZE values inline (listbase::_stackValues), plus pointers and length
+    sizes['list'] = (list_size + 2) * number_size + 4 * pointer_size
+    sizes['indexlist'] = (list_size + 2) * pointer_size + 4 * pointer_size
+    sizes['ENGINE'] = engine_size(number_size, pointer_size, queue_size)
+    # data references and buffer views, the data itself is counted as heap
+    sizes['DataRef'] = 12 * pointer_size
+    for name in ELEMENT_SIZES:
+        sizes[name] = 4 * pointer_size
+    sizes['SampleBufferRef'] = 4 * pointer_size
+    return sizes
+
+class PatcherClass:
+    """What is known about one patcher class of the export (the patch or a subpatcher)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.members = {}          # name -> (type, pointer, count)
+        self.functions = {}        # name -> FunctionInfo
+        self.requests = []         # (buffer member, size expression, channels expression)
+        self.allocations = 0       # allocateIfNeeded() calls in allocateDataRefs()
+        self.signals = 0           # resizeSignal() calls in prepareToProcess()
+        self.param_inits = 0       # scheduleParamInit() calls, one queued event each when initialised
+        self.schedules = 0         # places that queue clocks or parameter events while running
+        self.list_uses = 0         # lines using lists, outside the helpers every export has
+
+class FunctionInfo:
+    def __init__(self, name):
+        self.name = name
+        self.ops = {}              # op -> calls anywhere in the body
+        self.calls = set()         # this->f() anywhere in the body
+        self.sample_ops = {}       # op -> calls inside per sample loops
+        self.sample_calls = []     # this->f() inside per sample loops
+        self.sample_loops = 0
+        self.returns = []          # the expressions of one line 'return ...;' statements
+        self.lines = 0
+
+def code_of(line):
+    """A line without string literals and // comments, for brace counting and matching"""
+    return STRINGS.sub('""', line).split('//', 1)[0]
+
+def parse_export(path):
+    """The patcher classes of an export, read a line at a time"""
+    classes = {}
+    stack = []            # open classes, innermost last
+    in_members = False
+    depth = 0
+    function = None       # (FunctionInfo, class, depth at its start)
+    loop_depth = None     # brace depth of the per sample loop we are in
+
+    with open(path, 'r', errors='replace') as f:
+        for raw in f:
+            if raw.strip() == MEMBERS_START:
+                in_members = bool(stack)
+                continue
+            line = code_of(raw)
+            stripped = line.strip()
+
+            match = CLASS_START.match(line)
+            if match and function is None:
+                cls = classes.setdefault(match.group(1), PatcherClass(match.group(1)))
+                stack.append(cls)
+                in_members = False
+            elif in_members and stack:
+                if stripped.startswith('};'):
+                    stack.pop()
+                    in_members = False
+                else:
+                    member = MEMBER.match(line)
+                    if member:
+                        count = 1
+                        for dimension in re.findall(r'\[\s*(\w+)\s*\]', member.group(4)):
+                            count *= int(dimension) if dimension.isdigit() else 1
+                        stack[-1].members[member.group(3)] = (member.group(1).strip(), member.group(2), count)
+                depth += line.count('{') - line.count('}')
+                continue
+            elif function is None and stack and line[:1].isalpha():
+                match = FUNCTION_START.match(line)
+                if match and not stripped.endswith(';'):
+                    function = (stack[-1].functions.setdefault(match.group(1), FunctionInfo(match.group(1))),
+                                stack[-1], depth)
+
+            if function is not None:
+                info, cls, start = function
+                info.lines += 1
+                in_loop = loop_depth is not None
+                if not in_loop and info.name.endswith('_perform') and SAMPLE_LOOP.search(line):
+                    loop_depth = depth
+                    info.sample_loops += 1
+                    in_loop = True
+                for op in OP_CALL.findall(line):
+                    info.ops[op] = info.ops.get(op, 0) + 1
+                    if in_loop:
+                        info.sample_ops[op] = info.sample_ops.get(op, 0) + 1
+                for callee in THIS_CALL.findall(line):
+                    info.calls.add(callee)
+                    if in_loop:
+                        info.sample_calls.append(callee)
+                match = RETURN.match(line)
+                if match:
+                    info.returns.append(match.group(1))
+                match = REQUEST_SIZE.search(line)
+                if match:
+                    args = split_arguments(match.group(2))
+                    cls.requests.append((match.group(1), args[0] if args else '', args[1] if len(args) > 1 else '1'))
+                cls.param_inits += len(PARAM_INIT.findall(line))
+                if info.name not in LIST_HELPERS:
+                    cls.schedules += len(SCHEDULE.findall(line))
+                    if info.lines > 1 and LIST_USE.search(line):
+                        cls.list_uses += 1
+                if info.name == 'allocateDataRefs':
+                    cls.allocations += line.count('allocateIfNeeded(')
+                if info.name == 'prepareToProcess':
+                    cls.signals += line.count('resizeSignal(')
+
+            depth += line.count('{') - line.count('}')
+            if loop_depth is not None and depth <= loop_depth:
+                loop_depth = None
+            if function is not None and depth <= function[2] and '}' in line:
+                function = None
+                loop_depth = None
+    return classes
+
+def split_arguments(text):
+    """Top level comma separated arguments of a call"""
+    args, level, current = [], 0, ''
+    for ch in text:
+        if ch == ',' and level == 0:
+            args.append(current.strip())
+            current = ''
+            continue
+        level += ch in '(['
+        level -= ch in ')]'
+        current += ch
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+def evaluate(expression, cls, block_size, depth=0):
+    """Value of a size expression, None if it is not plain arithmetic of known values"""
+    if depth > 8:
+        return None
+    text = CASTS.sub('', expression)
+    text = re.sub(r'this->mstosamps\(', '(SR/1000.0)*(', text)
+    text = re.sub(r'this->samplerate\(\)|this->sr\b|\bsamplerate\b|\bsampleRate\b', 'SR', text)
+    text = re.sub(r'this->vectorsize\(\)|this->maxvs\b|this->vs\b|\bvectorsize\b|\bmaxBlockSize\b', 'VS', text)
+    text = re.sub(r'(?:this->)?rnbo_(ceil|floor|trunc|fround|abs)\(', lambda m: ('round' if m.group(1) == 'fround' else m.group(1)) + '(', text)
+    text = re.sub(r'this->(maximum|minimum)\(', lambda m: m.group(1)[:3] + '(', text)
+    text = re.sub(r'this->nextpoweroftwo\(', 'nextpoweroftwo(', text)
+
+    def inline(match):
+        called = cls.functions.get(match.group(1))
+        # only functions that are a single return of an expression, anything with branches is not guessed
+        if called is None or len(called.returns) != 1:
+            raise ValueError(match.group(1))
+        value = evaluate(called.returns[0], cls, block_size, depth + 1)
+        if value is None:
+            raise ValueError(match.group(1))
+        return f"({value})"
+
+    try:
+        text = re.sub(r'this->(\w+)\((?:[^()]|\([^()]*\))*\)', inline, text)
+        return evaluate_arithmetic(text, {'SR': SAMPLE_RATE, 'VS': block_size})
+    except (ValueError, SyntaxError, TypeError, ZeroDivisionError, OverflowError):
+        return None
+
+def evaluate_arithmetic(text, names):
+    """Evaluate numbers, names, + - * / % and EVAL_FUNCTIONS, nothing else"""
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in names:
+            return names[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = visit(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod)):
+            left, right = visit(node.left), visit(node.right)
+            return {ast.Add: lambda: left + right, ast.Sub: lambda: left - right, ast.Mult: lambda: left * right,
+                    ast.Div: lambda: left / right, ast.Mod: lambda: left % right}[type(node.op)]()
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in EVAL_FUNCTIONS
+                and not node.keywords):
+            return EVAL_FUNCTIONS[node.func.id](*[visit(arg) for arg in node.args])
+        raise ValueError(ast.dump(node))
+    return visit(ast.parse(text.strip(), mode='eval'))
+
+def class_state(cls, types, classes):
+    """(bytes, unknown member types) of one instance of a class, subpatchers excluded"""
+    size, unknown = 0, set()
+    for member, (type_name, pointer, count) in cls.members.items():
+        base = type_name.split('<')[0].split('::')[-1]
+        if pointer or base in classes:
+            size += types['signal'] * count
+        elif base in types:
+            size += types[base] * count
+        else:
+            size += types['signal'] * count
+            unknown.add(base)
+    return size, unknown
+
+def subpatchers(cls, classes):
+    """(class, instances) of the subpatchers a class owns (RNBOSubpatcher_NN* p_NN[voices])"""
+    owned = []
+    for member, (type_name, pointer, count) in cls.members.items():
+        base = type_name.split('<')[0]
+        if pointer and base in classes and base != cls.name:
+            owned.append((classes[base], count))
+    return owned
+
+def per_sample_ops(cls):
+    """op -> calls per sample of one instance of a class, and its per sample loops"""
+    memo = {}
+
+    def function_ops(name, active):
+        """every op of a function and what it calls, once per call"""
+        if name in memo:
+            return memo[name]
+        info = cls.functions.get(name)
+        if info is None or name in active:
+            return {}
+        active.add(name)
+        total = dict(info.ops)
+        for callee in info.calls:
+            for op, count in function_ops(callee, active).items():
+                total[op] = total.get(op, 0) + count
+        active.discard(name)
+        memo[name] = total
+        return total
+
+    ops, loops = {}, 0
+    for name, info in cls.functions.items():
+        if not name.endswith('_perform'):
+            continue
+        loops += info.sample_loops
+        for op, count in info.sample_ops.items():
+            ops[op] = ops.get(op, 0) + count
+        for callee in info.sample_calls:
+            for op, count in function_ops(callee, set()).items():
+                ops[op] = ops.get(op, 0) + count
+    return ops, loops
+
+def cost_score(ops, loops):
+    return sum(OP_WEIGHTS[op] * count for op, count in ops.items()) + LOOP_WEIGHT * loops
+
+def analyze_export(path, block_size=1, number_size=8, pointer_size=4, list_size=64, queue_size=128):
+    """Estimated memory and per sample cost of an export, for one module instance
+
+    Returns a dict: state_bytes, heap_bytes, heap_allocations, signal_bytes, unsized_buffers,
+    unknown_types, instances (subpatcher class -> count), ops_per_sample, sample_loops, score, ram_bytes,
+    and for sizing the engine: param_inits, schedules, list_uses, engines (queues in the state),
+    queue_size and queue_event_bytes
+    """
+    classes = parse_export(path)
+    if not classes:
+        return None
+    types = target_types(number_size, pointer_size, list_size, queue_size)
+    owned = {sub.name for cls in classes.values() for sub, _ in subpatchers(cls, classes)}
+    roots = [cls for name, cls in classes.items() if name not in owned] or list(classes.values())
+
+    result = {'state_bytes': 0, 'heap_bytes': 0, 'heap_allocations': 0, 'signal_bytes': 0,
+              'unsized_buffers': [], 'unknown_types': set(), 'instances': {}, 'ops_per_sample': {},
+              'sample_loops': 0, 'param_inits': 0, 'schedules': 0, 'list_uses': 0, 'engines': 0,
+              'queue_size': queue_size, 'queue_event_bytes': queue_event_size(number_size, pointer_size)}
+
+    def add(cls, instances, seen):
+        if cls.name in seen:
+            return
+        seen = seen | {cls.name}
+        state, unknown = class_state(cls, types, classes)
+        result['state_bytes'] += state * instances
+        result['unknown_types'] |= unknown
+        result['heap_allocations'] += cls.allocations * instances
+        result['param_inits'] += cls.param_inits * instances
+        result['schedules'] += cls.schedules * instances
+        result['list_uses'] += cls.list_uses + sum(count for type_name, pointer, count in cls.members.values()
+                                                  if type_name == 'list' and not pointer)
+        result['engines'] += sum(count for type_name, pointer, count in cls.members.values()
+                                 if type_name == 'ENGINE' and not pointer) * instances
+        result['signal_bytes'] += cls.signals * block_size * number_size * instances
+        for buffer, size, channels in cls.requests:
+            samples = evaluate(size, cls, block_size)
+            count = evaluate(channels, cls, block_size)
+            if samples is None or count is None:
+                result['unsized_buffers'].append(f"{cls.name}.{buffer}")
+                continue
+            type_name = cls.members.get(buffer, ('', '', 1))[0].split('<')[0]
+            element = ELEMENT_SIZES.get(type_name, number_size if type_name == 'SampleBufferRef' else 4)
+            result['heap_bytes'] += int(math.ceil(samples)) * max(int(count), 1) * element * instances
+        ops, loops = per_sample_ops(cls)
+        for op, count in ops.items():
+            result['ops_per_sample'][op] = result['ops_per_sample'].get(op, 0) + count * instances
+        result['sample_loops'] += loops * instances
+        for sub, count in subpatchers(cls, classes):
+            result['instances'][sub.name] = result['instances'].get(sub.name, 0) + count * instances
+            add(sub, count * instances, seen)
+
+    for cls in roots:
+        add(cls, 1, set())
+
+    result['unknown_types'] = sorted(result['unknown_types'])
+    result['score'] = cost_score(result['ops_per_sample'], result['sample_loops'])
+    result['ram_bytes'] = result['state_bytes'] + result['heap_bytes'] + result['signal_bytes']
+    return result
+
+def resize_queue(analysis, queue_size):
+    """The analysis with the engine queue resized, as when the module sets its own (MODULE_QUEUE_SIZE)"""
+    change = (queue_size - analysis['queue_size']) * analysis['queue_event_bytes'] * analysis['engines']
+    return dict(analysis, queue_size=queue_size, state_bytes=analysis['state_bytes'] + change,
+                ram_bytes=analysis['ram_bytes'] + change)
+
+def describe_ops(ops):
+    """'2 sin, 1 tanh' for the per sample op counts, most expensive first"""
+    ordered = sorted(ops.items(), key=lambda item: (-OP_WEIGHTS[item[0]] * item[1], item[0]))
+    return ', '.join(f"{count} {op}" for op, count in ordered) or "none"
@@ -0,0 +1,62 @@
+"""
+Write-if-changed output for generated files.
+
+Rewriting a file with identical content still bumps its mtime, which makes make
+recompile everything that includes plugin.hpp and CMake reconfigure. Generators
+should write through write_if_changed() so unchanged files are left alone.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+def content_hash(data):
+    """Hash of file content (str or bytes)"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def file_hash(path):
+    """Hash of a file's content, None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return content_hash(f.read())
+    except FileNotFoundError:
+        return None
+
+def write_if_changed(path, content):
+    """Write content (with \\n line endings) to path unless the file already holds exactly that
+
+    Returns True if the file was written.
+    """
+    path = Path(path)
+    data = content.encode('utf-8')
+    try:
+        # a different size means different content, no need to read the file
+        if path.stat().st_size == len(data) and file_hash(path) == content_hash(data):
+            return False
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def copy_if_changed(source, target):
+    """Copy source to target unless target already has the same content
+
+    Returns True if the file was copied.
+    """
+    source, target = Path(source), Path(target)
+    try:
+        if (target.stat().st_size == source.stat().st_size
+                and file_hash(target) == file_hash(source)):
+            return False
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(target.parent, exist_ok=True)
+    shutil.copy2(source, target)
+    return True
@@ -0,0 +1,278 @@
+"""
+Code size, RAM and stack of each module, from a MetaModule footprint build.
+
+A footprint build (CMakeLists.txt with -DVCV_FOOTPRINT=ON) leaves, next to
+each object, GCC's stack usage (.su) and call graph (.ci) files, and a linker
+map of the plugin. Sizes come from the map: every input section kept by the
+linker is attributed to the module whose object it came from, and counted
+under the output section it was placed in. Without a map, the sections of
+the module objects themselves are counted (before the linker drops unused code
+and merges templates shared by several modules).
+
+Templates and inline functions used by several modules (the RNBO engine)
+are kept once, in the first object the linker saw, so they count towards
+that module only.
+"""
+
+import re
+import struct
+from pathlib import Path
+
+SIZE_FIELDS = ['text', 'rodata', 'data', 'bss']
+
+PLUGIN = '(plugin)'  # plugin.cpp, rnbo_runtime.cpp
+OTHER = '(other)'    # sdk, libraries and linker generated sections
+PLUGIN_STEMS = {'plugin', 'rnbo_runtime'}
+
+# output sections of the plugin, by what they cost
+OUTPUT_SECTIONS = [
+    (re.compile(r'^\.(text|init|fini|plt)\b'), 'text'),
+    (re.compile(r'^\.(rodata|eh_frame|gcc_except_table|ARM\.ex(idx|tab))'), 'rodata'),
+    (re.compile(r'^\.(data|init_array|fini_array|got|dynamic|tdata)'), 'data'),
+    (re.compile(r'^\.(bss|tbss)'), 'bss'),
+]
+
+MAP_START = 'Linker script and memory map'
+MAP_OUTPUT = re.compile(r'^(\.\S+)')
+MAP_INPUT = re.compile(r'^ (\S+)\s+0x[0-9a-fA-F]+\s+0x([0-9a-fA-F]+)\s+(\S.*)$')
+MAP_INPUT_NAME = re.compile(r'^ ([.\w]\S*)$')
+MAP_INPUT_CONTINUED = re.compile(r'^\s+0x[0-9a-fA-F]+\s+0x([0-9a-fA-F]+)\s+(\S.*)$')
+MAP_ARCHIVE_MEMBER = re.compile(r'\(([^()]+)\)$')
+
+CI_NODE = re.compile(r'^node: \{ title: "([^"]*)" label: "([^"]*)"')
+CI_EDGE = re.compile(r'^edge: \{ sourcename: "([^"]*)" targetname: "([^"]*)"')
+CI_FRAME = re.compile(r'(\d+) bytes \(([\w,]+)\)')
+
+def classify_output_section(name):
+    """'text', 'rodata', 'data' or 'bss' for an output section name, None for sections not loaded"""
+    for pattern, field in OUTPUT_SECTIONS:
+        if pattern.match(name):
+            return field
+    return None
+
+def object_stem(name):
+    """Source stem of an object file name, Demo.cpp.obj -> Demo, Demo.ui.cpp.o -> Demo.ui"""
+    name = Path(name.strip()).name
+    for suffix in ('.obj', '.o', '.cpp', '.cxx', '.cc', '.c'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+def owner(stem, slugs):
+    """The module slug an object belongs to (MOD.cpp and MOD.ui.cpp), PLUGIN or OTHER"""
+    slug = stem.split('.')[0]
+    if slug in slugs:
+        return slug
+    return PLUGIN if stem in PLUGIN_STEMS else OTHER
+
+def empty_sizes():
+    return {field: 0 for field in SIZE_FIELDS}
+
+def sizes_from_map(map_path, slugs):
+    """owner -> {text, rodata, data, bss} from a GNU ld map file"""
+    sizes = {}
+    field = None
+    pending = None
+    started = False
+
+    def add(size, source):
+        if field is None:
+            return
+        member = MAP_ARCHIVE_MEMBER.search(source)
+        stem = object_stem(member.group(1) if member else source)
+        sizes.setdefault(owner(stem, slugs), empty_sizes())[field] += size
+
+    with open(map_path, 'r', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not started:
+                started = line.startswith(MAP_START)
+                continue
+            if pending is not None:
+                match = MAP_INPUT_CONTINUED.match(line)
+                pending = None
+                if match:
+                    add(int(match.group(1), 16), match.group(2))
+                    continue
+            match = MAP_OUTPUT.match(line)
+            if match:
+                field = classify_output_section(match.group(1))
+                continue
+            match = MAP_INPUT.match(line)
+            if match:
+                if not match.group(1).startswith('*'):
+                    add(int(match.group(2), 16), match.group(3))
+                continue
+            if MAP_INPUT_NAME.match(line):
+                pending = line
+    return sizes
+
+def elf_section_sizes(path):
+    """{text, rodata, data, bss} of the allocated sections of an ELF object, None if not ELF"""
+    data = Path(path).read_bytes()
+    if data[:4] != b'\x7fELF':
+        return None
+    is64 = data[4] == 2
+    endian = '<' if data[5] == 1 else '>'
+    if is64:
+        shoff, = struct.unpack_from(endian + 'Q', data, 0x28)
+        shentsize, shnum = struct.unpack_from(endian + 'HH', data, 0x3A)
+        header = endian + 'IIQQQQ'
+    else:
+        shoff, = struct.unpack_from(endian + 'I', data, 0x20)
+        shentsize, shnum = struct.unpack_from(endian + 'HH', data, 0x2E)
+        header = endian + 'IIIIII'
+
+    sizes = empty_sizes()
+    for i in range(shnum):
+        _, sh_type, flags, _, _, size = struct.unpack_from(header, data, shoff + i * shentsize)
+        if not flags & 0x2:  # SHF_ALLOC
+            continue
+        if flags & 0x4:  # SHF_EXECINSTR
+            sizes['text'] += size
+        elif sh_type == 8:  # SHT_NOBITS
+            sizes['bss'] += size
+        elif flags & 0x1:  # SHF_WRITE
+            sizes['data'] += size
+        else:
+            sizes['rodata'] += size
+    return sizes
+
+def sizes_from_objects(objects, slugs):
+    """owner -> {text, rodata, data, bss} from object files, before linking"""
+    sizes = {}
+    for path in objects:
+        object_sizes = elf_section_sizes(path)
+        if object_sizes is None:
+            continue
+        total = sizes.setdefault(owner(object_stem(path.name), slugs), empty_sizes())
+        for field in SIZE_FIELDS:
+            total[field] += object_sizes[field]
+    return sizes
+
+def read_stack_usage(su_path):
+    """function -> (bytes, qualifier) from a GCC -fstack-usage file"""
+    frames = {}
+    with open(su_path, 'r', errors='replace') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) == 3 and parts[1].isdigit():
+                function = parts[0].split(':', 3)[-1]
+                frames[function] = (int(parts[1]), parts[2])
+    return frames
+
+def read_callgraph(ci_path):
+    """(nodes, edges) from a GCC -fcallgraph-info=su file
+
+    nodes: title -> (function, bytes, qualifier), bytes None for functions of other files
+    edges: title -> [callee titles]
+    """
+    nodes, edges = {}, {}
+    with open(ci_path, 'r', errors='replace') as f:
+        for line in f:
+            match = CI_NODE.match(line)
+            if match:
+                label = match.group(2).split('\\n')
+                frame = CI_FRAME.search(label[-1])
+                nodes[match.group(1)] = (label[0], int(frame.group(1)) if frame else None,
+                                         frame.group(2) if frame else '')
+                continue
+            match = CI_EDGE.match(line)
+            if match:
+                edges.setdefault(match.group(1), []).append(match.group(2))
+    return nodes, edges
+
+def deepest_call_path(nodes, edges, root):
+    """(bytes, functions, notes) of the deepest call path from root
+
+    Calls to other files count as nothing (so it is a lower bound, noted as 'external'),
+    recursion is cut at the repeated call and noted as 'recursive', dynamic frames as 'dynamic'.
+    """
+    memo = {}
+    notes = set()
+
+    def visit(title, active):
+        if title in memo:
+            return memo[title]
+        function, frame, qualifier = nodes.get(title, (title, None, ''))
+        if frame is None:
+            notes.add('external')
+            return 0, [function]
+        if 'dynamic' in qualifier and 'bounded' not in qualifier:
+            notes.add('dynamic')
+        active.add(title)
+        best = (0, [])
+        for callee in edges.get(title, []):
+            if callee in active:
+                notes.add('recursive')
+                continue
+            best = max(best, visit(callee, active), key=lambda path: path[0])
+        active.discard(title)
+        memo[title] = (frame + best[0], [function] + best[1])
+        return memo[title]
+
+    total, path = visit(root, set())
+    return total, path, sorted(notes)
+
+def module_stack(build_dir, slug):
+    """Worst case stack of the module's audio path (doProcess), None if the build has no stack files
+
+    Returns {'stack': bytes, 'stack_function': name, 'stack_notes': [...]}, from the call graph
+    (.ci) when there is one, otherwise the largest single frame (.su) of the module dsp.
+    """
+    ci_files = sorted(Path(build_dir).rglob(f"{slug}.cpp.ci"))
+    if ci_files:
+        nodes, edges = read_callgraph(ci_files[0])
+        entry = f"{slug}::doProcess("
+        roots = [title for title, (function, frame, _) in nodes.items() if entry in function and frame is not None]
+        if roots:
+            total, path, notes = deepest_call_path(nodes, edges, roots[0])
+            return {'stack': total, 'stack_function': ' -> '.join(path), 'stack_notes': notes}
+
+    su_files = sorted(Path(build_dir).rglob(f"{slug}.cpp.su"))
+    if su_files:
+        frames = read_stack_usage(su_files[0])
+        if frames:
+            function, (size, qualifier) = max(frames.items(), key=lambda item: item[1][0])
+            notes = ['largest frame'] + (['dynamic'] if 'dynamic' in qualifier else [])
+            return {'stack': size, 'stack_function': function, 'stack_notes': notes}
+    return None
+
+def find_map(build_dir):
+    """The most recent linker map in the build directory, None if there is none"""
+    maps = [path for path in Path(build_dir).rglob('*.map') if 'CMakeFiles' not in path.parts]
+    return max(maps, key=lambda path: path.stat().st_mtime) if maps else None
+
+def find_objects(build_dir):
+    return sorted(path for pattern in ('*.obj', '*.o') for path in Path(build_dir).rglob(pattern))
+
+def footprint(build_dir, slugs):
+    """Footprint report of a build directory
+
+    {'source': map or 'objects', 'modules': {owner: {text, rodata, data, bss[, stack...]}}}
+    """
+    slugs = set(slugs)
+    map_path = find_map(build_dir)
+    if map_path:
+        sizes, source = sizes_from_map(map_path, slugs), str(map_path)
+    else:
+        sizes, source = sizes_from_objects(find_objects(build_dir), slugs), 'objects'
+
+    for slug in slugs:
+        entry = sizes.setdefault(slug, empty_sizes())
+        stack = module_stack(build_dir, slug)
+        if stack:
+            entry.update(stack)
+    return {'source': source, 'modules': sizes}
+
+def diff_footprints(current, baseline):
+    """owner -> {field: (before, after)} for every size or stack that changed"""
+    changes = {}
+    before_modules = baseline.get('modules', {})
+    for name in sorted(set(current['modules']) | set(before_modules)):
+        before = before_modules.get(name, {})
+        after = current['modules'].get(name, {})
+        for field in SIZE_FIELDS + ['stack']:
+            if before.get(field, 0) != after.get(field, 0):
+                changes.setdefault(name, {})[field] = (before.get(field, 0), after.get(field, 0))
+    return changes
@@ -0,0 +1,122 @@
+"""
+Compile-time metadata header generated from an RNBO export's description.json.
+
+The module template includes [ModuleSlug]-rnbo/[ModuleSlug]Meta.h (when present)
+so the module constructor and widget can configure parameters and ports without
+querying the patch, and the module browser preview never instantiates one.
+"""
+
+import json
+from pathlib import Path
+
+from .files import write_if_changed
+
+def meta_header_path(rnbo_dir, module_slug):
+    """Path of the generated metadata header for a module"""
+    return Path(rnbo_dir) / f"{module_slug}Meta.h"
+
+def c_string(value):
+    """Quote a python string as a C++ string literal"""
+    out = []
+    for ch in str(value):
+        if ch == '\\':
+            out.append('\\\\')
+        elif ch == '"':
+            out.append('\\"')
+        elif ch == '\n':
+            out.append('\\n')
+        elif ord(ch) < 0x20 or ord(ch) == 0x7f:
+            out.append(f"\\{ord(ch):03o}")
+        else:
+            out.append(ch)
+    return '"' + ''.join(out) + '"'
+
+def c_number(value):
+    """Format a JSON number as a C++ double literal"""
+    return repr(float(value))
+
+def render_meta_header(module_slug, description):
+    """Render the metadata header for a parsed description.json"""
+    parameters = sorted(description.get('parameters', []), key=lambda p: p.get('index', 0))
+    num_parameters = description.get('numParameters', len(parameters))
+    if num_parameters != len(parameters):
+        raise ValueError(f"description.json lists {len(parameters)} parameters but numParameters is {num_parameters}")
+    
+    lines = [
+        f"// generated from {module_slug}-rnbo/description.json by scripts/rnbotool/meta.py - do not edit",
+        "// regenerate with: python3 scripts/check.py",
+        "#pragma once",
+        "",
+        f"namespace {module_slug}_Meta {{",
+        "struct ParamMeta {",
+        "    const char* name;",
+        "    const char* displayName;",
+        "    const char* unit;",
+        "    double min;",
+        "    double max;",
+        "    double initialValue;",
+        "    int steps;",
+        "    int nEnumValues;",
+        "    const char* const* enumValues;",
+        "};",
+        "",
+        f"constexpr int numParameters = {num_parameters};",
+        f"constexpr int numInputs = {int(description.get('numInputChannels', 0))};",
+        f"constexpr int numOutputs = {int(description.get('numOutputChannels', 0))};",
+        f"constexpr int numMidiInputs = {int(description.get('numMidiInputPorts', 0))};",
+        f"constexpr int numMidiOutputs = {int(description.get('numMidiOutputPorts', 0))};",
+        "",
+    ]
+    
+    for i, param in enumerate(parameters):
+        enum_values = param.get('enumValues') or []
+        if param.get('isEnum') and enum_values:
+            values = ', '.join(c_string(v) for v in enum_values)
+            lines.append(f"constexpr const char* param{i}Enum[] = {{ {values} }};")
+    if any(p.get('isEnum') and p.get('enumValues') for p in parameters):
+        lines.append("")
+    
+    # a zero length array is not valid, so patches without parameters get a single unused entry
+    lines.append(f"constexpr ParamMeta params[{max(num_parameters, 1)}] = {{")
+    for i, param in enumerate(parameters):
+        enum_values = param.get('enumValues') or []
+        is_enum = bool(param.get('isEnum') and enum_values)
+        fields = [
+            c_string(param.get('name', '')),
+            c_string(param.get('displayName', '')),
+            c_string(param.get('unit', '')),
+            c_number(param.get('minimum', 0)),
+            c_number(param.get('maximum', 1)),
+            c_number(param.get('initialValue', 0)),
+            str(int(param.get('steps', 0))),
+            str(len(enum_values) if is_enum else 0),
+            f"param{i}Enum" if is_enum else "nullptr",
+        ]
+        lines.append(f"    {{ {', '.join(fields)} }},")
+    if not parameters:
+        lines.append('    { "", "", "", 0.0, 1.0, 0.0, 0, 0, nullptr },')
+    lines.append("};")
+    lines.append(f"}}  // namespace {module_slug}_Meta")
+    lines.append("")
+    return '\n'.join(lines)
+
+def generate_meta_header(rnbo_dir, module_slug):
+    """(Re)generate the metadata header from description.json
+    
+    Returns (status, path) where status is 'missing' (no description.json),
+    'updated' (header written) or 'current' (header already up to date).
+    """
+    rnbo_dir = Path(rnbo_dir)
+    description_path = rnbo_dir / "description.json"
+    header_path = meta_header_path(rnbo_dir, module_slug)
+    
+    if not description_path.exists():
+        return 'missing', header_path
+    
+    with open(description_path, 'r') as f:
+        description = json.load(f)
+    content = render_meta_header(module_slug, description)
+    
+    if not write_if_changed(header_path, content):
+        return 'current', header_path
+    return 'updated', header_path
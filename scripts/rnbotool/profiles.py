@@ -0,0 +1,100 @@
+"""
+RNBO build profiles, named sets of RNBO compile options for a build target.
+
+The profile of each target is kept in a generated file included by its build
+system: VcvModules/rnbo_profile.mk (FLAGS for the VCV Makefile) and
+VcvModules/rnbo_profile.cmake (compile definitions for the MetaModule
+CMakeLists.txt). The file names the profile, so it is also where the current
+selection is read back from.
+
+A profile applies to the whole plugin, not to one module: options such as
+RNBO_USE_FLOAT32 change RNBO::number, which every module shares through the
+RNBO headers (and rnbo_runtime.cpp, unity batches and the precompiled header).
+"""
+
+import re
+from pathlib import Path
+
+from .files import write_if_changed
+
+# name -> (description, defines)
+PROFILES = {
+    'desktop-double': (
+        "double precision with the standard library, RNBO's defaults",
+        []),
+    'desktop-float32': (
+        "single precision, for patches that do not need double",
+        ['RNBO_USE_FLOAT32']),
+    'metamodule-float32-fastmath': (
+        "single precision with RNBO's approximate math (RNBO_MathFast.h) for sin/cos/tan/tanh/exp/pow/log2",
+        ['RNBO_USE_FLOAT32', 'RNBO_USE_APPROXIMATE_MATH']),
+    'minimal-nostl': (
+        "single precision without the standard library containers, for the smallest code",
+        ['RNBO_USE_FLOAT32', 'RNBO_NOSTL']),
+}
+
+VCV = 'vcv'
+METAMODULE = 'metamodule'
+TARGETS = [VCV, METAMODULE]
+
+# profile of a new plugin, the RNBO defaults on both targets
+DEFAULT_PROFILES = {VCV: 'desktop-double', METAMODULE: 'desktop-double'}
+
+PROFILE_FILES = {VCV: 'rnbo_profile.mk', METAMODULE: 'rnbo_profile.cmake'}
+
+GENERATED_NOTE = "Generated by scripts/setProfile.py (or createModule.py --vcv-profile/--metamodule-profile), do not edit."
+
+PROFILE_LINES = {
+    VCV: re.compile(r'^\s*RNBO_PROFILE\s*:?=\s*(\S+)\s*$'),
+    METAMODULE: re.compile(r'^\s*set\(RNBO_PROFILE\s+(\S+)\)\s*$'),
+}
+
+def render_profile_mk(name):
+    """Profile defines for the VCV Makefile"""
+    defines = ''.join(f" -D{define}" for define in PROFILES[name][1])
+    return '\n'.join([
+        f"# {GENERATED_NOTE}",
+        f"# {PROFILES[name][0]}",
+        f"RNBO_PROFILE := {name}",
+        f"RNBO_PROFILE_DEFINES :={defines}",
+        "",
+    ])
+
+def render_profile_cmake(name):
+    """Profile defines for the MetaModule CMakeLists.txt"""
+    defines = ''.join(f" {define}" for define in PROFILES[name][1])
+    return '\n'.join([
+        f"# {GENERATED_NOTE}",
+        f"# {PROFILES[name][0]}",
+        f"set(RNBO_PROFILE {name})",
+        f"set(RNBO_PROFILE_DEFINES{defines})",
+        "",
+    ])
+
+RENDERERS = {VCV: render_profile_mk, METAMODULE: render_profile_cmake}
+
+def profile_path(target, root=None):
+    root = Path(root) if root else Path.cwd()
+    return root / "VcvModules" / PROFILE_FILES[target]
+
+def validate_profile(name):
+    """Return an error message if name is not a known profile, otherwise None"""
+    if name not in PROFILES:
+        return f"Unknown profile '{name}', choose from: {', '.join(PROFILES)}"
+    return None
+
+def read_profile(target, root=None):
+    """The profile a target is built with, None if its profile file is missing or not recognised"""
+    path = profile_path(target, root)
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        for line in f:
+            match = PROFILE_LINES[target].match(line)
+            if match and match.group(1) in PROFILES:
+                return match.group(1)
+    return None
+
+def write_profile(target, name, root=None):
+    """Select the profile of a target, returns True if its profile file was written"""
+    return write_if_changed(profile_path(target, root), RENDERERS[target](name))
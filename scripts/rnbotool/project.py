@@ -0,0 +1,408 @@
+"""
+Project model shared by the scripts.
+
+A Project reads each registration file at most once (the generated modules.hpp,
+modules.mk and modules.cmake, plugin.json, plugin-mm.json), scans VcvModules/src
+once for module sources and [ModuleSlug]-rnbo directories, and keeps a slug keyed
+index of where each module is registered. Edits are made in memory; flush() writes
+only the files whose content changed.
+
+The generated files are included by plugin.cpp, the VCV Makefile and the MetaModule
+CMakeLists.txt, which are never edited after createPlugin.py. They are rendered from
+the sorted set of slugs, so their content does not depend on the order modules were
+added in.
+
+A module is a shared header (MOD.hpp), a dsp source (MOD.cpp) that includes the rnbo
+export, and a ui source (MOD.ui.cpp). The build lists keep the two sources apart,
+MODULE_SOURCES and MODULE_UI_SOURCES, so the ui can be built with different flags.
+Modules created before the split have no MOD.ui.cpp, only their MOD.cpp is listed.
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from .files import write_if_changed
+from .profiles import METAMODULE, PROFILE_FILES, VCV
+
+# items that identify the project base directory
+EXPECTED_ITEMS = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
+
+# plugin sources in VcvModules/src that are not modules
+PLUGIN_SOURCES = {'plugin.cpp', 'rnbo_runtime.cpp'}
+PLUGIN_HEADERS = {'plugin.hpp', 'modules.hpp', 'rnbo_config.hpp', 'rnbo_platform.hpp', 'rnbo_allocator.hpp',
+                  'process_timing.hpp', 'queue_telemetry.hpp', 'rnbo_sizes.hpp', 'pch.hpp'}
+
+# module ui source, MOD.ui.cpp (a slug cannot contain '.', so never mistaken for a module)
+UI_SUFFIX = '.ui.cpp'
+
+# where a module can be found, in the order they are reported
+SOURCE = 'source'
+RNBO_DIR = 'rnbo_dir'
+MODULES_HPP = 'modules.hpp'
+MODULES_MK = 'modules.mk'
+MODULES_CMAKE = 'modules.cmake'
+PLUGIN_JSON = 'plugin.json'
+PLUGIN_MM_JSON = 'plugin-mm.json'
+GENERATED = [MODULES_HPP, MODULES_MK, MODULES_CMAKE]
+REGISTRATIONS = GENERATED + [PLUGIN_JSON, PLUGIN_MM_JSON]
+LOCATIONS = [SOURCE, RNBO_DIR] + REGISTRATIONS
+
+HPP_MODEL = re.compile(r'^\s*extern Model\* model(\w+);\s*$')
+MAKE_SOURCE = re.compile(r'^\s*MODULE_SOURCES \+= src/(\w+)\.cpp\s*$')
+CMAKE_SOURCE = re.compile(r'^\s*\$\{SOURCE_DIR\}/src/(\w+)\.cpp\s*$')
+LINE_PATTERNS = {MODULES_HPP: HPP_MODEL, MODULES_MK: MAKE_SOURCE, MODULES_CMAKE: CMAKE_SOURCE}
+
+GENERATED_NOTE = "Generated by scripts/createModule.py and scripts/removeModule.py, do not edit."
+
+def render_modules_hpp(slugs, ui_slugs=()):
+    """Model declarations and registration for plugin.cpp
+
+    Only plugin.cpp includes this, so adding a module does not rebuild the other modules.
+    """
+    lines = [f"// {GENERATED_NOTE}", "#pragma once", '#include "plugin.hpp"', ""]
+    if slugs:
+        lines += [f"extern Model* model{slug};" for slug in slugs] + [""]
+    lines += ["inline void addModules(Plugin* p) {"]
+    lines += [f"\tp->addModel(model{slug});" for slug in slugs]
+    lines += ["}", ""]
+    return '\n'.join(lines)
+
+def render_modules_mk(slugs, ui_slugs=()):
+    """Module dsp and ui sources for the VCV Makefile"""
+    lines = [f"# {GENERATED_NOTE}"]
+    lines += [f"MODULE_SOURCES += src/{slug}.cpp" for slug in slugs]
+    lines += [f"MODULE_UI_SOURCES += src/{slug}{UI_SUFFIX}" for slug in ui_slugs]
+    return '\n'.join(lines) + '\n'
+
+def render_modules_cmake(slugs, ui_slugs=()):
+    """Module dsp and ui sources for the MetaModule CMakeLists.txt"""
+    lines = [f"# {GENERATED_NOTE}", "set(MODULE_SOURCES"]
+    lines += [f"    ${{SOURCE_DIR}}/src/{slug}.cpp" for slug in slugs]
+    lines += [")", "set(MODULE_UI_SOURCES"]
+    lines += [f"    ${{SOURCE_DIR}}/src/{slug}{UI_SUFFIX}" for slug in ui_slugs]
+    lines += [")", ""]
+    return '\n'.join(lines)
+
+RENDERERS = {MODULES_HPP: render_modules_hpp, MODULES_MK: render_modules_mk, MODULES_CMAKE: render_modules_cmake}
+
+def ensure_run_from_base_directory(script="scripts/createModule.py"):
+    """Ensure script is run from the project base directory"""
+    current_dir = Path.cwd()
+
+    # Check if we're in the base directory by looking for expected files/directories
+    if not all((current_dir / item).exists() for item in EXPECTED_ITEMS):
+        print("[ERROR] This script must be run from the project base directory.")
+        print(f"Current directory: {current_dir}")
+        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
+        print(f"Example: python3 {script}")
+        sys.exit(1)
+
+    return current_dir
+
+def check_plugin_exists():
+    """Check that createPlugin.py has been run by looking for plugin.json and plugin-mm.json"""
+    project = Project()
+
+    if not project.plugin_json_path.exists():
+        print("[ERROR] VcvModules/plugin.json not found.")
+        print("Please run 'python3 scripts/createPlugin.py' first to create the plugin.")
+        sys.exit(1)
+
+    if not project.plugin_mm_json_path.exists():
+        print("[ERROR] plugin-mm.json not found.")
+        print("Please run 'python3 scripts/createPlugin.py' first to create the plugin.")
+        sys.exit(1)
+
+    return project.plugin_json_path, project.plugin_mm_json_path
+
+def line_slug(name, line):
+    """The module slug registered by a line of modules.hpp, modules.mk or modules.cmake, if any"""
+    match = LINE_PATTERNS[name].match(line)
+    if match and match.group(1) != 'plugin':
+        return match.group(1)
+    return None
+
+class ModuleList:
+    """A generated file listing modules, edited as a set of slugs
+
+    Always available: a missing file is created on flush.
+    has_ui(slug) tells whether a module has a separate ui source to list.
+    """
+
+    def __init__(self, name, path, has_ui=lambda slug: False):
+        self.name = name
+        self.path = path
+        self.has_ui = has_ui
+        self.exists = True
+        self.original = None
+        self.slugs = set()
+        if path.exists():
+            with open(path, 'r') as f:
+                self.original = f.read()
+            self.slugs = {slug for slug in (line_slug(name, line) for line in self.original.split('\n')) if slug}
+
+    @property
+    def text(self):
+        slugs = sorted(self.slugs)
+        return RENDERERS[self.name](slugs, [slug for slug in slugs if self.has_ui(slug)])
+
+    @property
+    def changed(self):
+        return self.text != self.original
+
+    def flush(self):
+        """Write the file if its content changed, returns True if written"""
+        if not self.changed:
+            return False
+        content = self.text
+        written = write_if_changed(self.path, content)
+        self.original = content
+        return written
+
+class JsonFile:
+    """A project JSON file, edited as parsed data"""
+
+    def __init__(self, path):
+        self.path = path
+        self.exists = path.exists()
+        self.original = None
+        self.data = {}
+        if self.exists:
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+            self.original = json.dumps(self.data, sort_keys=True)
+
+    @property
+    def changed(self):
+        return self.exists and json.dumps(self.data, sort_keys=True) != self.original
+
+    def flush(self):
+        """Write the file if its data changed, returns True if written"""
+        if not self.changed:
+            return False
+        written = write_if_changed(self.path, json.dumps(self.data, indent=2))
+        self.original = json.dumps(self.data, sort_keys=True)
+        return written
+
+class Project:
+    """The plugin project in root (default: current directory)"""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else Path.cwd()
+        self.src_dir = self.root / "VcvModules" / "src"
+        self.plugin_json_path = self.root / "VcvModules" / "plugin.json"
+        self.plugin_mm_json_path = self.root / "plugin-mm.json"
+        self.makefile_path = self.root / "VcvModules" / "Makefile"
+        self.cmake_path = self.root / "CMakeLists.txt"
+        self.paths = {
+            MODULES_HPP: self.src_dir / MODULES_HPP,
+            MODULES_MK: self.root / "VcvModules" / MODULES_MK,
+            MODULES_CMAKE: self.root / "VcvModules" / MODULES_CMAKE,
+            PLUGIN_JSON: self.plugin_json_path,
+            PLUGIN_MM_JSON: self.plugin_mm_json_path,
+        }
+        self._files = {}
+        self._index = None
+
+    def has_plugin(self):
+        """True if createPlugin.py has been run"""
+        return self.plugin_json_path.exists() and self.plugin_mm_json_path.exists()
+
+    def legacy_build_files(self):
+        """Build files that list module sources themselves instead of including the generated lists
+
+        (plugins created before modules.mk/modules.cmake, or before the rnbo_profile build
+        profiles, re-run createPlugin.py to update them)
+        """
+        legacy = []
+        for path, includes in ((self.makefile_path, (MODULES_MK, PROFILE_FILES[VCV])),
+                               (self.cmake_path, (MODULES_CMAKE, PROFILE_FILES[METAMODULE]))):
+            if path.exists() and not all(include in path.read_text() for include in includes):
+                legacy.append(path)
+        return legacy
+
+    def file(self, name):
+        """One of the registration files by name (e.g. 'modules.mk'), loaded on first use"""
+        if name not in self._files:
+            path = self.paths[name]
+            if name in (PLUGIN_JSON, PLUGIN_MM_JSON):
+                self._files[name] = JsonFile(path)
+            else:
+                self._files[name] = ModuleList(name, path, lambda slug: self.module_ui_path(slug).exists())
+        return self._files[name]
+
+    def module_source_path(self, slug):
+        return self.src_dir / f"{slug}.cpp"
+
+    def module_header_path(self, slug):
+        return self.src_dir / f"{slug}.hpp"
+
+    def module_ui_path(self, slug):
+        return self.src_dir / f"{slug}{UI_SUFFIX}"
+
+    def module_files(self, slug):
+        """The module's source files (header, dsp and ui) that exist"""
+        paths = (self.module_header_path(slug), self.module_source_path(slug), self.module_ui_path(slug))
+        return [path for path in paths if path.exists()]
+
+    def rnbo_dir_path(self, slug):
+        return self.src_dir / f"{slug}-rnbo"
+
+    # --- index ---
+
+    @property
+    def index(self):
+        """slug -> set of locations the module was found in"""
+        if self._index is None:
+            self._index = {}
+            self._scan_src_dir()
+            for name in REGISTRATIONS:
+                for slug in self._parse(name):
+                    self._index.setdefault(slug, set()).add(name)
+        return self._index
+
+    def _scan_src_dir(self):
+        if not self.src_dir.exists():
+            return
+        with os.scandir(self.src_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.cpp') and entry.name not in PLUGIN_SOURCES:
+                    stem = entry.name[:-len('.cpp')]
+                    if '.' not in stem:  # MOD.ui.cpp belongs to MOD
+                        self._index.setdefault(stem, set()).add(SOURCE)
+                elif entry.is_dir() and entry.name.endswith('-rnbo'):
+                    self._index.setdefault(entry.name[:-len('-rnbo')], set()).add(RNBO_DIR)
+
+    def _parse(self, name):
+        """Slugs registered in a project file"""
+        f = self.file(name)
+        if name == PLUGIN_JSON:
+            return [m.get('slug', '') for m in f.data.get('modules', [])]
+        if name == PLUGIN_MM_JSON:
+            return [m.get('slug', '') for m in f.data.get('MetaModuleIncludedModules', [])]
+
+        return sorted(f.slugs)
+
+    def modules(self):
+        """All module slugs found anywhere in the project"""
+        return sorted(self.index)
+
+    def modules_on_disk(self):
+        """Slugs with a module source or RNBO directory"""
+        return sorted(slug for slug, found in self.index.items() if found & {SOURCE, RNBO_DIR})
+
+    def locations(self, slug):
+        return self.index.get(slug, set())
+
+    def missing(self, slug):
+        """Locations (in LOCATIONS order) where the module is not present"""
+        found = self.locations(slug)
+        return [location for location in LOCATIONS if location not in found]
+
+    def is_registered(self, slug):
+        """True if the module is registered in all the registration files"""
+        return all(name in self.locations(slug) for name in REGISTRATIONS)
+
+    def plugin_modules(self):
+        """Module entries from plugin.json"""
+        return self.file(PLUGIN_JSON).data.get('modules', [])
+
+    def _found(self, slug, name):
+        self.index.setdefault(slug, set()).add(name)
+
+    def _lost(self, slug, name):
+        found = self.index.get(slug)
+        if found is not None:
+            found.discard(name)
+            if not found:
+                del self.index[slug]
+
+    def rescan(self, slug):
+        """Update the on-disk locations of a module after files were created or deleted"""
+        for location, path in ((SOURCE, self.module_source_path(slug)), (RNBO_DIR, self.rnbo_dir_path(slug))):
+            if path.exists():
+                self._found(slug, location)
+            else:
+                self._lost(slug, location)
+
+    # --- edits ---
+
+    def add_module(self, details):
+        """Register a module (details: slug, name, description, tags) in all project files
+
+        Returns the names of the files it was added to (already registered files are skipped).
+        """
+        slug = details['slug']
+        found = self.locations(slug)
+        adders = {
+            MODULES_HPP: self._add_to_list,
+            MODULES_MK: self._add_to_list,
+            MODULES_CMAKE: self._add_to_list,
+            PLUGIN_JSON: self._add_plugin_json,
+            PLUGIN_MM_JSON: self._add_plugin_mm_json,
+        }
+        added = []
+        for name in REGISTRATIONS:
+            if name in found or not self.file(name).exists:
+                continue
+            if adders[name](name, slug, details):
+                self._found(slug, name)
+                added.append(name)
+        return added
+
+    def _add_to_list(self, name, slug, details):
+        self.file(name).slugs.add(slug)
+        return True
+
+    def _add_plugin_json(self, name, slug, details):
+        data = self.file(PLUGIN_JSON).data
+        data.setdefault('modules', []).append(details)
+        return True
+
+    def _add_plugin_mm_json(self, name, slug, details):
+        data = self.file(PLUGIN_MM_JSON).data
+        data.setdefault('MetaModuleIncludedModules', []).append({
+            "slug": slug,
+            "name": details['name'],
+            "displayName": details['description']
+        })
+        return True
+
+    def remove_module(self, slug):
+        """Unregister a module from all project files
+
+        Returns the names of the files it was removed from.
+        """
+        removed = []
+        for name in REGISTRATIONS:
+            if name not in self.locations(slug):
+                continue
+            f = self.file(name)
+            if name in (PLUGIN_JSON, PLUGIN_MM_JSON):
+                key = 'modules' if name == PLUGIN_JSON else 'MetaModuleIncludedModules'
+                f.data[key] = [m for m in f.data.get(key, []) if slug not in (m.get('slug'), m.get('name'))]
+            else:
+                f.slugs.discard(slug)
+            self._lost(slug, name)
+            removed.append(name)
+        return removed
+
+    def clear_module_lists(self):
+        """Empty the generated module lists (a new plugin has no modules)"""
+        for name in GENERATED:
+            self.file(name).slugs.clear()
+        self._index = None
+
+    def changed_files(self):
+        """Paths of the project files with changes not yet flushed"""
+        return [f.path for f in self._files.values() if f.changed]
+
+    def flush(self):
+        """Write the project files that changed, returns their paths
+
+        Files whose content ends up identical (e.g. a module added then removed) are not touched.
+        """
+        return [f.path for f in self._files.values() if f.flush()]
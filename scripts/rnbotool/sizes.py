@@ -0,0 +1,205 @@
+"""
+RNBO engine queue and list sizes, per module and for the plugin.
+
+Every patch instance carries an event queue (RNBO::MinimalEngine, the events
+waiting to run: parameter inits, clocks, scheduled parameter changes), by
+default RNBO_MINENGINEQUEUESIZE (128) events whether the patch schedules any
+or not. The queue size is a template argument of the engine, so each module
+can have its own: MODULE_QUEUE_SIZE in the generated
+[ModuleSlug]-rnbo/[ModuleSlug]Sizes.h, which the module uses for its patch.
+
+Lists (RNBO::list) keep RNBO_FIXEDLISTSIZE values inline before allocating.
+Sizing does not stop lists from allocating: a list grown past the size takes
+the rest from the plugin's pool, while processing too (rnbo_allocator.hpp),
+and copying one that long overruns the inline values. That size changes a type shared by every module and rnbo_runtime.cpp, so it
+cannot differ between modules: each module asks for MODULE_LIST_SIZE, and the
+plugin is built with the largest (RNBO_FIXEDLISTSIZE in the generated
+VcvModules/src/rnbo_sizes.hpp, included by rnbo_config.hpp).
+
+Each size records where it came from: 'export' (estimated from the export by
+analysis.py, redone when the export changes), 'telemetry' (from the queue
+peak a module measured with MODULE_QUEUE_TELEMETRY) or 'set' (by hand with
+setSizes.py). Only 'export' sizes are recalculated.
+
+Sizes from the export never go below RNBO's defaults, only above them: a
+queue too small drops events silently (RNBO_NOTHROW), and lists are copied
+into their fixed storage without a bound check, so a list the export scan
+missed would corrupt memory. Smaller sizes need a queue telemetry
+measurement, or are set by hand.
+"""
+
+import json
+import re
+from pathlib import Path
+
+from .analysis import analyze_export
+from .files import write_if_changed
+
+QUEUE = 'MODULE_QUEUE_SIZE'
+LIST = 'MODULE_LIST_SIZE'
+SIZES = [QUEUE, LIST]
+
+EXPORT = 'export'
+TELEMETRY = 'telemetry'
+SET = 'set'
+SOURCES = [EXPORT, TELEMETRY, SET]
+
+# RNBO's defaults (RNBO_MINENGINEQUEUESIZE, RNBO_FIXEDLISTSIZE as this template set it),
+# the least an estimate from the export gives
+DEFAULT_QUEUE_SIZE = 128
+DEFAULT_LIST_SIZE = 64
+# RNBO's own minimal engine test uses 8, a measured queue never gets fewer slots than that
+MINIMUM_QUEUE_SIZE = 8
+# pending events assumed for each place in the export that queues a clock or parameter event
+EVENTS_PER_SCHEDULE = 4
+
+PLUGIN_SIZES = 'rnbo_sizes.hpp'
+
+SIZE_LINE = re.compile(r'^#define (MODULE_\w+_SIZE) (\d+)\s*//\s*(\w+)(?::\s*(.*))?$')
+PLUGIN_LIST_LINE = re.compile(r'^#define RNBO_FIXEDLISTSIZE (\d+)')
+
+GENERATED_NOTE = "Generated by scripts/check.py and scripts/setSizes.py, change with setSizes.py rather than editing."
+
+def sizes_header_path(rnbo_dir, module_slug):
+    """Path of the generated sizes header for a module"""
+    return Path(rnbo_dir) / f"{module_slug}Sizes.h"
+
+def round_up(value, step=8):
+    return (int(value) + step - 1) // step * step
+
+def export_queue_size(analysis):
+    """(size, note) of the queue an export needs, from what it schedules, at least RNBO's default"""
+    events = analysis['param_inits'] + EVENTS_PER_SCHEDULE * analysis['schedules']
+    note = f"{analysis['param_inits']} parameter inits, {analysis['schedules']} scheduling calls"
+    return max(DEFAULT_QUEUE_SIZE, round_up(events)), note
+
+def export_list_size(analysis):
+    """(size, note) of the lists an export needs, RNBO's default whether or not lists were found"""
+    if analysis['list_uses']:
+        return DEFAULT_LIST_SIZE, f"uses lists ({analysis['list_uses']} places)"
+    return DEFAULT_LIST_SIZE, "no lists found, smaller only with setSizes.py"
+
+def telemetry_queue_size(telemetry, analysis=None):
+    """(size, note) of the queue from a module's saved queue telemetry ([ModuleSlug]-queue.json)
+
+    Half as much again as the peak, or twice the size measured with if events were dropped,
+    and never less than the parameter inits the export queues when it starts.
+    """
+    peak, size, dropped = int(telemetry['queue_peak']), int(telemetry['queue_size']), int(telemetry.get('queue_dropped', 0))
+    if dropped:
+        queue, note = round_up(2 * size), f"{dropped} dropped at {size}"
+    else:
+        queue, note = round_up(peak + peak // 2), f"peak {peak} of {size}"
+    if analysis:
+        queue = max(queue, round_up(analysis['param_inits']))
+    return max(MINIMUM_QUEUE_SIZE, queue), note
+
+def read_telemetry(path):
+    """The saved queue telemetry of a module, {'module', 'queue_size', 'queue_peak', 'queue_dropped'}"""
+    with open(path, 'r') as f:
+        telemetry = json.load(f)
+    for field in ('module', 'queue_size', 'queue_peak'):
+        if field not in telemetry:
+            raise ValueError(f"{path} has no '{field}', save it from the module's context menu")
+    return telemetry
+
+def read_sizes_header(path):
+    """define -> (value, source, note) from a sizes header, empty if there is none"""
+    sizes = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                match = SIZE_LINE.match(line.strip())
+                if match and match.group(1) in SIZES and match.group(3) in SOURCES:
+                    sizes[match.group(1)] = (int(match.group(2)), match.group(3), match.group(4) or '')
+    except OSError:
+        pass
+    return sizes
+
+def render_sizes_header(module_slug, sizes):
+    """Render a module's sizes header, sizes is define -> (value, source, note)"""
+    lines = [
+        f"// {module_slug} rnbo engine sizes. {GENERATED_NOTE}",
+        "// MODULE_QUEUE_SIZE: events the patch's engine queue holds (RNBO::MinimalEngine)",
+        "// MODULE_LIST_SIZE: values lists hold before allocating, the plugin uses the largest of its modules",
+        "#pragma once",
+        "",
+    ]
+    for define in SIZES:
+        value, source, note = sizes[define]
+        lines.append(f"#define {define} {value}  // {source}" + (f": {note}" if note else ""))
+    lines.append("")
+    return '\n'.join(lines)
+
+def generate_sizes_header(rnbo_dir, module_slug, analysis=None, queue=None, list_size=None):
+    """(Re)generate a module's sizes header
+
+    queue and list_size are (value, source, note) to set, otherwise sizes from a telemetry
+    or set by hand are kept and the rest estimated from the export (analysis, or analysed here).
+    Returns (status, path), status 'missing' (no export), 'updated' or 'current'.
+    """
+    rnbo_dir = Path(rnbo_dir)
+    header_path = sizes_header_path(rnbo_dir, module_slug)
+    export_path = rnbo_dir / f"{module_slug}.cpp.h"
+    if analysis is None:
+        if not export_path.exists():
+            return 'missing', header_path
+        analysis = analyze_export(export_path)
+        if analysis is None:
+            return 'missing', header_path
+
+    current = read_sizes_header(header_path)
+    estimated = {QUEUE: export_queue_size(analysis), LIST: export_list_size(analysis)}
+    wanted = {QUEUE: queue, LIST: list_size}
+    sizes = {}
+    for define in SIZES:
+        if wanted[define] is not None:
+            sizes[define] = wanted[define]
+        elif define in current and current[define][1] != EXPORT:
+            sizes[define] = current[define]
+        else:
+            sizes[define] = (estimated[define][0], EXPORT, estimated[define][1])
+
+    if not write_if_changed(header_path, render_sizes_header(module_slug, sizes)):
+        return 'current', header_path
+    return 'updated', header_path
+
+def plugin_sizes_path(src_dir):
+    return Path(src_dir) / PLUGIN_SIZES
+
+def read_plugin_list_size(src_dir):
+    """RNBO_FIXEDLISTSIZE the plugin is built with (rnbo_sizes.hpp), None if not generated yet"""
+    try:
+        with open(plugin_sizes_path(src_dir), 'r') as f:
+            for line in f:
+                match = PLUGIN_LIST_LINE.match(line)
+                if match:
+                    return int(match.group(1))
+    except OSError:
+        pass
+    return None
+
+def generate_plugin_sizes(src_dir, module_slugs):
+    """Write rnbo_sizes.hpp with the largest list size of the modules, returns (size, changed)
+
+    Modules without a sizes header (no export yet) do not count, with none at all
+    the plugin keeps the template's DEFAULT_LIST_SIZE.
+    """
+    src_dir = Path(src_dir)
+    asked = {}
+    for slug in module_slugs:
+        sizes = read_sizes_header(sizes_header_path(src_dir / f"{slug}-rnbo", slug))
+        if LIST in sizes:
+            asked[slug] = sizes[LIST][0]
+    size = max(asked.values()) if asked else DEFAULT_LIST_SIZE
+    largest = ', '.join(sorted(slug for slug, value in asked.items() if value == size)) or "no module sizes yet"
+    content = '\n'.join([
+        f"// rnbo sizes shared by every module of the plugin. {GENERATED_NOTE}",
+        "// list capacity has to be the same in every module (RNBO::list is one type for the whole plugin),",
+        "// so it is the largest MODULE_LIST_SIZE of the modules ([ModuleSlug]-rnbo/[ModuleSlug]Sizes.h)",
+        "#pragma once",
+        "",
+        f"#define RNBO_FIXEDLISTSIZE {size}  // {largest}",
+        "",
+    ])
+    return size, write_if_changed(plugin_sizes_path(src_dir), content)
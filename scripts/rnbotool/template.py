@@ -0,0 +1,87 @@
+"""
+Template rendering for the files under templates/.
+
+Templates use __NAME__ placeholders (__MOD__, __MODNAME__, __SLUG__, ...).
+Each template is split once into literal text and placeholder names, so rendering
+is a single join rather than one str.replace pass per placeholder, and a
+placeholder can never match inside a longer one (__MOD__ vs __MODNAME__).
+Compiled templates are cached by path, and reloaded if the file changes.
+"""
+
+import re
+from pathlib import Path
+
+# upper case, may contain single underscores, e.g. __MOD__, __MODULE_SOURCES__
+# (non-greedy, so __MOD___UI is __MOD__ followed by _UI)
+PLACEHOLDER_PATTERN = re.compile(r'__([A-Z][A-Z0-9_]*?)__')
+
+# compiler macros that look like placeholders, never substituted or reported
+PREDEFINED_MACROS = {
+    '__FILE__', '__LINE__', '__DATE__', '__TIME__', '__FUNCTION__',
+    '__GNUC__', '__STDC__', '__APPLE__', '__ARM_ARCH__',
+}
+
+class TemplateError(Exception):
+    """Raised when a template uses placeholders that have no value"""
+
+class CompiledTemplate:
+    """A template split into literal text and placeholders
+
+    parts alternates literal, placeholder, literal, ... so odd entries are placeholders
+    """
+
+    def __init__(self, text, name="<template>"):
+        self.name = name
+        self.parts = []
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            if match.group(0) in PREDEFINED_MACROS:
+                continue
+            self.parts.append(text[pos:match.start()])
+            self.parts.append(match.group(0))
+            pos = match.end()
+        self.parts.append(text[pos:])
+        self.placeholders = set(self.parts[1::2])
+
+    def render(self, values, allow_unknown=False):
+        """Substitute values (placeholder -> value) into the template
+
+        Placeholders without a value raise TemplateError, unless allow_unknown,
+        in which case they are left in place. Values are inserted as-is and
+        never rescanned for placeholders.
+        """
+        unknown = self.placeholders - values.keys()
+        if unknown and not allow_unknown:
+            raise TemplateError(f"{self.name}: no value for placeholder(s) {', '.join(sorted(unknown))}")
+
+        out = self.parts[:]
+        for i in range(1, len(out), 2):
+            if out[i] in values:
+                out[i] = str(values[out[i]])
+        return ''.join(out)
+
+_cache = {}
+
+def load_template(template_path):
+    """Compile a template file, reusing the cached copy while the file is unchanged"""
+    template_path = Path(template_path)
+    stat = template_path.stat()
+    key = str(template_path.resolve())
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _cache.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with open(template_path, 'r') as f:
+        compiled = CompiledTemplate(f.read(), template_path.name)
+    _cache[key] = (stamp, compiled)
+    return compiled
+
+def render_template(template_path, values, allow_unknown=False):
+    """Render a template file with the given placeholder values"""
+    return load_template(template_path).render(values, allow_unknown)
+
+def find_placeholders(text):
+    """Placeholders remaining in text, e.g. to check generated output"""
+    return {m.group(0) for m in PLACEHOLDER_PATTERN.finditer(text)} - PREDEFINED_MACROS
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Select the RNBO build profile of the VCV and MetaModule builds.
+
+A profile is a named set of RNBO compile options (precision, approximate math,
+standard library). It applies to every module of the plugin, and can be chosen
+separately for each target, e.g. double precision on the desktop and float32
+with fast math on the MetaModule.
+
+    python3 scripts/setProfile.py                       # show the current profiles
+    python3 scripts/setProfile.py --metamodule metamodule-float32-fastmath
+    python3 scripts/setProfile.py --vcv desktop-double --metamodule minimal-nostl
+"""
+
+import sys
+import argparse
+
+from rnbotool.profiles import (PROFILES, TARGETS, VCV, METAMODULE, profile_path, read_profile,
+                               validate_profile, write_profile)
+from rnbotool.project import ensure_run_from_base_directory, check_plugin_exists
+
+TARGET_NAMES = {VCV: "VCV Rack", METAMODULE: "MetaModule"}
+
+def list_profiles():
+    """Print the available profiles"""
+    print("Available profiles:")
+    for name, (description, defines) in PROFILES.items():
+        print(f"  {name}: {description}")
+        print(f"      {' '.join(defines) if defines else '(no defines)'}")
+
+def show_profiles():
+    """Print the profile each target is built with"""
+    for target in TARGETS:
+        name = read_profile(target)
+        if name:
+            print(f"[OK] {TARGET_NAMES[target]}: {name}")
+        else:
+            print(f"[WARNING] {TARGET_NAMES[target]}: no profile ({profile_path(target)} missing), "
+                  f"re-run createPlugin.py or select one with --{target}")
+
+def set_profiles(selection):
+    """Select profiles (target -> profile name), returns False if a name is not known"""
+    for target, name in selection.items():
+        error = validate_profile(name)
+        if error:
+            print(f"[ERROR] {error}")
+            return False
+
+    for target, name in selection.items():
+        if write_profile(target, name):
+            print(f"[OK] {TARGET_NAMES[target]} profile set to {name} ({profile_path(target).name})")
+        else:
+            print(f"[OK] {TARGET_NAMES[target]} profile unchanged ({name})")
+    return True
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Select the RNBO build profile of the VCV and MetaModule builds')
+    parser.add_argument('--vcv', metavar='PROFILE', help='Profile for the VCV Rack build')
+    parser.add_argument('--metamodule', metavar='PROFILE', help='Profile for the MetaModule build')
+    parser.add_argument('--list', action='store_true', help='List the available profiles')
+    args = parser.parse_args()
+
+    if args.list:
+        list_profiles()
+        return 0
+
+    ensure_run_from_base_directory("scripts/setProfile.py")
+    check_plugin_exists()
+
+    selection = {target: getattr(args, target) for target in TARGETS if getattr(args, target)}
+    if selection and not set_profiles(selection):
+        return 1
+
+    show_profiles()
+    if selection:
+        print("\nThe next build recompiles the whole plugin with the new options.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
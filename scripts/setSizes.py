@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Set the RNBO event queue and list sizes of a module.
+
+Each module's patch has its own event queue (MODULE_QUEUE_SIZE) and asks for
+a list capacity (MODULE_LIST_SIZE), both in the generated
+VcvModules/src/[ModuleSlug]-rnbo/[ModuleSlug]Sizes.h. check.py estimates them
+from the export; use this to set them from the queue telemetry a module saved
+(built with MODULE_QUEUE_TELEMETRY 1), or by hand. The plugin's lists are sized
+for the module that needs the largest (rnbo_sizes.hpp).
+
+Estimates never go below RNBO's defaults (a queue of 128, lists of 64):
+a smaller queue needs --telemetry, smaller lists --list.
+
+    python3 scripts/setSizes.py                           # show the sizes of every module
+    python3 scripts/setSizes.py --telemetry Demo-queue.json
+    python3 scripts/setSizes.py Demo --list 8             # only for patches that pass no lists
+    python3 scripts/setSizes.py Demo --queue 256          # more than the export shows
+    python3 scripts/setSizes.py Demo --queue auto         # back to the estimate from the export
+"""
+
+import sys
+import argparse
+
+from rnbotool.analysis import analyze_export
+from rnbotool.project import Project, ensure_run_from_base_directory, check_plugin_exists
+from rnbotool.sizes import (DEFAULT_LIST_SIZE, DEFAULT_QUEUE_SIZE, EXPORT, LIST, QUEUE, SET, TELEMETRY,
+                            export_list_size, export_queue_size,
+                            generate_plugin_sizes, generate_sizes_header, read_sizes_header, read_telemetry,
+                            sizes_header_path, telemetry_queue_size)
+
+AUTO = 'auto'
+
+def size_argument(value):
+    """A size given on the command line, a positive number or 'auto'"""
+    if value == AUTO:
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a size, use a number or '{AUTO}'")
+    if size < 1:
+        raise argparse.ArgumentTypeError("sizes have to be at least 1")
+    return size
+
+def show_sizes(project):
+    """Print each module's sizes and the plugin's list size"""
+    for slug in project.modules_on_disk():
+        sizes = read_sizes_header(sizes_header_path(project.rnbo_dir_path(slug), slug))
+        if not sizes:
+            print(f"[WARNING] {slug}: no {slug}Sizes.h, export the patch and run scripts/check.py")
+            continue
+        print(f"[OK] {slug}:")
+        for name, define in (("queue", QUEUE), ("lists", LIST)):
+            if define in sizes:
+                value, source, note = sizes[define]
+                print(f"      {name} {value} ({source}{': ' + note if note else ''})")
+
+def set_sizes(project, slug, queue, list_size, telemetry=None):
+    """Regenerate a module's sizes header with the sizes given, returns False on an error"""
+    rnbo_dir = project.rnbo_dir_path(slug)
+    export_path = rnbo_dir / f"{slug}.cpp.h"
+    if not export_path.exists():
+        print(f"[ERROR] No RNBO export for {slug} ({export_path}), export the patch first")
+        return False
+    analysis = analyze_export(export_path)
+    if analysis is None:
+        print(f"[ERROR] Could not find the patcher class in {export_path}")
+        return False
+
+    if telemetry is not None:
+        size, note = telemetry_queue_size(telemetry, analysis)
+        queue = (size, TELEMETRY, note)
+    elif queue == AUTO:
+        size, note = export_queue_size(analysis)
+        queue = (size, EXPORT, note)
+    elif queue is not None:
+        if queue < DEFAULT_QUEUE_SIZE:
+            # events that do not fit are dropped without notice, so only a measurement can make it smaller
+            print(f"[ERROR] A queue below RNBO's {DEFAULT_QUEUE_SIZE} needs a measurement: build with "
+                  "MODULE_QUEUE_TELEMETRY 1, save the queue telemetry and use --telemetry")
+            return False
+        queue = (queue, SET, '')
+    if list_size == AUTO:
+        size, note = export_list_size(analysis)
+        list_size = (size, EXPORT, note)
+    elif list_size is not None:
+        if list_size < DEFAULT_LIST_SIZE:
+            print(f"[WARNING] Lists of {list_size} are below RNBO's {DEFAULT_LIST_SIZE}, a longer list in the patch "
+                  "corrupts memory; only use this for patches that pass no lists")
+        list_size = (list_size, SET, '')
+
+    status, header_path = generate_sizes_header(rnbo_dir, slug, analysis, queue, list_size)
+    if status == 'updated':
+        print(f"[OK] Updated {header_path}")
+    else:
+        print(f"[OK] {header_path} unchanged")
+    return True
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Set the RNBO event queue and list sizes of a module')
+    parser.add_argument('slug', nargs='?', help='Module slug (not needed with --telemetry)')
+    parser.add_argument('--queue', type=size_argument, metavar='SIZE',
+                        help=f"Events the module's queue holds (at least {DEFAULT_QUEUE_SIZE}, smaller with --telemetry), "
+                             f"or '{AUTO}' to estimate from the export")
+    parser.add_argument('--list', type=size_argument, metavar='SIZE', dest='list_size',
+                        help=f"Values the module's lists hold, or '{AUTO}' to estimate from the export")
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help="Size the queue from telemetry saved by the module ([ModuleSlug]-queue.json)")
+    args = parser.parse_args()
+
+    ensure_run_from_base_directory("scripts/setSizes.py")
+    check_plugin_exists()
+    project = Project()
+
+    telemetry = None
+    slug = args.slug
+    if args.telemetry:
+        if args.queue is not None:
+            print("[ERROR] Use either --telemetry or --queue")
+            return 1
+        try:
+            telemetry = read_telemetry(args.telemetry)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not read queue telemetry: {e}")
+            return 1
+        if slug and slug != telemetry['module']:
+            print(f"[ERROR] {args.telemetry} is from {telemetry['module']}, not {slug}")
+            return 1
+        slug = telemetry['module']
+
+    if slug:
+        if slug not in project.modules_on_disk():
+            print(f"[ERROR] Module '{slug}' not found")
+            return 1
+        if telemetry is None and args.queue is None and args.list_size is None:
+            print("[ERROR] Nothing to set, use --queue, --list or --telemetry")
+            return 1
+        if not set_sizes(project, slug, args.queue, args.list_size, telemetry):
+            return 1
+        list_size, changed = generate_plugin_sizes(project.src_dir, project.modules_on_disk())
+        if changed:
+            print(f"[OK] Plugin list size is now {list_size}, the next build recompiles the whole plugin")
+    elif args.queue is not None or args.list_size is not None:
+        print("[ERROR] Give the module slug to set sizes for")
+        return 1
+
+    show_sizes(project)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
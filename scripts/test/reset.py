@@ -49,7 +49,11 @@ def reset_project(force=False):
         print("  - VcvModules/Makefile") 
         print("  - VcvModules/src/plugin.hpp")
         print("  - VcvModules/src/plugin.cpp")
-        print("  - VcvModules/src/*.cpp (all module files)")
+        print("  - VcvModules/src/rnbo_config.hpp, rnbo_platform.hpp, rnbo_runtime.cpp, rnbo_allocator.hpp, process_timing.hpp, pch.hpp")
+        print("  - VcvModules/src/queue_telemetry.hpp, rnbo_sizes.hpp")
+        print("  - VcvModules/src/modules.hpp, VcvModules/modules.mk, VcvModules/modules.cmake")
+        print("  - VcvModules/rnbo_profile.mk, VcvModules/rnbo_profile.cmake")
+        print("  - VcvModules/src/*.cpp, *.hpp (all module files)")
         print("  - VcvModules/src/*-rnbo/ (all RNBO directories)")
         print("  - plugin-mm.json")
         print("  - CMakeLists.txt")
@@ -70,6 +74,19 @@ def reset_project(force=False):
         project_root / "VcvModules" / "Makefile",
         project_root / "VcvModules" / "src" / "plugin.hpp", 
         project_root / "VcvModules" / "src" / "plugin.cpp",
+        project_root / "VcvModules" / "src" / "modules.hpp",
+        project_root / "VcvModules" / "src" / "rnbo_config.hpp",
+        project_root / "VcvModules" / "src" / "rnbo_platform.hpp",
+        project_root / "VcvModules" / "src" / "rnbo_runtime.cpp",
+        project_root / "VcvModules" / "src" / "rnbo_allocator.hpp",
+        project_root / "VcvModules" / "src" / "process_timing.hpp",
+        project_root / "VcvModules" / "src" / "queue_telemetry.hpp",
+        project_root / "VcvModules" / "src" / "rnbo_sizes.hpp",
+        project_root / "VcvModules" / "src" / "pch.hpp",
+        project_root / "VcvModules" / "modules.mk",
+        project_root / "VcvModules" / "modules.cmake",
+        project_root / "VcvModules" / "rnbo_profile.mk",
+        project_root / "VcvModules" / "rnbo_profile.cmake",
         project_root / "plugin-mm.json",
         project_root / "CMakeLists.txt"
     ]
@@ -78,12 +95,12 @@ def reset_project(force=False):
     for file_path in files_to_remove:
         remove_file_safe(file_path)
     
-    # Remove all module .cpp files (except plugin.cpp which is already handled)
+    # Remove all module .cpp and .hpp files (the plugin files are already handled)
     vcv_src_dir = project_root / "VcvModules" / "src"
     if vcv_src_dir.exists():
-        for cpp_file in vcv_src_dir.glob("*.cpp"):
-            if cpp_file.name != "plugin.cpp":  # Don't double-remove plugin.cpp
-                remove_file_safe(cpp_file)
+        for source_file in list(vcv_src_dir.glob("*.cpp")) + list(vcv_src_dir.glob("*.hpp")):
+            if source_file.exists():  # Don't double-remove plugin files
+                remove_file_safe(source_file)
         
         # Remove all RNBO directories (*-rnbo)
         for rnbo_dir in vcv_src_dir.glob("*-rnbo"):
@@ -7,21 +7,8 @@ import subprocess
 import tempfile
 from pathlib import Path
 
-def ensure_run_from_base_directory():
-    """Ensure script is run from the project base directory"""
-    current_dir = Path.cwd()
-    
-    # Check if we're in the base directory by looking for expected files/directories
-    expected_items = ['scripts', 'templates', 'VcvModules', 'CMakePresets.json']
-    
-    if not all((current_dir / item).exists() for item in expected_items):
-        print("[ERROR] This script must be run from the project base directory.")
-        print(f"Current directory: {current_dir}")
-        print("Please run from the directory containing 'scripts', 'templates', 'VcvModules', etc.")
-        print("Example: python3 scripts/test/test.py")
-        sys.exit(1)
-    
-    return current_dir
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rnbotool.project import ensure_run_from_base_directory
 
 def confirm_destructive_operation(auto=False):
     """Confirm with user that this is a destructive test operation"""
@@ -78,7 +65,7 @@ def run_command_with_input(cmd, input_text="", description=""):
 
 def remove_all_modules():
     """Remove all existing modules using removeAll.py"""
-    project_root = ensure_run_from_base_directory()
+    project_root = ensure_run_from_base_directory("scripts/test/test.py")
     remove_all_script = project_root / "scripts" / "test" / "removeAll.py"
     
     if not remove_all_script.exists():
@@ -143,6 +130,18 @@ def verify_test_results():
         "VcvModules/Makefile", 
         "VcvModules/src/plugin.cpp",
         "VcvModules/src/plugin.hpp",
+        "VcvModules/src/modules.hpp",
+        "VcvModules/src/rnbo_config.hpp",
+        "VcvModules/src/rnbo_platform.hpp",
+        "VcvModules/src/rnbo_runtime.cpp",
+        "VcvModules/src/rnbo_allocator.hpp",
+        "VcvModules/src/process_timing.hpp",
+        "VcvModules/src/queue_telemetry.hpp",
+        "VcvModules/src/pch.hpp",
+        "VcvModules/modules.mk",
+        "VcvModules/modules.cmake",
+        "VcvModules/rnbo_profile.mk",
+        "VcvModules/rnbo_profile.cmake",
         "plugin-mm.json",
         "CMakeLists.txt"
     ]
@@ -157,9 +156,13 @@ def verify_test_results():
     # Check module files exist (using SLUGS for filenames)
     print(f"\n[FOLDER] Verifying module files use SLUGS (not names with spaces):")
     module_files = [
+        ("VcvModules/src/TestReverb.hpp", "Test Reverb"),
         ("VcvModules/src/TestReverb.cpp", "Test Reverb"),
+        ("VcvModules/src/TestReverb.ui.cpp", "Test Reverb"),
         ("VcvModules/src/TestReverb-rnbo", "Test Reverb"), 
+        ("VcvModules/src/MultiFilter.hpp", "Multi Filter"),
         ("VcvModules/src/MultiFilter.cpp", "Multi Filter"),
+        ("VcvModules/src/MultiFilter.ui.cpp", "Multi Filter"),
         ("VcvModules/src/MultiFilter-rnbo", "Multi Filter")
     ]
     
@@ -219,9 +222,9 @@ def verify_test_results():
     # Check C++ code generation uses slugs
     print(f"\n[CODE] Verifying C++ code uses SLUGS for identifiers:")
     cpp_files_to_check = [
-        ("VcvModules/src/plugin.hpp", ["modelTestReverb", "modelMultiFilter"]),
-        ("VcvModules/src/plugin.cpp", ["modelTestReverb", "modelMultiFilter"]),
-        ("VcvModules/Makefile", ["TestReverb.cpp", "MultiFilter.cpp"])
+        ("VcvModules/src/modules.hpp", ["modelTestReverb", "modelMultiFilter"]),
+        ("VcvModules/modules.mk", ["TestReverb.cpp", "MultiFilter.cpp", "TestReverb.ui.cpp", "MultiFilter.ui.cpp"]),
+        ("VcvModules/modules.cmake", ["TestReverb.cpp", "MultiFilter.cpp", "TestReverb.ui.cpp", "MultiFilter.ui.cpp"])
     ]
     
     for file_path, expected_slugs in cpp_files_to_check:
@@ -257,7 +260,7 @@ def main():
     
     try:
         # Ensure we're running from the correct directory
-        project_root = ensure_run_from_base_directory()
+        project_root = ensure_run_from_base_directory("scripts/test/test.py")
         print(f"Running from project directory: {project_root}")
         
         # Confirm destructive operation
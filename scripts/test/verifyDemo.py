@@ -33,9 +33,14 @@ def main():
     
     # Check files use slug naming
     files_to_check = [
-        ("VcvModules/src/Demo.cpp", "Demo module source file"),
+        ("VcvModules/src/Demo.hpp", "Demo module header"),
+        ("VcvModules/src/Demo.cpp", "Demo module dsp source file"),
+        ("VcvModules/src/Demo.ui.cpp", "Demo module ui source file"),
         ("VcvModules/src/Demo-rnbo/Demo.cpp.h", "Demo RNBO header"),
-        ("VcvModules/src/Demo-rnbo/description.json", "Demo RNBO description")
+        ("VcvModules/src/Demo-rnbo/description.json", "Demo RNBO description"),
+        ("VcvModules/src/Demo-rnbo/DemoMeta.h", "Demo metadata header"),
+        ("VcvModules/src/Demo-rnbo/DemoSizes.h", "Demo queue and list sizes"),
+        ("VcvModules/src/rnbo_sizes.hpp", "Plugin list size")
     ]
     
     print(f"\n[FOLDER] Verifying files use slug 'Demo' (not spaces):")
@@ -47,26 +52,20 @@ def main():
             print(f"[ERROR] {file_path} - MISSING! ({description})")
     
     # Check C++ code uses slug
-    plugin_hpp = project_root / "VcvModules" / "src" / "plugin.hpp"
-    plugin_cpp = project_root / "VcvModules" / "src" / "plugin.cpp"
+    modules_hpp = project_root / "VcvModules" / "src" / "modules.hpp"
     
     print(f"\n[CODE] Verifying C++ code uses slug 'Demo':")
     
-    if plugin_hpp.exists():
-        with open(plugin_hpp) as f:
+    if modules_hpp.exists():
+        with open(modules_hpp) as f:
             content = f.read()
-            if "extern Model* modelDemo;" in content:
-                print("[PASS] plugin.hpp contains 'extern Model* modelDemo;'")
-            else:
-                print("[ERROR] plugin.hpp missing 'extern Model* modelDemo;'")
-    
-    if plugin_cpp.exists():
-        with open(plugin_cpp) as f:
-            content = f.read()
-            if "p->addModel(modelDemo);" in content:
-                print("[PASS] plugin.cpp contains 'p->addModel(modelDemo);'")
-            else:
-                print("[ERROR] plugin.cpp missing 'p->addModel(modelDemo);'")
+            for expected in ("extern Model* modelDemo;", "p->addModel(modelDemo);"):
+                if expected in content:
+                    print(f"[PASS] modules.hpp contains '{expected}'")
+                else:
+                    print(f"[ERROR] modules.hpp missing '{expected}'")
+    else:
+        print("[ERROR] modules.hpp not found")
     
     # Check that plugin builds
     plugin_dylib = project_root / "VcvModules" / "plugin.dylib"
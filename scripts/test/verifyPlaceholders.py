@@ -4,8 +4,12 @@ Verify that __MOD__ and __MODNAME__ placeholders are working correctly
 """
 
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rnbotool.template import find_placeholders
+
 def main():
     project_root = Path.cwd()
     
@@ -25,13 +29,15 @@ def main():
                 print(f"  - Slug: '{demo_module['slug']}' (used for technical IDs)")
                 print(f"  - Name: '{demo_module['name']}' (user-facing display)")
     
-    # Check Demo.cpp for correct placeholder substitution
-    demo_cpp = project_root / "VcvModules" / "src" / "Demo.cpp"
-    if demo_cpp.exists():
-        with open(demo_cpp) as f:
-            content = f.read()
+    # Check Demo.hpp, Demo.cpp and Demo.ui.cpp for correct placeholder substitution
+    demo_sources = [project_root / "VcvModules" / "src" / name for name in ("Demo.hpp", "Demo.cpp", "Demo.ui.cpp")]
+    if all(path.exists() for path in demo_sources):
+        content = ""
+        for path in demo_sources:
+            with open(path) as f:
+                content += f.read()
             
-        print(f"\n[CODE] Verifying placeholder substitution in Demo.cpp:")
+        print(f"\n[CODE] Verifying placeholder substitution in Demo.hpp, Demo.cpp and Demo.ui.cpp:")
         
         # Check __MODNAME__ -> "Demo" (user-facing display in label)
         if '"Demo"' in content and 'addLabel' in content:
@@ -45,7 +51,8 @@ def main():
             'RNBO::DemoRnbo<',
             'Model* modelDemo =',
             'struct DemoWidget :',
-            '#include "Demo-rnbo/Demo.cpp.h"'
+            '#include "Demo-rnbo/Demo.cpp.h"',
+            '#include "Demo.hpp"'
         ]
         
         for usage in technical_usages:
@@ -60,6 +67,28 @@ def main():
         else:
             print("[ERROR] __PANEL__ substitution not found")
     
+    # Check no placeholders were left behind in generated files
+    print(f"\n[CODE] Checking generated files for leftover placeholders:")
+    generated_files = [
+        project_root / "VcvModules" / "src" / "Demo.hpp",
+        project_root / "VcvModules" / "src" / "Demo.cpp",
+        project_root / "VcvModules" / "src" / "Demo.ui.cpp",
+        project_root / "VcvModules" / "plugin.json",
+        project_root / "VcvModules" / "Makefile",
+        project_root / "VcvModules" / "src" / "plugin.cpp",
+        project_root / "plugin-mm.json",
+        project_root / "CMakeLists.txt",
+    ]
+    for generated_file in generated_files:
+        if not generated_file.exists():
+            continue
+        with open(generated_file) as f:
+            leftover = find_placeholders(f.read())
+        if leftover:
+            print(f"[ERROR] {generated_file.name} has leftover placeholders: {', '.join(sorted(leftover))}")
+        else:
+            print(f"[PASS] {generated_file.name} has no leftover placeholders")
+    
     print(f"\n[TARGET] Summary:")
     print("  - __MODNAME__ is used for user-facing display text (can have spaces)")
     print("  - __MOD__ is used for technical identifiers (no spaces, safe for C++)")
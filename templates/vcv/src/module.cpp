@@ -1,41 +1,11 @@
-#include "plugin.hpp"
+#include "__MOD__.hpp"
 
-// #define RNBO_NOSTL
-// #define RNBO_USE_FLOAT32
-#define RNBO_NOTHROW  // no exceptopns
-// #define RNBO_USECUSTOMPLATFORM
-#define RNBO_USECUSTOMPLATFORMPRINT
-// #define RNBO_USECUSTOMALLOCATOR
-#define RNBO_FIXEDLISTSIZE 64
-#define RNBO_NO_PATCHERFACTORY
+// __MOD__ dsp, the rnbo patch and processing, the panel is in __MOD__.ui.cpp
+// the module options (MODULE_BLOCK_SIZE...) are at the top of __MOD__.hpp
 
-
-// a couple of user options
-
-// use a generic title - disable by commenting out (with //)
-// comment this out, and then have a custom panel with title on background
-#define GENERIC_TITLE_LABEL
-
-
-// use the generic UI - disable by commenting out (with //)
-// to use your own UI you will need to :
-// - comment GENERIC_UI out
-// - create a panel file (res/__MOD__.svg), which has params and IO in same order as rnbo patch
-// - run $RACK_DIR/helper.py createmodule __MOD__ res/__MOD__.svg tmp.cpp
-// - from tmp.cpp copy enum ParamId, InputId, OutputId and place in this file after enum LightId
-// - from tmp.cpp copy ___MOD__Widget and replace where indicated below (search CUSTOM WIDGET)
-// to come: more information in documentation and possible yt video on my channel.
-#define GENERIC_UI
-
-
-namespace RNBO {
-namespace Platform {
-static void printMessage(const char* message) {
-}
-static void printErrorMessage(const char* message) {
-}
-}  // namespace Platform
-}  // namespace RNBO
+// rnbo compile options (RNBO_USE_FLOAT32, RNBO_NOSTL...) are shared by all modules, see rnbo_config.hpp
+#include "rnbo_config.hpp"
+#include "rnbo_allocator.hpp"
 
 
 // ignore warnings generated by rnbo export, outside our control
@@ -49,234 +19,423 @@ static void printErrorMessage(const char* message) {
 #pragma GCC diagnostic ignored "-Wunused-function"
 #pragma GCC diagnostic ignored "-Wsuggest-override"
 // #endif
+
+// the patch's event queue size (MODULE_QUEUE_SIZE) and the list size it needs (MODULE_LIST_SIZE),
+// generated from the export by scripts/check.py, see scripts/setSizes.py
+#include "RNBO_Common.h"
+#if __has_include("__MOD__-rnbo/__MOD__Sizes.h")
+#include "__MOD__-rnbo/__MOD__Sizes.h"
+#else
+#define MODULE_QUEUE_SIZE RNBO_MINENGINEQUEUESIZE
+#define MODULE_LIST_SIZE RNBO_FIXEDLISTSIZE
+#endif
+static_assert(MODULE_LIST_SIZE <= RNBO_FIXEDLISTSIZE,
+              "__MOD__ needs larger lists than the plugin is built with, run scripts/check.py to update rnbo_sizes.hpp");
+
+// the export's engine (INTERNALENGINE) is a template of its queue size, so the patch gets this module's own
+// rather than RNBO_MINENGINEQUEUESIZE, with telemetry the engine also records how full the queue gets
+#include "queue_telemetry.hpp"
+using __MOD__Engine = std::conditional<__MOD__::queueTelemetry_, QueueTelemetryEngine<MODULE_QUEUE_SIZE>,
+                                       RNBO::MinimalEngine<MODULE_QUEUE_SIZE>>::type;
+const unsigned int __MOD__::queueSize_ = MODULE_QUEUE_SIZE;
+
+#define INTERNALENGINE ::__MOD__Engine
 #include "__MOD__-rnbo/__MOD__.cpp.h"
+#undef INTERNALENGINE
 #pragma GCC diagnostic pop
 
-#ifdef GENERIC_UI
-namespace __MOD___UI {
-const float titleSpaceY = 20.f;
-const float inputSpaceY = 20.f;
-const float outputSpaceY = 20.f;
-
-const float borderX = 17.f;
-const float spaceY = 15.f;
-const float spaceX = 15.f;
-};  // namespace __MOD___UI
+// parameter and port metadata, generated from __MOD__-rnbo/description.json by the scripts
+// lets the module be configured, and previewed in the browser, without querying a patch instance
+#if __has_include("__MOD__-rnbo/__MOD__Meta.h")
+#include "__MOD__-rnbo/__MOD__Meta.h"
+#define MODULE_HAS_META
 #endif
 
-struct __MOD__ : Module {
-    enum LightId { LIGHTS_LEN };
-    // if you use a CUSTOM UI, this is where you need to add enum paramId, enum InputId, enum OutputId
-
-    __MOD__() {
-        rnboInit();
-        config(rnbo_.nParams_, rnbo_.nInputs_, rnbo_.nOutputs_, LIGHTS_LEN);
-        for (int i = 0; i < rnbo_.nParams_; i++) {
-            RNBO::ParameterInfo p_info;
-            rnbo_.patch_.getParameterInfo(i, &p_info);
-            auto displayName = p_info.displayName;
-            // auto steps = p_info.steps;
-            auto min = p_info.min;
-            auto max = p_info.max;
-            auto defaultVal = p_info.initialValue;
-            configParam(i, min, max, defaultVal, displayName);
-        }
-
-        for (int i = 0; i < rnbo_.nInputs_; i++) {
-            // no name in rnbo for inputs/outputs
-            const std::string name = "";
-            configInput(i, name);
-        }
-        for (int i = 0; i < rnbo_.nOutputs_; i++) {
-            // no name in rnbo for inputs/outputs
-            const std::string name = "";
-            configOutput(i, name);
+struct __MOD__::RNBOPatch {
+    // the patch (its state and event queue) comes from the plugin's pool, like its buffers
+    // (noexcept: new returns nullptr when the pool has no memory, rather than constructing at it)
+    static void* operator new(size_t size) noexcept { return RNBO::Platform::malloc(size); }
+    static void operator delete(void* ptr, size_t) noexcept { RNBO::Platform::free(ptr); }
+
+    RNBO::__MOD__Rnbo<__MOD__Engine> patch_;
+    int nInputs_ = 0;
+    RNBO::number** inputBuffers_ = nullptr;
+    int nOutputs_ = 0;
+    RNBO::number** outputBuffers_ = nullptr;
+    int nParams_ = 0;
+
+    // the pointer tables and every channel's buffer are one block, each buffer starting on its own cache line,
+    // so staging a sample touches neighbouring memory and the voice frees its io in one go
+    static constexpr size_t cacheLine_ = 64;
+    unsigned char* ioBlock_ = nullptr;
+
+    static size_t cacheLines(size_t bytes) { return (bytes + cacheLine_ - 1) & ~(cacheLine_ - 1); }
+
+    void allocateIo(unsigned int bufferSize) {
+        const int channels = nInputs_ + nOutputs_;
+        const size_t tableBytes = cacheLines(channels * sizeof(RNBO::number*));
+        const size_t channelBytes = cacheLines(bufferSize * sizeof(RNBO::number));
+        // the pool aligns to max_align_t, the spare line lets the block start on a cache line
+        ioBlock_ = rnboAllocArray<unsigned char>(cacheLine_ + tableBytes + channels * channelBytes);
+        unsigned char* base = ioBlock_ + (cacheLine_ - reinterpret_cast<uintptr_t>(ioBlock_) % cacheLine_) % cacheLine_;
+        inputBuffers_ = reinterpret_cast<RNBO::number**>(base);
+        outputBuffers_ = inputBuffers_ + nInputs_;
+        for (int c = 0; c < channels; c++) {
+            inputBuffers_[c] = reinterpret_cast<RNBO::number*>(base + tableBytes + c * channelBytes);
         }
     }
 
-    ~__MOD__() override { rnboDeInit(); }
-
-
-    void process(const ProcessArgs& args) override { doProcess(args); }
-
-    void doProcess(const ProcessArgs& args);
-
-    void rnboInit();
-    void rnboDeInit();
-
-    unsigned int curBufPos_ = 0;
-
-    const unsigned int bufferSize_ = 1;
-    unsigned int sampleRate_ = 48000;
+    void freeIo() {
+        rnboFreeArray(ioBlock_);
+        ioBlock_ = nullptr;
+        inputBuffers_ = outputBuffers_ = nullptr;
+    }
+};
+static_assert(alignof(__MOD__::RNBOPatch) <= alignof(std::max_align_t),
+              "the pool aligns blocks like malloc, an over-aligned patch needs an aligned operator new");
+
+__MOD__::__MOD__() {
+    rnboInit();
+    config(nParams_, nInputs_, nOutputs_, LIGHTS_LEN);
+#ifdef MODULE_HAS_META
+    if (metaMatchesPatch()) {
+        configParamsFromMeta();
+    } else {
+        WARN("__MOD__ : __MOD__Meta.h does not match the rnbo export, run scripts/check.py to regenerate it");
+        configParamsFromPatch();
+    }
+#else
+    configParamsFromPatch();
+#endif
 
-    struct RNBOPatch {
-        RNBO::__MOD__Rnbo<RNBO::MinimalEngine<>> patch_;
-        int nInputs_ = 0;
-        RNBO::number** inputBuffers_;
-        int nOutputs_ = 0;
-        RNBO::number** outputBuffers_;
-        int nParams_ = 0;
-        float* lastParamVals_;
-    } rnbo_;
+    for (int i = 0; i < nInputs_; i++) {
+        // no name in rnbo for inputs/outputs
+        const std::string name = "";
+        configInput(i, name);
+    }
+    for (int i = 0; i < nOutputs_; i++) {
+        // no name in rnbo for inputs/outputs
+        const std::string name = "";
+        configOutput(i, name);
+    }
+    updateLatencyInfo();
 
-    RNBO::__MOD__Rnbo<RNBO::MinimalEngine<>>* getRnboPatch() { return &rnbo_.patch_; }
+    controlDivider_.setDivision(controlDivision_);
+    if (processTiming_) { timing_ = new ProcessTiming; }
+    // initial scan, so all parameters are sent to rnbo on the first block
+    scanParams();
+}
 
-    void onSampleRateChange(const SampleRateChangeEvent& e) override {
-        sampleRate_ = e.sampleRate;
-        rnbo_.patch_.prepareToProcess(sampleRate_, bufferSize_, false);
+__MOD__::~__MOD__() {
+    rnboDeInit();
+    delete timing_;
+    const RnboAllocatorStats memory = rnboAllocatorStats();
+    if (memory.realtimeMisses) {
+        WARN("__MOD__ : %zu allocations while processing found no pooled block of their size, %zu failed",
+             memory.realtimeMisses, memory.realtimeFailures);
     }
-};
+    // the last module of the plugin has gone, give the pooled memory back (never done while processing)
+    if (memory.bytesInUse == 0) { rnboAllocatorTrim(); }
+}
 
-void __MOD__::rnboInit() {
-    rnbo_.patch_.initialize();
+void __MOD__::configParamsFromPatch() {
+    for (int i = 0; i < nParams_; i++) {
+        RNBO::ParameterInfo p_info;
+        voices_[0]->patch_.getParameterInfo(i, &p_info);
+        auto displayName = p_info.displayName;
+        // auto steps = p_info.steps;
+        auto min = p_info.min;
+        auto max = p_info.max;
+        auto defaultVal = p_info.initialValue;
+        configParam(i, min, max, defaultVal, displayName);
+    }
+}
 
-    rnbo_.nInputs_ = rnbo_.patch_.getNumInputChannels();
-    rnbo_.inputBuffers_ = new RNBO::number*[rnbo_.nInputs_];
-    for (int i = 0; i < rnbo_.nInputs_; i++) { rnbo_.inputBuffers_[i] = new RNBO::number[bufferSize_]; }
-    rnbo_.nOutputs_ = rnbo_.patch_.getNumOutputChannels();
-    rnbo_.outputBuffers_ = new RNBO::number*[rnbo_.nOutputs_];
-    for (int i = 0; i < rnbo_.nOutputs_; i++) { rnbo_.outputBuffers_[i] = new RNBO::number[bufferSize_]; }
+#ifdef MODULE_HAS_META
+bool __MOD__::metaMatchesPatch() const {
+    return nParams_ == __MOD___Meta::numParameters && nInputs_ == __MOD___Meta::numInputs &&
+           nOutputs_ == __MOD___Meta::numOutputs;
+}
 
-    rnbo_.nParams_ = rnbo_.patch_.getNumParameters();
-    rnbo_.lastParamVals_ = new float[rnbo_.nParams_];
-    for (int i = 0; i < rnbo_.nParams_; i++) { rnbo_.lastParamVals_[i] = -1.0; }
+void __MOD__::configParamsFromMeta() {
+    for (int i = 0; i < __MOD___Meta::numParameters; i++) {
+        const auto& p_meta = __MOD___Meta::params[i];
+        configParam(i, p_meta.min, p_meta.max, p_meta.initialValue, p_meta.displayName);
+    }
+}
+#endif
 
-    rnbo_.patch_.prepareToProcess(sampleRate_, bufferSize_, false);
+__MOD__::PreviewInfo __MOD__::previewInfo() {
+    PreviewInfo info;
+#ifdef MODULE_HAS_META
+    info.nParams = __MOD___Meta::numParameters;
+    info.nInputs = __MOD___Meta::numInputs;
+    info.nOutputs = __MOD___Meta::numOutputs;
+    for (int i = 0; i < info.nParams; i++) { info.paramNames.push_back(__MOD___Meta::params[i].displayName); }
+#else
+    auto* pPatch = new RNBO::__MOD__Rnbo<__MOD__Engine>();
+    pPatch->initialize();
+    info.nParams = pPatch->getNumParameters();
+    info.nInputs = pPatch->getNumInputChannels();
+    info.nOutputs = pPatch->getNumOutputChannels();
+    for (int i = 0; i < info.nParams; i++) {
+        RNBO::ParameterInfo p_info;
+        pPatch->getParameterInfo(i, &p_info);
+        info.paramNames.push_back(p_info.displayName);
+    }
+    delete pPatch;
+#endif
+    return info;
 }
 
-void __MOD__::rnboDeInit() {
-    for (int i = 0; i < rnbo_.nInputs_; i++) { delete rnbo_.inputBuffers_[i]; }
-    delete rnbo_.inputBuffers_;
-    for (int i = 0; i < rnbo_.nOutputs_; i++) { delete rnbo_.outputBuffers_[i]; }
-    delete rnbo_.outputBuffers_;
-    delete rnbo_.lastParamVals_;
+void __MOD__::onSampleRateChange(const SampleRateChangeEvent& e) {
+    sampleRate_ = e.sampleRate;
+    updateDecimation();
+    updateLatencyInfo();
+    for (int v = 0; v < maxVoices_; v++) {
+        if (voices_[v]) { voices_[v]->patch_.prepareToProcess(rnboSampleRate_, bufferSize_, false); }
+    }
+    rnboAllocatorReserve();
 }
 
+void __MOD__::initVoice(RNBOPatch& voice) {
+    voice.patch_.initialize();
 
-#ifdef GENERIC_UI
-using namespace __MOD___UI;
-struct __MOD__Widget : ModuleWidget {
-    __MOD__Widget(__MOD__* module) {
-        /// a generic layout for modules
-        // if you want a custom UI layout, you could replace this with a generated one from vcv sdk
-        // you would need to ensure the parameter, input and output indexes matched RNBO
+    voice.nInputs_ = voice.patch_.getNumInputChannels();
+    voice.nOutputs_ = voice.patch_.getNumOutputChannels();
+    voice.allocateIo(bufferSize_);
+    voice.nParams_ = voice.patch_.getNumParameters();
 
-        setModule(module);
-        setPanel(createPanel(asset::plugin(pluginInstance, "res/__PANEL__")));
+    voice.patch_.prepareToProcess(rnboSampleRate_, bufferSize_, false);
+}
 
-        addChild(createWidget<ScrewSilver>(Vec(RACK_GRID_WIDTH, 0)));
-        addChild(createWidget<ScrewSilver>(Vec(box.size.x - 2 * RACK_GRID_WIDTH, 0)));
-        addChild(createWidget<ScrewSilver>(Vec(RACK_GRID_WIDTH, RACK_GRID_HEIGHT - RACK_GRID_WIDTH)));
-        addChild(createWidget<ScrewSilver>(Vec(box.size.x - 2 * RACK_GRID_WIDTH, RACK_GRID_HEIGHT - RACK_GRID_WIDTH)));
+void __MOD__::deInitVoice(RNBOPatch& voice) {
+    voice.freeIo();
+}
 
-        const float maxWidthInPx = box.size.x;
-        const float maxWidth = (maxWidthInPx / mm2px(1.0)) - borderX;
-#ifdef GENERIC_TITLE_LABEL
-        addLabel(mm2px(Vec(borderX / 2.0f, 0)), "__MODNAME__", 18.f, maxWidth, nvgRGB(0xff, 0x00, 0x00));
-#endif
-        RNBO::__MOD__Rnbo<RNBO::MinimalEngine<>>* pPatch = nullptr;
-        if (module) {
-            pPatch = module->getRnboPatch();
-        } else {
-            // model == null  means preview, so we need to query patch directly
-            pPatch = new RNBO::__MOD__Rnbo<RNBO::MinimalEngine<>>();
-            pPatch->initialize();
+void __MOD__::rnboInit() {
+    updateDecimation();
+    // every voice is created here, never while processing, inactive voices just are not processed
+    for (int v = 0; v < maxVoices_; v++) {
+        voices_[v] = new RNBOPatch;
+        if (!voices_[v]) {
+            WARN("__MOD__ : out of memory, created %d of %d voices", v, maxVoices_);
+            break;
         }
-        int nParams = pPatch->getNumParameters();
-        int nInputs = pPatch->getNumInputChannels();
-        int nOutputs = pPatch->getNumOutputChannels();
+        initVoice(*voices_[v]);
+        createdVoices_ = v + 1;
+    }
+    // without a single voice the module has no ports and stays silent
+    if (!createdVoices_) return;
+    nParams_ = voices_[0]->nParams_;
+    nInputs_ = voices_[0]->nInputs_;
+    nOutputs_ = voices_[0]->nOutputs_;
+
+    lastParamVals_ = rnboAllocArray<float>(nParams_);
+    for (int i = 0; i < nParams_; i++) { lastParamVals_[i] = -1.0; }
+    nParamWords_ = (nParams_ + 31) / 32;
+    paramDirty_ = rnboAllocArray<uint32_t>(nParamWords_);
+
+    inputConnected_ = rnboAllocArray<bool>(nInputs_);
+    outputConnected_ = rnboAllocArray<bool>(nOutputs_);
+    heldOutputs_ = rnboAllocArray<float>(maxVoices_ * nOutputs_);
+    // what the patches allocate while processing comes from the pool only, keep some blocks ready
+    rnboAllocatorReserve();
+}
 
-        float posX = borderX;
-        float posY = titleSpaceY;
-        RNBO::ParameterInfo p_info;
-        for (int i = 0; i < nParams; i++) {
-            if (posX >= maxWidth) {
-                posY += spaceY;
-                posX = borderX;
-            }
-            addParam(createParamCentered<RoundBlackKnob>(mm2px(Vec(posX, posY)), module, i));
-            pPatch->getParameterInfo(i, &p_info);
-            auto pname = p_info.displayName;
-            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))), pname, 10.f, spaceX,
-                     nvgRGB(0x00, 0x00, 0x00));
-            posX += spaceX;
+void __MOD__::rnboDeInit() {
+    for (int v = 0; v < maxVoices_; v++) {
+        if (voices_[v]) {
+            deInitVoice(*voices_[v]);
+            delete voices_[v];
+            voices_[v] = nullptr;
         }
+    }
+    rnboFreeArray(lastParamVals_);
+    rnboFreeArray(paramDirty_);
+    rnboFreeArray(inputConnected_);
+    rnboFreeArray(outputConnected_);
+    rnboFreeArray(heldOutputs_);
+}
 
-        posX = borderX;
-        posY += inputSpaceY;
-        for (int i = 0; i < nInputs; i++) {
-            if (posX >= maxWidth) {
-                posY += spaceY;
-                posX = borderX;
-            }
-            addInput(createInputCentered<PJ301MPort>(mm2px(Vec(posX, posY)), module, i));
-            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))),
-                     std::string("In") + std::to_string(i + 1), 10.f, spaceX, nvgRGB(0x00, 0x00, 0x00));
-            posX += spaceX;
+void __MOD__::scanParams() {
+    for (int i = 0; i < nParams_; i++) {
+        float param = params[i].getValue();
+        if (lastParamVals_[i] != param) {
+            lastParamVals_[i] = param;
+            paramDirty_[i >> 5] |= 1u << (i & 31);
+            anyParamDirty_ = true;
         }
+    }
+}
 
-        posX = borderX;
-        posY += outputSpaceY;
-        for (int i = 0; i < nOutputs; i++) {
-            if (posX >= maxWidth) {
-                posY += spaceY;
-                posX = borderX;
-            }
-            addOutput(createOutputCentered<PJ301MPort>(mm2px(Vec(posX, posY)), module, i));
-            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))),
-                     std::string("Out") + std::to_string(i + 1), 10.f, spaceX, nvgRGB(0x00, 0x00, 0x00));
-            posX += spaceX;
+void __MOD__::applyDirtyParams() {
+    // set parameters up for patch, only those changed since last block
+    for (int w = 0; w < nParamWords_; w++) {
+        uint32_t bits = paramDirty_[w];
+        while (bits) {
+            int i = (w << 5) + __builtin_ctz(bits);
+            bits &= bits - 1;
+            // INFO("set value %i %f", i, lastParamVals_[i]);
+            for (int v = 0; v < nVoices_; v++) { voices_[v]->patch_.setParameterValue(i, lastParamVals_[i], RNBO::TimeNow); }
         }
+        paramDirty_[w] = 0;
+    }
+    anyParamDirty_ = false;
+    wake();
+}
 
-        if (!module) { delete pPatch; }
+void __MOD__::updateVoices() {
+    // voices follow the widest connected input
+    int channels = 1;
+    for (int i = 0; i < nInputs_; i++) {
+        if (inputConnected_[i]) { channels = std::max(channels, inputs[i].getChannels()); }
     }
+    wantedVoices_ = std::min(channels, createdVoices_);
+}
 
-    void addLabel(const Vec& pos, const std::string& txt, float fontSize, float width, const NVGcolor& clr) {
-        auto* label = new Label();
-        label->box.pos = pos;
-        label->box.size.x = mm2px(width * 2);
-        label->box.size.y = fontSize;
-        label->lineHeight = 1.0f;
-        label->text = txt.c_str();
-        label->color = clr;
-        label->fontSize = fontSize;
-        label->alignment = Label::LEFT_ALIGNMENT;
-        addChild(label);
+void __MOD__::setActiveVoices(int n) {
+    for (int v = nVoices_; v < n; v++) {
+        // clear stale output and the held samples it interpolates from, and reset the patch
+        // (a forced dsp setup clears filters and delays, without allocating) so an old tail is not heard
+        for (int i = 0; i < nOutputs_; i++) {
+            std::fill(voices_[v]->outputBuffers_[i], voices_[v]->outputBuffers_[i] + bufferSize_, 0.f);
+            heldOutputs_[v * nOutputs_ + i] = 0.f;
+        }
+        voices_[v]->patch_.prepareToProcess(rnboSampleRate_, bufferSize_, true);
+        // inactive voices do not receive parameter changes, so bring them up to date
+        for (int i = 0; i < nParams_; i++) {
+            voices_[v]->patch_.setParameterValue(i, lastParamVals_[i], RNBO::TimeNow);
+        }
     }
-};
-#else
-// this is where you need to place the CUSTOM WIDGET
-// see above, about generating and creating struct __MOD__Widget
-#endif  //  GENERIC_UI
+    nVoices_ = n;
+}
 
+void __MOD__::updateQueueTelemetry(RNBOPatch& voice) {
+    const auto* engine = static_cast<const QueueTelemetryEngine<MODULE_QUEUE_SIZE>*>(voice.patch_.getEngine());
+    queuePeak_ = std::max(queuePeak_, (unsigned int)engine->peak_);
+    queueDropped_ = std::max(queueDropped_, (unsigned int)engine->dropped_);
+}
 
-Model* model__MOD__ = createModel<__MOD__, __MOD__Widget>("__MOD__");
+void __MOD__::interpolateOutputs() {
+    // the next rnbo sample is always available, if the block is used up the next block has already been processed
+    const unsigned int next = curBufPos_ < bufferSize_ ? curBufPos_ : 0;
+    const float frac = (float)(decimationPhase_ - 1) / decimation_;
+    for (int i = 0; i < nOutputs_; i++) {
+        for (int v = 0; v < nVoices_; v++) {
+            const float held = heldOutputs_[v * nOutputs_ + i];
+            outputs[i].setVoltage(held + (voices_[v]->outputBuffers_[i][next] - held) * frac, v);
+        }
+    }
+}
 
 void __MOD__::doProcess(const ProcessArgs& args) {
+    if (!createdVoices_) return;
     if (curBufPos_ >= bufferSize_) { curBufPos_ = 0; }
 
-    for (int i = 0; i < rnbo_.nInputs_; i++) {
-        if (inputs[i].isConnected()) {
-            rnbo_.inputBuffers_[i][curBufPos_] = inputs[i].getVoltage() / 5.f;
-        } else {
-            rnbo_.inputBuffers_[i][curBufPos_] = 0.f;
+    if (controlDivider_.process()) {
+        scanParams();
+        if (maxVoices_ > 1) { updateVoices(); }
+    }
+
+    if (decimation_ > 1) {
+        if (decimationPhase_++ > 0) {
+            // between rnbo samples, held outputs need nothing
+            if (rateInterpolate_) { interpolateOutputs(); }
+            if (decimationPhase_ == decimation_) { decimationPhase_ = 0; }
+            return;
+        }
+    }
+
+    if (maxVoices_ == 1) {
+        RNBOPatch& voice = *voices_[0];
+        for (int i = 0; i < nInputs_; i++) {
+            voice.inputBuffers_[i][curBufPos_] = inputConnected_[i] ? inputs[i].getVoltage() : 0.f;
+        }
+        for (int i = 0; i < nOutputs_; i++) { outputs[i].setVoltage(voice.outputBuffers_[i][curBufPos_]); }
+    } else {
+        // 4 voices at a time, monophonic inputs are shared by all voices
+        for (int i = 0; i < nInputs_; i++) {
+            for (int c = 0; c < nVoices_; c += 4) {
+                simd::float_4 in = inputConnected_[i] ? inputs[i].getPolyVoltageSimd<simd::float_4>(c) : 0.f;
+                const int n = std::min(4, nVoices_ - c);
+                for (int k = 0; k < n; k++) { voices_[c + k]->inputBuffers_[i][curBufPos_] = in[k]; }
+            }
+        }
+        for (int i = 0; i < nOutputs_; i++) {
+            outputs[i].setChannels(nVoices_);
+            for (int c = 0; c < nVoices_; c += 4) {
+                simd::float_4 out = 0.f;
+                const int n = std::min(4, nVoices_ - c);
+                for (int k = 0; k < n; k++) { out[k] = voices_[c + k]->outputBuffers_[i][curBufPos_]; }
+                outputs[i].setVoltageSimd(out, c);
+            }
         }
     }
-    for (int i = 0; i < rnbo_.nOutputs_; i++) { outputs[i].setVoltage(rnbo_.outputBuffers_[i][curBufPos_] * 5.f); }
 
     curBufPos_++;
+    if (decimation_ > 1 && rateInterpolate_) {
+        // remember this rnbo sample, outputs move towards the next one until the next rnbo sample
+        for (int v = 0; v < nVoices_; v++) {
+            for (int i = 0; i < nOutputs_; i++) {
+                heldOutputs_[v * nOutputs_ + i] = voices_[v]->outputBuffers_[i][curBufPos_ - 1];
+            }
+        }
+    }
     // Perform when we've filled the buffer
     if (curBufPos_ == bufferSize_) {
-        // set parameters up for patch, only set on change
-
-        for (int i = 0; i < rnbo_.nParams_; i++) {
-            float param = params[i].getValue();
-            if (rnbo_.lastParamVals_[i] != param) {
-                // INFO("set value %i %f", i, param);
-                rnbo_.patch_.setParameterValue(i, param, RNBO::TimeNow);
-                rnbo_.lastParamVals_[i] = param;
+        // the patches only get pooled memory from here on, never the system allocator
+        RnboRealtimeScope realtime;
+        if (wantedVoices_ != nVoices_) { setActiveVoices(wantedVoices_); }
+        if (anyParamDirty_) { applyDirtyParams(); }
+        float inPeak = 0.f;
+        for (int v = 0; v < nVoices_; v++) {
+            RNBOPatch& voice = *voices_[v];
+            for (int i = 0; i < voice.nInputs_; i++) {
+                scaleBlock(voice.inputBuffers_[i], inputGain_);
+                if (tailSafe_) { inPeak = std::max(inPeak, blockPeak(voice.inputBuffers_[i])); }
+            }
+        }
+        if (inPeak > sleepThreshold_) { wake(); }
+
+        const bool sleep = nOutputsConnected_ == 0 || (tailSafe_ && silentSamples_ >= sleepTailTime_ * rnboSampleRate_);
+        if (sleep) {
+            if (!sleeping_) {
+                // silence outputs, rather than repeating the last block
+                for (int v = 0; v < nVoices_; v++) {
+                    for (int i = 0; i < nOutputs_; i++) {
+                        std::fill(voices_[v]->outputBuffers_[i], voices_[v]->outputBuffers_[i] + bufferSize_, 0.f);
+                    }
+                }
+                sleeping_ = true;
+            }
+            return;
+        }
+        sleeping_ = false;
+
+        float outPeak = 0.f;
+        // timed as a whole, every voice, as that is what has to fit the block's budget
+        const uint64_t start = processTiming_ ? processTimingTicks() : 0;
+        for (int v = 0; v < nVoices_; v++) {
+            RNBOPatch& voice = *voices_[v];
+            voice.patch_.process(voice.inputBuffers_, voice.nInputs_, voice.outputBuffers_, voice.nOutputs_, bufferSize_);
+            if (queueTelemetry_) { updateQueueTelemetry(voice); }
+            for (int i = 0; i < voice.nOutputs_; i++) {
+                scaleBlock(voice.outputBuffers_[i], outputGain_);
+                if (tailSafe_) { outPeak = std::max(outPeak, blockPeak(voice.outputBuffers_[i]) * inputGain_); }
+            }
+        }
+        if (processTiming_) { timing_->add(processTimingTicks() - start); }
+        if (tailSafe_) {
+            if (outPeak > sleepThreshold_) {
+                wake();
+            } else {
+                silentSamples_ += bufferSize_;
             }
         }
-        rnbo_.patch_.process(rnbo_.inputBuffers_, rnbo_.nInputs_, rnbo_.outputBuffers_, rnbo_.nOutputs_, bufferSize_);
     }
 }
+
+#undef MODULE_HAS_META
+#undef MODULE_QUEUE_SIZE
+#undef MODULE_LIST_SIZE
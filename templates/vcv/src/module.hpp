@@ -0,0 +1,229 @@
+#pragma once
+#include "plugin.hpp"
+#include "process_timing.hpp"
+
+// __MOD__ module, shared by the dsp (__MOD__.cpp) and the ui (__MOD__.ui.cpp)
+// only the dsp includes the rnbo export, the patch itself is opaque here (RNBOPatch),
+// so the ui, and anything else including this, compiles without the rnbo headers
+
+
+// a couple of user options, the ui options (GENERIC_UI...) are at the top of __MOD__.ui.cpp
+
+// processing block size in samples (1, 4, 8, 16, 32 or 64)
+// rnbo is processed once per block rather than once per sample, which reduces cpu
+// but delays outputs by one block (see latencySamples())
+#define MODULE_BLOCK_SIZE __BLOCKSIZE__
+
+// control rate divider, parameters (knobs) are scanned every N samples rather than every sample
+// only parameters that have changed since the last scan are sent to rnbo
+#define MODULE_CONTROL_DIVIDER __CONTROLDIVIDER__
+
+// maximum polyphonic voices (1 = monophonic, up to 16)
+// when polyphonic, each voice is a separate rnbo instance following the channel count of the widest input,
+// all voices are created with the module (memory for every one of them), only those in use are processed
+#define MODULE_MAX_VOICES __MAXVOICES__
+
+// auto sleep, rnbo is not processed while none of the outputs are connected
+// tail safe patches (1) also sleep once inputs and outputs have been silent for MODULE_SLEEP_TAIL_MS,
+// waking on any input, parameter or connection change.
+// only mark patches tail safe if they stay silent without input (effects, not oscillators/sequencers)
+#define MODULE_TAIL_SAFE __TAILSAFE__
+#define MODULE_SLEEP_TAIL_MS __SLEEPTAILMS__
+
+// reduced internal sample rate, for control rate patches (lfos, envelopes, sequencers)
+// rnbo runs at the engine rate divided by MODULE_RATE_DIVIDER, and no faster than MODULE_MAX_RATE (0 = no limit),
+// outputs are linearly interpolated back up to the engine rate (MODULE_RATE_INTERPOLATE 1) or held (0)
+#define MODULE_RATE_DIVIDER __RATEDIVIDER__
+#define MODULE_MAX_RATE __MAXRATE__
+#define MODULE_RATE_INTERPOLATE __RATEINTERPOLATE__
+
+// process timing (1 = on, 0 = off), every block rnbo processes (all voices together) is measured,
+// with a cycle counter on x86 and arm64, with the slower std::chrono::steady_clock on 32 bit arm (see process_timing.hpp),
+// the average, worst case and a histogram are shown in the context menu and can be saved to a file.
+// for finding cpu spikes while developing, leave off for release builds
+#define MODULE_PROCESS_TIMING 0
+
+// event queue telemetry (1 = on, 0 = off), records the most events (parameter inits, clocks, scheduled changes)
+// waiting in the patch's event queue at once, shown in the context menu and saved for scripts/setSizes.py,
+// which sizes the queue (MODULE_QUEUE_SIZE in __MOD__-rnbo/__MOD__Sizes.h) from it. leave off for release builds
+#define MODULE_QUEUE_TELEMETRY 0
+
+
+struct __MOD__ : Module {
+    enum LightId { LIGHTS_LEN };
+    // if you use a CUSTOM UI, this is where you need to add enum paramId, enum InputId, enum OutputId
+
+    __MOD__();
+    ~__MOD__() override;
+
+    void process(const ProcessArgs& args) override { doProcess(args); }
+
+    void doProcess(const ProcessArgs& args);
+
+    void rnboInit();
+    void rnboDeInit();
+    void configParamsFromPatch();
+    void configParamsFromMeta();
+    bool metaMatchesPatch() const;
+
+    // port and parameter counts of the patch, the same for every voice
+    int nParams_ = 0;
+    int nInputs_ = 0;
+    int nOutputs_ = 0;
+
+    // what the module browser preview (no module) needs to lay out the panel,
+    // from the generated metadata, or a temporary patch instance if there is none
+    struct PreviewInfo {
+        int nParams = 0;
+        int nInputs = 0;
+        int nOutputs = 0;
+        std::vector<std::string> paramNames;
+    };
+    static PreviewInfo previewInfo();
+
+    // inputs are written into, and outputs read from, the rnbo buffers at curBufPos_
+    // rnbo processes the whole block when it is full, so outputs lag inputs by one block
+    unsigned int curBufPos_ = 0;
+
+    static constexpr unsigned int bufferSize_ = MODULE_BLOCK_SIZE;
+    static_assert(bufferSize_ >= 1 && bufferSize_ <= 64 && (bufferSize_ & (bufferSize_ - 1)) == 0,
+                  "MODULE_BLOCK_SIZE must be 1, 4, 8, 16, 32 or 64");
+    unsigned int sampleRate_ = 48000;
+
+    // reduced internal rate, rnbo processes one sample every decimation_ engine samples
+    // inputs are sampled on that engine sample, outputs interpolated (or held) in between
+    static constexpr unsigned int rateDivider_ = MODULE_RATE_DIVIDER;
+    static constexpr unsigned int maxRate_ = MODULE_MAX_RATE;
+    static constexpr bool rateInterpolate_ = MODULE_RATE_INTERPOLATE;
+    static_assert(rateDivider_ >= 1, "MODULE_RATE_DIVIDER must be at least 1");
+    unsigned int decimation_ = 1;
+    unsigned int decimationPhase_ = 0;
+    unsigned int rnboSampleRate_ = 48000;
+    float* heldOutputs_ = nullptr;  // [voice * nOutputs + output], output at the last rnbo sample
+
+    void updateDecimation() {
+        const unsigned int limit = maxRate_ > 0 ? maxRate_ : sampleRate_;
+        decimation_ = std::max(rateDivider_, (sampleRate_ + limit - 1) / limit);
+        rnboSampleRate_ = sampleRate_ / decimation_;
+        decimationPhase_ = 0;
+    }
+
+    void interpolateOutputs();
+
+    // a block of rnbo samples, and interpolating outputs adds one rnbo sample more (towards the next rnbo sample)
+    unsigned int latencySamples() const {
+        return bufferSize_ * decimation_ + (rateInterpolate_ && decimation_ > 1 ? decimation_ : 0);
+    }
+
+    void updateLatencyInfo() {
+        for (int i = 0; i < nOutputs_; i++) {
+            outputInfos[i]->description = latencySamples() > 1 ? string::f("Latency: %u samples", latencySamples()) : "";
+        }
+    }
+
+    // rnbo works with +/-1, vcv with +/-5v
+    // ports are staged a voice per simd lane without scaling, the gains are applied to the whole block,
+    // inputs before rnbo processes it and outputs straight after
+    static constexpr float inputGain_ = 1.f / 5.f;
+    static constexpr float outputGain_ = 5.f;
+
+    // auto sleep state, see MODULE_TAIL_SAFE
+    static constexpr bool tailSafe_ = MODULE_TAIL_SAFE;
+    static constexpr float sleepThreshold_ = 1e-4f;  // rnbo units, about 0.5mV
+    static constexpr float sleepTailTime_ = MODULE_SLEEP_TAIL_MS / 1000.f;
+    int nOutputsConnected_ = 0;
+    unsigned int silentSamples_ = 0;
+    bool sleeping_ = false;
+
+    void wake() { silentSamples_ = 0; }
+
+    template <typename T>
+    static float blockPeak(const T* buf) {
+        float peak = 0.f;
+        for (unsigned int k = 0; k < bufferSize_; k++) { peak = std::max(peak, (float)std::fabs(buf[k])); }
+        return peak;
+    }
+
+    template <typename T>
+    static void scaleBlock(T* buf, float gain) {
+        unsigned int k = 0;
+        if constexpr (std::is_same<T, float>::value) {
+            for (; k + 4 <= bufferSize_; k += 4) { (simd::float_4::load(buf + k) * gain).store(buf + k); }
+        }
+        for (; k < bufferSize_; k++) { buf[k] *= gain; }
+    }
+
+    // control rate state
+    // parameters are scanned at control rate and changed ones marked dirty (one bit per parameter),
+    // dirty parameters are sent to rnbo at the start of the next block
+    static constexpr unsigned int controlDivision_ = MODULE_CONTROL_DIVIDER;
+    dsp::ClockDivider controlDivider_;
+    float* lastParamVals_ = nullptr;
+    int nParamWords_ = 0;
+    uint32_t* paramDirty_ = nullptr;
+    bool anyParamDirty_ = false;
+
+    // port connection state, cached and only updated when ports are connected/disconnected
+    bool* inputConnected_ = nullptr;
+    bool* outputConnected_ = nullptr;
+
+    void scanParams();
+    void applyDirtyParams();
+
+    void onPortChange(const PortChangeEvent& e) override {
+        if (e.type == Port::INPUT) {
+            inputConnected_[e.portId] = e.connecting;
+        } else {
+            outputConnected_[e.portId] = e.connecting;
+            nOutputsConnected_ += e.connecting ? 1 : -1;
+        }
+        wake();
+    }
+
+    // a patch instance and its buffers, defined with the rnbo export in __MOD__.cpp
+    struct RNBOPatch;
+
+    // polyphony, all voices are created with the module (nothing is allocated while processing),
+    // the first nVoices_ are processed, as many as the inputs carry channels
+    static constexpr int maxVoices_ = MODULE_MAX_VOICES;
+    static_assert(maxVoices_ >= 1 && maxVoices_ <= PORT_MAX_CHANNELS, "MODULE_MAX_VOICES must be 1 to 16");
+    RNBOPatch* voices_[maxVoices_] = {};
+    int createdVoices_ = 0;  // maxVoices_, unless the pool ran out of memory
+    int nVoices_ = 1;
+    int wantedVoices_ = 1;
+
+    void initVoice(RNBOPatch& voice);
+    void deInitVoice(RNBOPatch& voice);
+    void updateVoices();
+    void setActiveVoices(int n);
+
+    void onSampleRateChange(const SampleRateChangeEvent& e) override;
+
+    // process timing, see MODULE_PROCESS_TIMING, only allocated when on
+    static constexpr bool processTiming_ = MODULE_PROCESS_TIMING;
+    ProcessTiming* timing_ = nullptr;
+
+    // the time processing a block (every voice) has before it is late, one block at the rnbo rate
+    double timingBudget() const { return (double)bufferSize_ / rnboSampleRate_; }
+
+    // event queue telemetry, see MODULE_QUEUE_TELEMETRY, the most events any voice has had queued,
+    // and events dropped for want of room, since the module was created (the parameter inits included)
+    static constexpr bool queueTelemetry_ = MODULE_QUEUE_TELEMETRY;
+    static const unsigned int queueSize_;  // MODULE_QUEUE_SIZE
+    unsigned int queuePeak_ = 0;
+    unsigned int queueDropped_ = 0;
+
+    void updateQueueTelemetry(RNBOPatch& voice);
+};
+
+// per module options, undefined once used so the next module in a unity build can set its own
+#undef MODULE_BLOCK_SIZE
+#undef MODULE_CONTROL_DIVIDER
+#undef MODULE_MAX_VOICES
+#undef MODULE_TAIL_SAFE
+#undef MODULE_SLEEP_TAIL_MS
+#undef MODULE_RATE_DIVIDER
+#undef MODULE_MAX_RATE
+#undef MODULE_RATE_INTERPOLATE
+#undef MODULE_PROCESS_TIMING
+#undef MODULE_QUEUE_TELEMETRY
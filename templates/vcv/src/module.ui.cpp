@@ -0,0 +1,203 @@
+#include "__MOD__.hpp"
+
+// __MOD__ panel and model, the dsp is in __MOD__.cpp
+
+
+// a couple of user options
+
+// use a generic title - disable by commenting out (with //)
+// comment this out, and then have a custom panel with title on background
+#define GENERIC_TITLE_LABEL
+
+
+// use the generic UI - disable by commenting out (with //)
+// to use your own UI you will need to :
+// - comment GENERIC_UI out
+// - create a panel file (res/__MOD__.svg), which has params and IO in same order as rnbo patch
+// - run $RACK_DIR/helper.py createmodule __MOD__ res/__MOD__.svg tmp.cpp
+// - from tmp.cpp copy enum ParamId, InputId, OutputId and place in __MOD__.hpp after enum LightId
+// - from tmp.cpp copy ___MOD__Widget and replace where indicated below (search CUSTOM WIDGET)
+// to come: more information in documentation and possible yt video on my channel.
+#define GENERIC_UI
+
+
+#ifdef GENERIC_UI
+namespace __MOD___UI {
+const float titleSpaceY = 20.f;
+const float inputSpaceY = 20.f;
+const float outputSpaceY = 20.f;
+
+const float borderX = 17.f;
+const float spaceY = 15.f;
+const float spaceX = 15.f;
+};  // namespace __MOD___UI
+#endif
+
+#ifdef GENERIC_UI
+struct __MOD__Widget : ModuleWidget {
+    __MOD__Widget(__MOD__* module) {
+        using namespace __MOD___UI;
+        /// a generic layout for modules
+        // if you want a custom UI layout, you could replace this with a generated one from vcv sdk
+        // you would need to ensure the parameter, input and output indexes matched RNBO
+
+        setModule(module);
+        setPanel(createPanel(asset::plugin(pluginInstance, "res/__PANEL__")));
+
+        addChild(createWidget<ScrewSilver>(Vec(RACK_GRID_WIDTH, 0)));
+        addChild(createWidget<ScrewSilver>(Vec(box.size.x - 2 * RACK_GRID_WIDTH, 0)));
+        addChild(createWidget<ScrewSilver>(Vec(RACK_GRID_WIDTH, RACK_GRID_HEIGHT - RACK_GRID_WIDTH)));
+        addChild(createWidget<ScrewSilver>(Vec(box.size.x - 2 * RACK_GRID_WIDTH, RACK_GRID_HEIGHT - RACK_GRID_WIDTH)));
+
+        const float maxWidthInPx = box.size.x;
+        const float maxWidth = (maxWidthInPx / mm2px(1.0)) - borderX;
+#ifdef GENERIC_TITLE_LABEL
+        addLabel(mm2px(Vec(borderX / 2.0f, 0)), "__MODNAME__", 18.f, maxWidth, nvgRGB(0xff, 0x00, 0x00));
+#endif
+        // module == null means preview (module browser), where the dsp provides the counts and names
+        // from the generated metadata, rather than creating a patch instance just to draw the panel
+        __MOD__::PreviewInfo preview;
+        if (module) {
+            preview.nParams = module->nParams_;
+            preview.nInputs = module->nInputs_;
+            preview.nOutputs = module->nOutputs_;
+        } else {
+            preview = __MOD__::previewInfo();
+        }
+        const int nParams = preview.nParams, nInputs = preview.nInputs, nOutputs = preview.nOutputs;
+
+        float posX = borderX;
+        float posY = titleSpaceY;
+        for (int i = 0; i < nParams; i++) {
+            if (posX >= maxWidth) {
+                posY += spaceY;
+                posX = borderX;
+            }
+            addParam(createParamCentered<RoundBlackKnob>(mm2px(Vec(posX, posY)), module, i));
+            const std::string pname = module ? module->paramQuantities[i]->name : preview.paramNames[i];
+            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))), pname, 10.f, spaceX,
+                     nvgRGB(0x00, 0x00, 0x00));
+            posX += spaceX;
+        }
+
+        posX = borderX;
+        posY += inputSpaceY;
+        for (int i = 0; i < nInputs; i++) {
+            if (posX >= maxWidth) {
+                posY += spaceY;
+                posX = borderX;
+            }
+            addInput(createInputCentered<PJ301MPort>(mm2px(Vec(posX, posY)), module, i));
+            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))),
+                     std::string("In") + std::to_string(i + 1), 10.f, spaceX, nvgRGB(0x00, 0x00, 0x00));
+            posX += spaceX;
+        }
+
+        posX = borderX;
+        posY += outputSpaceY;
+        for (int i = 0; i < nOutputs; i++) {
+            if (posX >= maxWidth) {
+                posY += spaceY;
+                posX = borderX;
+            }
+            addOutput(createOutputCentered<PJ301MPort>(mm2px(Vec(posX, posY)), module, i));
+            addLabel(mm2px(Vec(posX - (spaceX / 2.f), posY + (spaceY / 4.f))),
+                     std::string("Out") + std::to_string(i + 1), 10.f, spaceX, nvgRGB(0x00, 0x00, 0x00));
+            posX += spaceX;
+        }
+    }
+
+    void appendContextMenu(Menu* menu) override {
+        __MOD__* module = getModule<__MOD__>();
+        if (!module) return;
+
+        menu->addChild(new MenuSeparator);
+        menu->addChild(createMenuLabel(string::f("Block size: %u samples", module->bufferSize_)));
+        menu->addChild(createMenuLabel(string::f("Latency: %u samples", module->latencySamples())));
+        if (module->decimation_ > 1) {
+            menu->addChild(createMenuLabel(string::f("Internal rate: %u Hz", module->rnboSampleRate_)));
+        }
+        menu->addChild(createMenuLabel(string::f("Control rate: every %u samples", module->controlDivider_.getDivision())));
+        menu->addChild(createMenuLabel(module->sleeping_ ? "Sleeping" : "Running"));
+        if (module->maxVoices_ > 1) {
+            menu->addChild(createMenuLabel(string::f("Voices: %d of %d", module->nVoices_, module->maxVoices_)));
+        }
+        if (module->timing_) { appendTimingMenu(menu, module->timing_, module->timingBudget()); }
+        if (module->queueTelemetry_) { appendQueueMenu(menu, module); }
+    }
+
+    // event queue telemetry (MODULE_QUEUE_TELEMETRY), saved for scripts/setSizes.py --telemetry
+    void appendQueueMenu(Menu* menu, __MOD__* module) {
+        menu->addChild(new MenuSeparator);
+        menu->addChild(createMenuLabel(string::f("Event queue: peak %u of %u", module->queuePeak_, module->queueSize_)));
+        if (module->queueDropped_) {
+            menu->addChild(createMenuLabel(string::f("Events dropped: %u", module->queueDropped_)));
+        }
+        menu->addChild(createMenuItem("Save queue telemetry", "__MOD__-queue.json", [=]() {
+            const std::string path = asset::user("__MOD__-queue.json");
+            FILE* f = fopen(path.c_str(), "w");
+            if (!f) {
+                WARN("__MOD__ : could not save queue telemetry to %s", path.c_str());
+                return;
+            }
+            fprintf(f, "{\n  \"module\": \"__MOD__\",\n  \"queue_size\": %u,\n  \"queue_peak\": %u,\n  \"queue_dropped\": %u\n}\n",
+                    module->queueSize_, module->queuePeak_, module->queueDropped_);
+            fclose(f);
+            INFO("__MOD__ : queue telemetry saved to %s, size the queue with scripts/setSizes.py --telemetry", path.c_str());
+        }));
+    }
+
+    // process timing (MODULE_PROCESS_TIMING), each count is a whole block (every voice), the budget is the time it has
+    void appendTimingMenu(Menu* menu, ProcessTiming* timing, double budget) {
+        const double rate = timing->ticksPerSecond();
+        auto describe = [=](double ticks) {
+            if (rate <= 0.0) return string::f("%.0f ticks", ticks);
+            return string::f("%.0f ticks, %.2f us, %.1f%% of block", ticks, 1e6 * ticks / rate,
+                             100.0 * ticks / rate / budget);
+        };
+
+        menu->addChild(new MenuSeparator);
+        menu->addChild(createMenuLabel(string::f("Process timing: %llu blocks", (unsigned long long)timing->blocks_)));
+        menu->addChild(createMenuLabel("Average: " + describe(timing->averageTicks())));
+        menu->addChild(createMenuLabel("Max: " + describe(timing->maxTicks_)));
+        menu->addChild(createSubmenuItem("Histogram", "", [=](Menu* menu) {
+            for (int n = 0; n < ProcessTiming::histogramSize_; n++) {
+                if (!timing->histogram_[n]) continue;
+                menu->addChild(createMenuLabel(string::f("%llu+ ticks: %u", 1ull << n, timing->histogram_[n])));
+            }
+        }));
+        menu->addChild(createMenuItem("Reset timing", "", [=]() { timing->reset(); }));
+        menu->addChild(createMenuItem("Save timing", "__MOD__-timing.json", [=]() {
+            const std::string path = asset::user("__MOD__-timing.json");
+            if (timing->dump(path.c_str(), "__MOD__", budget)) {
+                INFO("__MOD__ : process timing saved to %s", path.c_str());
+            } else {
+                WARN("__MOD__ : could not save process timing to %s", path.c_str());
+            }
+        }));
+    }
+
+    void addLabel(const Vec& pos, const std::string& txt, float fontSize, float width, const NVGcolor& clr) {
+        auto* label = new Label();
+        label->box.pos = pos;
+        label->box.size.x = mm2px(width * 2);
+        label->box.size.y = fontSize;
+        label->lineHeight = 1.0f;
+        label->text = txt.c_str();
+        label->color = clr;
+        label->fontSize = fontSize;
+        label->alignment = Label::LEFT_ALIGNMENT;
+        addChild(label);
+    }
+};
+#else
+// this is where you need to place the CUSTOM WIDGET
+// see above, about generating and creating struct __MOD__Widget
+#endif  //  GENERIC_UI
+
+
+Model* model__MOD__ = createModel<__MOD__, __MOD__Widget>("__MOD__");
+
+// ui options, undefined so the next module in a unity build can set its own
+#undef GENERIC_TITLE_LABEL
+#undef GENERIC_UI
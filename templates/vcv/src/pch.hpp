@@ -0,0 +1,18 @@
+// precompiled header, rack and the rnbo common headers parsed once for all modules
+// used when building with PCH=1 (make) or -DVCV_PCH=ON (cmake)
+#ifndef PLUGIN_PCH_HPP
+#define PLUGIN_PCH_HPP
+
+#include "plugin.hpp"
+#include "rnbo_config.hpp"
+
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wsign-compare"
+#pragma GCC diagnostic ignored "-Wunused-variable"
+#pragma GCC diagnostic ignored "-Wunused-function"
+#pragma GCC diagnostic ignored "-Wsuggest-override"
+#include "RNBO_Common.h"
+#include "RNBO_AudioSignal.h"
+#pragma GCC diagnostic pop
+
+#endif  // PLUGIN_PCH_HPP
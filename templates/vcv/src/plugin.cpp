@@ -1,9 +1,11 @@
 #include "plugin.hpp"
+#include "modules.hpp"
 
 Plugin* pluginInstance;
 
 void init(Plugin* p) {
 	pluginInstance = p;
-	
-	// Module models will be added here by createModule.py
+
+	// Module models, generated in modules.hpp by createModule.py
+	addModules(p);
 }
@@ -0,0 +1,100 @@
+#pragma once
+// process timing, shared by all modules
+// measures each block a module processes (every voice's rnbo process call together) with a cheap cycle counter,
+// for modules built with MODULE_PROCESS_TIMING 1
+// the audio thread adds, the ui reads (values may be a call apart, which is fine for a readout)
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <x86intrin.h>
+#endif
+
+// a counter read, x86 tsc or arm64 virtual counter (a single instruction), elsewhere nanoseconds of steady_clock.
+// that includes 32 bit arm and so the MetaModule (cortex-a7): its counters (pmccntr, cntvct) are only readable
+// from user code where the system allows it, and fault where it does not. steady_clock is a library call, on linux
+// a vdso read of the same counter (some tens of ns), on other systems possibly a system call (around a us),
+// paid twice per measured block and counted in it, with that clock's resolution (short blocks read 0 or a tick)
+inline uint64_t processTimingTicks() {
+#if defined(__x86_64__) || defined(__i386__)
+    return __rdtsc();
+#elif defined(__aarch64__)
+    uint64_t ticks;
+    asm volatile("mrs %0, cntvct_el0" : "=r"(ticks));
+    return ticks;
+#else
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now().time_since_epoch())
+        .count();
+#endif
+}
+
+struct ProcessTiming {
+    // blocks taking [2^n, 2^(n+1)) ticks are counted in histogram_[n]
+    static constexpr int histogramSize_ = 40;
+
+    uint64_t blocks_ = 0;
+    uint64_t totalTicks_ = 0;
+    uint64_t maxTicks_ = 0;
+    uint32_t histogram_[histogramSize_] = {};
+
+    // when counting started, to convert ticks to time (see ticksPerSecond())
+    uint64_t startTicks_ = processTimingTicks();
+    std::chrono::steady_clock::time_point startTime_ = std::chrono::steady_clock::now();
+
+    // set by the ui, the audio thread clears the counts on its next call
+    std::atomic<bool> resetRequested_{false};
+
+    void add(uint64_t ticks) {
+        if (resetRequested_.load(std::memory_order_relaxed)) { clear(); }
+        blocks_++;
+        totalTicks_ += ticks;
+        if (ticks > maxTicks_) maxTicks_ = ticks;
+        const int bucket = 63 - __builtin_clzll(ticks | 1);
+        histogram_[bucket < histogramSize_ ? bucket : histogramSize_ - 1]++;
+    }
+
+    void clear() {
+        blocks_ = 0;
+        totalTicks_ = 0;
+        maxTicks_ = 0;
+        for (auto& count : histogram_) count = 0;
+        startTicks_ = processTimingTicks();
+        startTime_ = std::chrono::steady_clock::now();
+        resetRequested_.store(false, std::memory_order_relaxed);
+    }
+
+    void reset() { resetRequested_.store(true, std::memory_order_relaxed); }
+
+    double averageTicks() const { return blocks_ ? (double)totalTicks_ / blocks_ : 0.0; }
+
+    // the counter rate, measured against the steady clock since counting started, 0 until 10ms have passed
+    double ticksPerSecond() const {
+        const double seconds = std::chrono::duration<double>(std::chrono::steady_clock::now() - startTime_).count();
+        return seconds >= 0.01 ? (processTimingTicks() - startTicks_) / seconds : 0.0;
+    }
+
+    // write the counts as json, budgetSeconds is the time a block has (one block at the rnbo rate)
+    bool dump(const char* path, const char* module, double budgetSeconds) const {
+        FILE* f = fopen(path, "w");
+        if (!f) return false;
+        const double rate = ticksPerSecond();
+        const double us = rate > 0.0 ? 1e6 / rate : 0.0;
+        fprintf(f, "{\n  \"module\": \"%s\",\n  \"blocks\": %llu,\n  \"ticks_per_second\": %.0f,\n", module,
+                (unsigned long long)blocks_, rate);
+        fprintf(f, "  \"budget_us\": %.3f,\n  \"average_ticks\": %.1f,\n  \"max_ticks\": %llu,\n", budgetSeconds * 1e6,
+                averageTicks(), (unsigned long long)maxTicks_);
+        fprintf(f, "  \"average_us\": %.3f,\n  \"max_us\": %.3f,\n  \"histogram\": [", averageTicks() * us,
+                maxTicks_ * us);
+        const char* separator = "";
+        for (int n = 0; n < histogramSize_; n++) {
+            if (!histogram_[n]) continue;
+            fprintf(f, "%s\n    {\"min_ticks\": %llu, \"count\": %u}", separator, 1ull << n, histogram_[n]);
+            separator = ",";
+        }
+        fprintf(f, "\n  ]\n}\n");
+        fclose(f);
+        return true;
+    }
+};
@@ -0,0 +1,62 @@
+#pragma once
+// event queue telemetry, shared by all modules
+// an rnbo engine that records the most events its queue has held at once, and the events it had no room for,
+// used for the patch of modules built with MODULE_QUEUE_TELEMETRY 1 (include after the rnbo headers)
+// the counts are read once per block by the module, setSizes.py sizes the queue from them
+#include "RNBO_Common.h"
+
+template <size_t SIZE>
+struct QueueTelemetryEngine : RNBO::MinimalEngine<SIZE> {
+    using Base = RNBO::MinimalEngine<SIZE>;
+    using Base::Base;
+
+    size_t peak_ = 0;
+    size_t dropped_ = 0;
+
+    // every event the patch queues goes through one of these, the queue is only scanned when telemetry is on
+    void scheduleParameterChange(RNBO::ParameterIndex index, RNBO::ParameterValue value,
+                                 RNBO::MillisecondTime offset) override {
+        const size_t before = this->getQueueSize();
+        Base::scheduleParameterChange(index, value, offset);
+        record(before);
+    }
+
+    void scheduleParameterBang(RNBO::ParameterIndex index, RNBO::MillisecondTime offset) override {
+        const size_t before = this->getQueueSize();
+        Base::scheduleParameterBang(index, offset);
+        record(before);
+    }
+
+    void scheduleClockEvent(RNBO::EventTarget* eventTarget, RNBO::ClockId clockIndex,
+                            RNBO::MillisecondTime time) override {
+        const size_t before = this->getQueueSize();
+        Base::scheduleClockEvent(eventTarget, clockIndex, time);
+        record(before);
+    }
+
+    void scheduleClockEventWithValue(RNBO::EventTarget* eventTarget, RNBO::ClockId clockIndex,
+                                     RNBO::MillisecondTime time, RNBO::ParameterValue value) override {
+        const size_t before = this->getQueueSize();
+        Base::scheduleClockEventWithValue(eventTarget, clockIndex, time, value);
+        record(before);
+    }
+
+    void sendDataRefUpdated(RNBO::DataRefIndex index) override {
+        // queued only outside event processing, otherwise run straight away
+        if (this->_isInEventProcessing) {
+            Base::sendDataRefUpdated(index);
+            return;
+        }
+        const size_t before = this->getQueueSize();
+        Base::sendDataRefUpdated(index);
+        record(before);
+    }
+
+private:
+    // an event that did not make the queue any longer had no room (with RNBO_NOTHROW it is dropped)
+    void record(size_t before) {
+        const size_t after = this->getQueueSize();
+        if (after > peak_) peak_ = after;
+        if (after == before) dropped_++;
+    }
+};
@@ -0,0 +1,67 @@
+#pragma once
+// memory for the rnbo patches and module buffers, shared by all modules (RNBO_USECUSTOMALLOCATOR, see rnbo_config.hpp)
+// blocks come in size classes (powers of two) and freed blocks are kept for reuse rather than returned to the system,
+// so adding and removing modules reuses the same blocks instead of fragmenting the heap.
+// the free lists are lock-free, so the audio threads never wait on the ui thread creating or removing a module,
+// and while processing (RnboRealtimeScope) a patch only gets pooled blocks: the small classes are topped up
+// when a patch is prepared (rnboAllocatorReserve()), and the system allocator is never called.
+// freeing never calls the system allocator, the pool is given back by rnboAllocatorTrim() (when the last module
+// is removed) and when the plugin is unloaded.
+// implemented once for the plugin in rnbo_runtime.cpp
+#include "rnbo_config.hpp"
+
+#include <cstddef>
+#include <type_traits>
+
+struct RnboAllocatorStats {
+    bool enabled = false;  // built with RNBO_USECUSTOMALLOCATOR, otherwise rnbo uses malloc and all are 0
+    // bytes held by patches and modules (whole blocks), and the most held at once
+    size_t bytesInUse = 0;
+    size_t peakBytesInUse = 0;
+    // bytes of freed blocks kept for reuse
+    size_t bytesPooled = 0;
+    // blocks handed out (reused or new), blocks taken from the system allocator (new and reserved), and blocks freed
+    size_t allocations = 0;
+    size_t systemAllocations = 0;
+    size_t frees = 0;
+    // requests while processing without a pooled block of their size, and of those the ones no larger block
+    // could serve either, which failed (the patch gets no memory), both should stay 0
+    size_t realtimeMisses = 0;
+    size_t realtimeFailures = 0;
+};
+
+RnboAllocatorStats rnboAllocatorStats();
+
+// top up the small size classes for what patches allocate while processing,
+// called once a patch is prepared (created, sample rate changed), never while processing
+void rnboAllocatorReserve();
+
+// return the pooled blocks to the system, blocks in use are not affected
+// (calls the system allocator, only once no module processes)
+void rnboAllocatorTrim();
+
+// the calling thread is processing while one is alive: the pool hands it pooled blocks only, a request without
+// a block of its size takes a larger one (realtimeMisses), or fails if there is none (realtimeFailures).
+// modules hold one around the calls into their patches while processing
+class RnboRealtimeScope {
+public:
+    RnboRealtimeScope();
+    ~RnboRealtimeScope();
+    RnboRealtimeScope(const RnboRealtimeScope&) = delete;
+    RnboRealtimeScope& operator=(const RnboRealtimeScope&) = delete;
+
+private:
+    bool previous_;
+};
+
+// zeroed arrays (sample buffers, parameter values, flags) from the same pool as the patches
+template <typename T>
+T* rnboAllocArray(size_t count) {
+    static_assert(std::is_trivial<T>::value, "rnboAllocArray does not construct, only for plain types");
+    return static_cast<T*>(RNBO::Platform::calloc(count, sizeof(T)));
+}
+
+template <typename T>
+void rnboFreeArray(T* array) {
+    if (array) { RNBO::Platform::free(array); }
+}
@@ -0,0 +1,25 @@
+#pragma once
+// rnbo compile options, shared by all modules of the plugin
+// these have to be the same in every module, as the rnbo headers are only parsed once
+// in a unity build or with the precompiled header (pch.hpp)
+
+// precision, approximate math and the standard library (RNBO_USE_FLOAT32, RNBO_USE_APPROXIMATE_MATH,
+// RNBO_NOSTL) are set by the build profile of each target, rnbo_profile.mk and rnbo_profile.cmake,
+// choose with scripts/setProfile.py rather than defining them here
+#define RNBO_NOTHROW  // no exceptopns
+// patch memory comes from the plugin's pool (rnbo_allocator.hpp) rather than straight from malloc
+#define RNBO_USECUSTOMALLOCATOR
+#define RNBO_NO_PATCHERFACTORY
+
+// list capacity (RNBO_FIXEDLISTSIZE), the largest any module needs, generated by scripts/check.py
+// (each module's MODULE_LIST_SIZE is in [ModuleSlug]-rnbo/[ModuleSlug]Sizes.h, see scripts/setSizes.py)
+#if __has_include("rnbo_sizes.hpp")
+#include "rnbo_sizes.hpp"
+#else
+#define RNBO_FIXEDLISTSIZE 64
+#endif
+
+// RNBO::Platform (messages, errors, string formatting, allocation) is declared in rnbo_platform.hpp
+// and compiled once for the plugin in rnbo_runtime.cpp, rather than into every module
+#define RNBO_USECUSTOMPLATFORM
+#include "rnbo_platform.hpp"
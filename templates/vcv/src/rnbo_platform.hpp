@@ -0,0 +1,116 @@
+#pragma once
+// RNBO::Platform for all modules (RNBO_USECUSTOMPLATFORM, see rnbo_config.hpp)
+// the rnbo default (RNBO_Platform.h) defines these as static functions, compiled again into every module,
+// here the trivial ones are inline (so calls compile away) and the rest are implemented once in rnbo_runtime.cpp
+
+#include "RNBO_Debug.h"
+#include "RNBO_Types.h"
+
+#include <stddef.h>
+#include <stdlib.h>
+#include <string.h>
+
+namespace RNBO {
+
+struct ErrorReportingInfo {
+#if RNBO_PLATFORM_ASSERT_WARN == 1
+    bool mAssertWarned = false;
+#endif
+#if RNBO_PLATFORM_ERROR_WARN == 1
+    bool mErrorWarned = false;
+#endif
+};
+
+namespace Platform {
+
+// rnbo messages are discarded, printing is not real-time safe
+inline void printMessage(const char* message) {
+}
+
+inline void printErrorMessage(const char* message) {
+    printMessage(message);
+}
+
+#if defined(RNBO_NOSTL) || defined(RNBO_NOTHROW)
+inline void error(RuntimeError e, const char* msg) {
+    printErrorMessage(msg);
+}
+
+inline void assertTrue(bool v, const char* msg) {
+    if (!v) { printErrorMessage(msg); }
+}
+#else
+// throw, see rnbo_runtime.cpp
+void error(RuntimeError e, const char* msg);
+void assertTrue(bool v, const char* msg);
+#endif
+
+void toString(char* str, size_t maxlen, number val);
+void toString(char* str, size_t maxlen, int val);
+void toString(char* str, size_t maxlen, unsigned int val);
+void toString(char* str, size_t maxlen, long val);
+void toString(char* str, size_t maxlen, long long val);
+void toString(char* str, size_t maxlen, unsigned long val);
+void toString(char* str, size_t maxlen, unsigned long long val);
+void toString(char* str, size_t maxlen, void* val);
+
+// shared by all modules, so each warning is only reported once per plugin
+// (hidden, so modules access it directly rather than through the symbol table)
+extern ErrorReportingInfo s_ErrorReportingInfo __attribute__((visibility("hidden")));
+
+inline bool once(bool& v) {
+    bool have = v;
+    v = true;
+    return !have;
+}
+
+void resetWarnings();
+
+template <typename T>
+T errorOrDefault(RuntimeError e, const char* str, T def) {
+#if RNBO_PLATFORM_ERROR_WARN == 0
+    error(e, str);
+#else
+    RNBO_UNUSED(e);
+    if (once(s_ErrorReportingInfo.mErrorWarned)) { printErrorMessage(str); }
+#endif
+    return def;
+}
+
+template <typename T>
+T assertTrueOrDefault(bool v, const char* str, T def) {
+#if RNBO_PLATFORM_ASSERT_WARN == 0
+    assertTrue(v, str);
+#else
+    if (!v && once(s_ErrorReportingInfo.mAssertWarned)) { printErrorMessage(str); }
+#endif
+    return def;
+}
+
+#ifndef RNBO_USECUSTOMALLOCATOR
+
+using ::calloc;
+using ::free;
+using ::malloc;
+using ::realloc;
+
+#else
+
+// if you use custom allocation you have to implement these
+void* malloc(size_t size);
+void free(void* ptr);
+void* realloc(void* ptr, size_t size);
+void* calloc(size_t count, size_t size);
+
+#endif  // RNBO_USECUSTOMALLOCATOR
+
+using ::abort;
+using ::memcpy;
+using ::memmove;
+using ::memset;
+using ::strcmp;
+using ::strcpy;
+using ::strlen;
+
+}  // namespace Platform
+}  // namespace RNBO
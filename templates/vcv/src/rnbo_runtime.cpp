@@ -0,0 +1,325 @@
+// rnbo runtime shared by all modules of the plugin, compiled once
+// implements the RNBO::Platform declared in rnbo_platform.hpp, and the allocator of rnbo_allocator.hpp
+#include "rnbo_config.hpp"
+#include "rnbo_allocator.hpp"
+
+#include <stdint.h>
+#include <stdio.h>
+#include <atomic>
+#include <cstddef>
+#if !defined(RNBO_NOSTL) && !defined(RNBO_NOTHROW)
+#include <stdexcept>
+#endif
+
+namespace RNBO {
+namespace Platform {
+
+ErrorReportingInfo s_ErrorReportingInfo;
+
+void resetWarnings() {
+#if RNBO_PLATFORM_ERROR_WARN == 1
+    s_ErrorReportingInfo.mErrorWarned = false;
+#endif
+#if RNBO_PLATFORM_ASSERT_WARN == 1
+    s_ErrorReportingInfo.mAssertWarned = false;
+#endif
+}
+
+#if !defined(RNBO_NOSTL) && !defined(RNBO_NOTHROW)
+void error(RuntimeError e, const char* msg) {
+    switch (e) {
+        case RuntimeError::OutOfRange: throw std::out_of_range(msg);
+        case RuntimeError::QueueOverflow: throw std::overflow_error(msg);
+        default: throw std::runtime_error(msg);
+    }
+}
+
+void assertTrue(bool v, const char* msg) {
+    if (!v) { throw std::runtime_error(msg); }
+}
+#endif
+
+void toString(char* str, size_t maxlen, number val) { snprintf(str, maxlen, "%f", double(val)); }
+void toString(char* str, size_t maxlen, int val) { snprintf(str, maxlen, "%d", val); }
+void toString(char* str, size_t maxlen, unsigned int val) { snprintf(str, maxlen, "%u", val); }
+void toString(char* str, size_t maxlen, long val) { snprintf(str, maxlen, "%ld", val); }
+void toString(char* str, size_t maxlen, long long val) { snprintf(str, maxlen, "%lld", val); }
+void toString(char* str, size_t maxlen, unsigned long val) { snprintf(str, maxlen, "%lu", val); }
+void toString(char* str, size_t maxlen, unsigned long long val) { snprintf(str, maxlen, "%llu", val); }
+void toString(char* str, size_t maxlen, void* val) { snprintf(str, maxlen, "%p", val); }
+
+#ifdef RNBO_USECUSTOMALLOCATOR
+
+namespace {
+
+// blocks of 16 bytes and up, capacity 16 << sizeClass, pooled per class
+// (a class for every size that fits a size_t, long delays and buffers included)
+const unsigned int MIN_BLOCK_SHIFT = 4;
+const unsigned int SIZE_CLASSES = sizeof(size_t) * 8 - MIN_BLOCK_SHIFT;
+
+// the small classes (16 bytes to 4k: lists, small buffers) are topped up to RESERVE_BLOCKS free blocks
+// whenever a patch is prepared (rnboAllocatorReserve()), for what a patch allocates while processing
+const unsigned int RESERVE_CLASSES = 9;
+const int RESERVE_BLOCKS = 4;
+
+// in front of every block, keeps the block aligned like malloc's
+// (the capacity excludes the header, so power of two requests, as delays make, fit their class exactly)
+struct alignas(alignof(std::max_align_t)) BlockHeader {
+    size_t capacity;
+    unsigned int sizeClass;
+};
+
+// a pooled block, linked through its own memory
+struct FreeBlock {
+    FreeBlock* next;
+};
+
+// the smallest class that fits, SIZE_CLASSES if none does
+unsigned int sizeClassOf(size_t size) {
+    unsigned int sizeClass = 0;
+    while (sizeClass < SIZE_CLASSES && (size_t(1) << (sizeClass + MIN_BLOCK_SHIFT)) < size) { sizeClass++; }
+    return sizeClass;
+}
+
+BlockHeader* headerOf(void* ptr) {
+    return static_cast<BlockHeader*>(ptr) - 1;
+}
+
+// set while the thread processes (RnboRealtimeScope), the pool then never calls the system allocator
+thread_local bool tRealtime = false;
+
+// the pooled blocks of one class, a lock-free stack (treiber), so an audio thread never waits on a ui thread
+// adding or removing a module. the head packs a count of changes above the pointer (the low 48 bits on 64 bit
+// systems, where user space addresses fit, all 32 on 32 bit ones), so a pop racing with another thread
+// popping and pushing back the same block (aba) fails its compare and tries again
+class FreeList {
+public:
+    static_assert(std::atomic<uint64_t>::is_always_lock_free, "the pool needs lock-free 64 bit atomics");
+
+    void push(FreeBlock* block) {
+        uint64_t head = head_.load(std::memory_order_relaxed);
+        do {
+            block->next = pointerOf(head);
+        } while (!head_.compare_exchange_weak(head, pack(block, head), std::memory_order_release,
+                                              std::memory_order_relaxed));
+        count_.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    FreeBlock* pop() {
+        uint64_t head = head_.load(std::memory_order_acquire);
+        // block->next may be read just after another thread took the block, the compare then fails and it is unused
+        while (FreeBlock* block = pointerOf(head)) {
+            if (head_.compare_exchange_weak(head, pack(block->next, head), std::memory_order_acquire,
+                                            std::memory_order_acquire)) {
+                count_.fetch_sub(1, std::memory_order_relaxed);
+                return block;
+            }
+        }
+        return nullptr;
+    }
+
+    // the whole list, only while nothing else uses the pool (trim)
+    FreeBlock* popAll() {
+        count_.store(0, std::memory_order_relaxed);
+        return pointerOf(head_.fetch_and(~POINTER_MASK, std::memory_order_acquire));
+    }
+
+    // blocks on the list, may be a push or pop behind
+    int count() const { return count_.load(std::memory_order_relaxed); }
+
+private:
+    static constexpr unsigned int POINTER_BITS = sizeof(void*) == 8 ? 48 : 32;
+    static constexpr uint64_t POINTER_MASK = (uint64_t(1) << POINTER_BITS) - 1;
+
+    static FreeBlock* pointerOf(uint64_t head) { return reinterpret_cast<FreeBlock*>(uintptr_t(head & POINTER_MASK)); }
+    static uint64_t pack(FreeBlock* block, uint64_t head) {
+        return uint64_t(reinterpret_cast<uintptr_t>(block)) | (((head >> POINTER_BITS) + 1) << POINTER_BITS);
+    }
+
+    std::atomic<uint64_t> head_{0};
+    std::atomic<int> count_{0};
+};
+
+// freeing only ever returns a block to its list, memory goes back to the system in trim() alone,
+// and a realtime thread only takes blocks from the lists
+class BlockPool {
+public:
+    ~BlockPool() { trim(); }
+
+    void* allocate(size_t size) {
+        const unsigned int sizeClass = sizeClassOf(size);
+        if (sizeClass == SIZE_CLASSES) return nullptr;
+        if (FreeBlock* block = free_[sizeClass].pop()) return handOut(block);
+        if (tRealtime) {
+            // none of this size left, rather than calling the system take a larger block
+            realtimeMisses_.fetch_add(1, std::memory_order_relaxed);
+            for (unsigned int larger = sizeClass + 1; larger < SIZE_CLASSES; larger++) {
+                if (FreeBlock* block = free_[larger].pop()) return handOut(block);
+            }
+            realtimeFailures_.fetch_add(1, std::memory_order_relaxed);
+            return nullptr;
+        }
+        BlockHeader* header = newBlock(sizeClass);
+        if (!header) return nullptr;
+        count(header->capacity);
+        return header + 1;
+    }
+
+    // safe on the audio thread, the block is only pushed onto its free list
+    void release(void* ptr) {
+        BlockHeader* header = headerOf(ptr);
+        bytesInUse_.fetch_sub(header->capacity, std::memory_order_relaxed);
+        bytesPooled_.fetch_add(header->capacity, std::memory_order_relaxed);
+        frees_.fetch_add(1, std::memory_order_relaxed);
+        free_[header->sizeClass].push(static_cast<FreeBlock*>(ptr));
+    }
+
+    // tops the small classes up to RESERVE_BLOCKS free blocks, with the system allocator, so never while processing
+    void reserve() {
+        for (unsigned int sizeClass = 0; sizeClass < RESERVE_CLASSES; sizeClass++) {
+            for (int n = free_[sizeClass].count(); n < RESERVE_BLOCKS; n++) {
+                BlockHeader* header = newBlock(sizeClass);
+                if (!header) return;
+                bytesPooled_.fetch_add(header->capacity, std::memory_order_relaxed);
+                free_[sizeClass].push(reinterpret_cast<FreeBlock*>(header + 1));
+            }
+        }
+    }
+
+    // frees the pooled blocks with the system allocator, only once no module processes (see rnboAllocatorTrim())
+    void trim() {
+        for (FreeList& list : free_) {
+            FreeBlock* block = list.popAll();
+            while (block) {
+                FreeBlock* next = block->next;
+                bytesPooled_.fetch_sub(headerOf(block)->capacity, std::memory_order_relaxed);
+                ::free(headerOf(block));
+                block = next;
+            }
+        }
+    }
+
+    RnboAllocatorStats stats() const {
+        RnboAllocatorStats stats;
+        stats.bytesInUse = bytesInUse_.load(std::memory_order_relaxed);
+        stats.peakBytesInUse = peakBytesInUse_.load(std::memory_order_relaxed);
+        stats.bytesPooled = bytesPooled_.load(std::memory_order_relaxed);
+        stats.allocations = allocations_.load(std::memory_order_relaxed);
+        stats.systemAllocations = systemAllocations_.load(std::memory_order_relaxed);
+        stats.frees = frees_.load(std::memory_order_relaxed);
+        stats.realtimeMisses = realtimeMisses_.load(std::memory_order_relaxed);
+        stats.realtimeFailures = realtimeFailures_.load(std::memory_order_relaxed);
+        return stats;
+    }
+
+private:
+    BlockHeader* newBlock(unsigned int sizeClass) {
+        const size_t capacity = size_t(1) << (sizeClass + MIN_BLOCK_SHIFT);
+        if (capacity > SIZE_MAX - sizeof(BlockHeader)) return nullptr;
+        auto* header = static_cast<BlockHeader*>(::malloc(sizeof(BlockHeader) + capacity));
+        if (!header) return nullptr;
+        header->capacity = capacity;
+        header->sizeClass = sizeClass;
+        systemAllocations_.fetch_add(1, std::memory_order_relaxed);
+        return header;
+    }
+
+    void* handOut(FreeBlock* block) {
+        const size_t capacity = headerOf(block)->capacity;
+        bytesPooled_.fetch_sub(capacity, std::memory_order_relaxed);
+        count(capacity);
+        return block;
+    }
+
+    void count(size_t capacity) {
+        allocations_.fetch_add(1, std::memory_order_relaxed);
+        const size_t inUse = bytesInUse_.fetch_add(capacity, std::memory_order_relaxed) + capacity;
+        size_t peak = peakBytesInUse_.load(std::memory_order_relaxed);
+        while (inUse > peak && !peakBytesInUse_.compare_exchange_weak(peak, inUse, std::memory_order_relaxed)) {}
+    }
+
+    FreeList free_[SIZE_CLASSES];
+    std::atomic<size_t> bytesInUse_{0};
+    std::atomic<size_t> peakBytesInUse_{0};
+    std::atomic<size_t> bytesPooled_{0};
+    std::atomic<size_t> allocations_{0};
+    std::atomic<size_t> systemAllocations_{0};
+    std::atomic<size_t> frees_{0};
+    std::atomic<size_t> realtimeMisses_{0};
+    std::atomic<size_t> realtimeFailures_{0};
+};
+
+// created on first use, so allocations from other static constructors find it,
+// and destroyed when the plugin is unloaded, freeing what is still pooled
+BlockPool& blockPool() {
+    static BlockPool pool;
+    return pool;
+}
+
+}  // namespace
+
+void* malloc(size_t size) {
+    return blockPool().allocate(size ? size : 1);
+}
+
+void free(void* ptr) {
+    if (ptr) { blockPool().release(ptr); }
+}
+
+void* realloc(void* ptr, size_t size) {
+    if (!ptr) return malloc(size);
+    if (!size) {
+        free(ptr);
+        return nullptr;
+    }
+    const size_t capacity = headerOf(ptr)->capacity;
+    if (size <= capacity) return ptr;
+    void* grown = malloc(size);
+    if (!grown) return nullptr;
+    memcpy(grown, ptr, capacity);
+    free(ptr);
+    return grown;
+}
+
+void* calloc(size_t count, size_t size) {
+    if (size && count > SIZE_MAX / size) return nullptr;
+    void* ptr = malloc(count * size);
+    // reused blocks hold whatever was last in them
+    if (ptr) { memset(ptr, 0, count * size); }
+    return ptr;
+}
+
+#endif  // RNBO_USECUSTOMALLOCATOR
+
+}  // namespace Platform
+}  // namespace RNBO
+
+RnboAllocatorStats rnboAllocatorStats() {
+#ifdef RNBO_USECUSTOMALLOCATOR
+    RnboAllocatorStats stats = RNBO::Platform::blockPool().stats();
+    stats.enabled = true;
+    return stats;
+#else
+    return RnboAllocatorStats();
+#endif
+}
+
+void rnboAllocatorReserve() {
+#ifdef RNBO_USECUSTOMALLOCATOR
+    RNBO::Platform::blockPool().reserve();
+#endif
+}
+
+void rnboAllocatorTrim() {
+#ifdef RNBO_USECUSTOMALLOCATOR
+    RNBO::Platform::blockPool().trim();
+#endif
+}
+
+#ifdef RNBO_USECUSTOMALLOCATOR
+RnboRealtimeScope::RnboRealtimeScope() : previous_(RNBO::Platform::tRealtime) { RNBO::Platform::tRealtime = true; }
+RnboRealtimeScope::~RnboRealtimeScope() { RNBO::Platform::tRealtime = previous_; }
+#else
+RnboRealtimeScope::RnboRealtimeScope() : previous_(false) {}
+RnboRealtimeScope::~RnboRealtimeScope() {}
+#endif